@@ -5,42 +5,252 @@ Uses LangChain + GPT to analyze high breakouts and generate trading insights.
 """
 
 import os
+import re
+import sys
+import json
+import argparse
+import time
+import hashlib
 from datetime import datetime, timezone
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+
+import sectors
+import history_store
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import entry_log, storage
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
-HISTORY_FILE = os.path.join(OUTPUT_DIR, "stocks_at_highs.txt")
+RESPONSE_CACHE_FILE = os.path.join(OUTPUT_DIR, "analysis_cache.json")
+
+# Analyses are appended to ANALYSIS_LOG; ANALYSIS_FILE is the rendered view
+ANALYSIS_LOG = os.path.join(OUTPUT_DIR, "ai_analysis.log")
+ANALYSIS_FILE = os.path.join(OUTPUT_DIR, "ai_analysis.md")
+ANALYSIS_HEADER = "# S&P 500 High Tracker - AI Analysis\n\n"
+RENDER_LIMIT = 60   # newest analyses shown in ai_analysis.md
+LOG_KEEP = 500      # analyses kept in the active log; older ones are archived
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Prompt payload: columns sent to the model, rounded to PROMPT_DECIMALS
+PROMPT_COLUMNS = [
+    "Ticker", "Name", "Price", "Daily Change %", "Weekly Change %",
+    "% From 52W High", "% From ATH", "At 52W High", "At ATH", "Sentiment", "Tech",
+]
+BREAKOUT_COLUMNS = ["Ticker", "Name", "Price", "New 52W High", "New ATH", "Sentiment", "Sector"]
+PROMPT_DECIMALS = 2
+DEFAULT_TOP_K = 150           # stocks sent at most
+DEFAULT_TOKEN_BUDGET = 6000   # estimated tokens for the data tables
+MAX_CACHED_RESPONSES = 100
+
+# Tech & AI picks: from the local sector tags when available, otherwise left to the model
+TECH_PICKS_TAGGED = """From the stocks tagged Tech = Y (already classified from their GICS sector and
+sub-industry - do not reclassify), pick up to 3-5 (if available).
+Skip this section if no stocks are tagged Tech = Y."""
+TECH_PICKS_UNTAGGED = """From the stocks listed above, pick up to 3-5 (if available) that are in these sectors:
+- Technology companies (software, hardware, cloud)
+- AI and machine learning companies
+- Semiconductors and chip makers
+- New-age digital/tech companies
+
+Only pick from the ATH or 52W high stocks listed above. Skip this section if no tech stocks are at highs."""
+
+# Analysis prompt; both templates are part of the response cache key, so
+# editing them never serves an answer to the old prompt
+ANALYSIS_SYSTEM_PROMPT = """You are an expert technical analyst. The data provided contains S&P 500 stocks at 52-Week High or All-Time High.
+
+List ALL stocks in priority order:
+
+## 🏆 AT ALL-TIME HIGH (Highest Priority)
+(Stocks where At ATH = Y)
+These are the strongest stocks - making new all-time highs.
+
+## 🔥 AT 52-WEEK HIGH ONLY
+(Stocks where At 52W High = Y but At ATH = N)
+These stocks are at 52-week highs but were higher at some point in the past.
+
+For each stock show: Ticker, Name, Price, % from high, Sentiment
+Within each section, group by sentiment: Bullish first, then Neutral, then Bearish.
+
+Include ALL stocks from the data provided.
+
+## 💡 AI INSIGHTS - TOP Stock PICKS
+From the stocks listed above, pick up to 3-5 top stocks (if available) based on:
+- Bullish sentiment preferred
+- Stocks at ATH have priority over 52W high only
+- Strong momentum indicators
+
+For each recommendation, briefly explain why (1 sentence). Skip if none qualify.
+
+## 💡 AI INSIGHTS - TECH & AI Stock PICKS
+{tech_instructions}"""
+ANALYSIS_HUMAN_PROMPT = """S&P 500 stocks at highs:
+
+{at_highs_summary}
+
+### Data (CSV, most important stocks first; Y/N flags, % values in percent; "# <sector>" lines start a sector group):
+{momentum_table}
+{breakouts_section}
 
+Provide the complete list in priority order:"""
 
 def load_latest_snapshot() -> pd.DataFrame:
-    """Load the latest snapshot from history file."""
-    if not os.path.exists(HISTORY_FILE):
-        return pd.DataFrame()
-    
-    df = pd.read_csv(HISTORY_FILE, parse_dates=["timestamp"])
+    """Load the latest snapshot from the history store (latest partition only)."""
+    df_latest = history_store.load_latest_run()
     
-    if df.empty:
+    if df_latest.empty:
         return pd.DataFrame()
     
-    latest_time = df["timestamp"].max()
-    df_latest = df[df["timestamp"] == latest_time].copy()
-    
     return df_latest
 
 
-def generate_high_analysis(df_momentum: pd.DataFrame, df_breakouts: pd.DataFrame) -> str:
+def estimate_tokens(text: str) -> int:
+    """Rough token count for prompt text (about 4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _format_value(value) -> str:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, (bool, np.bool_)):
+        return "Y" if value else "N"
+    if isinstance(value, (float, np.floating)):
+        text = f"{value:.{PROMPT_DECIMALS}f}".rstrip("0").rstrip(".")
+        return "0" if text == "-0" else text
+    return str(value).replace(",", "")
+
+
+def prioritize(df_momentum: pd.DataFrame) -> pd.DataFrame:
+    """
+    Order stocks by how much they matter to the analysis: ATH before 52W
+    high only, then Bullish / Neutral / Bearish, then closest to the high.
+    """
+    order = pd.DataFrame(index=df_momentum.index)
+    order["ath"] = df_momentum.get("At ATH", pd.Series(False, index=df_momentum.index)) == True
+    sentiment = df_momentum.get("Sentiment", pd.Series(index=df_momentum.index, dtype=object))
+    order["sentiment"] = sentiment.map({"Bullish": 0, "Neutral": 1, "Bearish": 2}).fillna(1)
+    order["distance"] = pd.to_numeric(
+        df_momentum.get("% From 52W High", pd.Series(index=df_momentum.index, dtype=float)),
+        errors="coerce",
+    ).fillna(-float("inf"))
+    order = order.sort_values(["ath", "sentiment", "distance"], ascending=[False, True, False], kind="stable")
+    return df_momentum.loc[order.index]
+
+
+def compact_table(
+    df: pd.DataFrame,
+    columns: list,
+    top_k: int = DEFAULT_TOP_K,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    group_col: str = None,
+) -> tuple:
+    """
+    Encode a table as CSV-style rows with only the given columns and rounded
+    numbers (True/False as Y/N, NaN as empty).
+    Rows are kept in order until top_k rows or token_budget estimated tokens.
+    With group_col, kept rows are printed under a "# <group>" line per group
+    (groups in order of first appearance, row order kept within a group).
+
+    Returns:
+        (text, rows kept)
+    """
+    columns = [col for col in columns if col in df.columns and col != group_col]
+    header = ",".join(columns)
+    used = estimate_tokens(header)
+    if group_col is not None and group_col in df.columns:
+        groups = df[group_col].fillna("").astype(str).to_numpy()
+    else:
+        group_col, groups = None, [None] * len(df)
+    
+    grouped = {}
+    kept = 0
+    for group, row in zip(groups, df[columns].head(top_k).itertuples(index=False)):
+        line = ",".join(_format_value(v) for v in row)
+        cost = estimate_tokens(line) + 1
+        if group not in grouped and group_col is not None:
+            cost += estimate_tokens(f"# {group}") + 1
+        if used + cost > token_budget:
+            break
+        grouped.setdefault(group, []).append(line)
+        used += cost
+        kept += 1
+    
+    lines = [header]
+    for group, rows in grouped.items():
+        if group_col is not None:
+            lines.append(f"# {group}")
+        lines.extend(rows)
+    return "\n".join(lines), kept
+
+
+def response_key(model: str, *parts: str) -> str:
+    """Cache key for a model response: SHA-1 of the model name and compacted input."""
+    digest = hashlib.sha1(model.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\0" + part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_response_cache(path: str = RESPONSE_CACHE_FILE) -> dict:
+    """Load cached responses {key: [saved at (epoch seconds), text]}. Returns {} if missing or unreadable."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read analysis cache {path}: {e}")
+        return {}
+
+
+def cache_response(key: str, text: str, path: str = RESPONSE_CACHE_FILE, max_entries: int = MAX_CACHED_RESPONSES):
+    """
+    Add a response to the cache, keeping the newest max_entries. Holds the
+    cache's file lock, so concurrent queue workers never drop each other's entries.
+    """
+    with storage.file_lock(path):
+        cache = load_response_cache(path)
+        cache[key] = [time.time(), text]
+        if len(cache) > max_entries:
+            cache = dict(sorted(cache.items(), key=lambda kv: kv[1][0])[-max_entries:])
+
+        def write(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, separators=(",", ":"))
+
+        storage.atomic_write(path, write)
+
+
+def generate_high_analysis(
+    df_momentum: pd.DataFrame,
+    df_breakouts: pd.DataFrame,
+    llm=None,
+    top_k: int = DEFAULT_TOP_K,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    cache_path: str = RESPONSE_CACHE_FILE,
+) -> str:
     """
     Use LangChain + GPT to analyze stocks at/near highs and identify opportunities.
     
+    The tables are sent as compact CSV-style rows (see compact_table), most
+    important stocks first, capped at top_k stocks and token_budget tokens.
+    Responses are cached by a hash of that compacted input, so an unchanged
+    input never calls the model twice.
+    
     Args:
         df_momentum: DataFrame with momentum and high proximity data
         df_breakouts: DataFrame of stocks that just broke to new highs
+        llm: LangChain chat model to use (defaults to gpt-4o-mini); pass a
+            fake chat model to run without the OpenAI endpoint
+        top_k: Most stocks sent to the model
+        token_budget: Estimated token cap for the data tables
+        cache_path: Response cache file (None disables the cache)
     
     Returns:
         Analysis string with trading insights
@@ -48,12 +258,30 @@ def generate_high_analysis(df_momentum: pd.DataFrame, df_breakouts: pd.DataFrame
     if df_momentum.empty:
         return "No data available for analysis."
     
-    # Prepare data summaries for the LLM
-    momentum_md = df_momentum.to_markdown(index=False)
+    # Prepare data summaries for the LLM, grouped by sector when the index is available
+    grouped = sectors.has_sectors(df_momentum)
+    momentum_csv, kept = compact_table(
+        prioritize(df_momentum), PROMPT_COLUMNS, top_k, token_budget,
+        group_col="Sector" if grouped else None,
+    )
+    momentum_md = momentum_csv
+    if kept < len(df_momentum):
+        momentum_md += f"\n({len(df_momentum) - kept} lower-priority stocks omitted)"
     
     breakouts_md = ""
     if not df_breakouts.empty:
-        breakouts_md = f"\n\n### New Breakouts:\n{df_breakouts.to_markdown(index=False)}"
+        breakouts_csv, _ = compact_table(
+            df_breakouts, BREAKOUT_COLUMNS, top_k, max(0, token_budget - estimate_tokens(momentum_md))
+        )
+        breakouts_md = f"\n\n### New Breakouts:\n{breakouts_csv}"
+    
+    # Report the saving against the full markdown tables
+    payload_tokens = estimate_tokens(momentum_md + breakouts_md)
+    full_tokens = estimate_tokens(df_momentum.to_markdown(index=False))
+    if not df_breakouts.empty:
+        full_tokens += estimate_tokens(df_breakouts.to_markdown(index=False))
+    print(f"Prompt payload: {kept}/{len(df_momentum)} stocks, ~{payload_tokens} tokens "
+          f"vs ~{full_tokens} as full tables (~{full_tokens - payload_tokens} saved)")
     
     # Stocks at highs
     at_52w = df_momentum[df_momentum["At 52W High"] == True]
@@ -63,108 +291,131 @@ def generate_high_analysis(df_momentum: pd.DataFrame, df_breakouts: pd.DataFrame
 ### Stocks at 52-Week High: {len(at_52w)} stocks
 ### Stocks at All-Time High: {len(at_ath)} stocks
 """
+    if grouped:
+        tech = df_momentum[df_momentum["Tech"] == True]["Ticker"].tolist()
+        at_highs_summary += f"### Tech & AI stocks at highs: {', '.join(tech) if tech else 'none'}\n"
+        tech_instructions = TECH_PICKS_TAGGED
+    else:
+        tech_instructions = TECH_PICKS_UNTAGGED
+    
+    model = DEFAULT_MODEL if llm is None else getattr(llm, "model_name", type(llm).__name__)
+    key = response_key(model, ANALYSIS_SYSTEM_PROMPT, ANALYSIS_HUMAN_PROMPT,
+                       tech_instructions, at_highs_summary, momentum_md, breakouts_md)
+    if cache_path:
+        cached = load_response_cache(cache_path).get(key)
+        if cached is not None:
+            print(f"Analysis cache hit ({key[:12]}); model not called")
+            return cached[1]
+    
+    # LangChain is only imported when an analysis actually runs
+    from langchain_openai import ChatOpenAI
+    from langchain_core.prompts import ChatPromptTemplate
     
     # Create prompt for high-focused analysis
     prompt_template = ChatPromptTemplate.from_messages([
-        ("system", """You are an expert technical analyst. The data provided contains S&P 500 stocks at 52-Week High or All-Time High.
-
-List ALL stocks in priority order:
-
-## 🏆 AT ALL-TIME HIGH (Highest Priority)
-(Stocks where At ATH = True)
-These are the strongest stocks - making new all-time highs.
-
-## 🔥 AT 52-WEEK HIGH ONLY
-(Stocks where At 52W High = True but At ATH = False)
-These stocks are at 52-week highs but were higher at some point in the past.
-
-For each stock show: Ticker, Name, Price, % from high, Sentiment
-Within each section, group by sentiment: Bullish first, then Neutral, then Bearish.
-
-Include ALL stocks from the data provided.
-
-## 💡 AI INSIGHTS - TOP Stock PICKS
-From the stocks listed above, pick up to 3-5 top stocks (if available) based on:
-- Bullish sentiment preferred
-- Stocks at ATH have priority over 52W high only
-- Strong momentum indicators
-
-For each recommendation, briefly explain why (1 sentence). Skip if none qualify.
-
-## 💡 AI INSIGHTS - TECH & AI Stock PICKS
-From the stocks listed above, pick up to 3-5 (if available) that are in these sectors:
-- Technology companies (software, hardware, cloud)
-- AI and machine learning companies
-- Semiconductors and chip makers
-- New-age digital/tech companies
-
-Only pick from the ATH or 52W high stocks listed above. Skip this section if no tech stocks are at highs."""),
-        ("human", """S&P 500 stocks at highs:
-
-{at_highs_summary}
-
-### Data:
-{momentum_table}
-{breakouts_section}
-
-Provide the complete list in priority order:""")
+        ("system", ANALYSIS_SYSTEM_PROMPT),
+        ("human", ANALYSIS_HUMAN_PROMPT),
     ])
     
     # Initialize LLM
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+    if llm is None:
+        llm = ChatOpenAI(model=DEFAULT_MODEL, temperature=0.1)
     
     # Create chain and run
     chain = prompt_template | llm
     
     response = chain.invoke({
+        "tech_instructions": tech_instructions,
         "at_highs_summary": at_highs_summary,
         "momentum_table": momentum_md,
         "breakouts_section": breakouts_md
     })
     
-    return response.content.strip()
+    analysis = response.content.strip()
+    if cache_path:
+        cache_response(key, analysis, cache_path)
+    return analysis
 
 
-def save_analysis_md(analysis_text: str):
-    """Save analysis to markdown file, prepending new entries at the top."""
-    now = datetime.now(timezone.utc)
-    timestamp = now.strftime("%Y-%m-%d %H:%M UTC")
-    
-    filepath = os.path.join(OUTPUT_DIR, "ai_analysis.md")
-    
-    new_entry = f"""---
-## {timestamp}
+def _parse_analysis_md(content: str) -> list:
+    """Split a rendered ai_analysis.md into entries, oldest first."""
+    parts = re.split(r"^---\n## (.+)\n\n", content, flags=re.M)
+    entries = [
+        {"timestamp": timestamp, "text": text.strip()}
+        for timestamp, text in zip(parts[1::2], parts[2::2])
+    ]
+    return entries[::-1]
 
-{analysis_text}
 
-"""
-    
-    # Read existing content if file exists
-    existing_content = ""
-    if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            existing_content = f.read()
+def _ensure_log():
+    """Import the legacy ai_analysis.md into the entry log on first use."""
+    if entry_log.exists(ANALYSIS_LOG) or not os.path.exists(ANALYSIS_FILE):
+        return
+    with open(ANALYSIS_FILE, "r", encoding="utf-8") as f:
+        entries = _parse_analysis_md(f.read())
+    entry_log.import_entries(ANALYSIS_LOG, entries)
+    print(f"Imported {len(entries)} analyses from {ANALYSIS_FILE} into {ANALYSIS_LOG}")
+
+
+def render_analysis_md(limit: int = RENDER_LIMIT, path: str = None) -> str:
+    """
+    Write the newest-first markdown view of the analysis log to path
+    (default: ANALYSIS_FILE). Only the newest `limit` entries are read
+    (None renders the whole log).
+    """
+    path = path or ANALYSIS_FILE
+    _ensure_log()
+    parts = [ANALYSIS_HEADER]
+    for entry in entry_log.read_entries(ANALYSIS_LOG, limit):
+        parts.append(f"""---
+## {entry["timestamp"]}
+
+{entry["text"]}
+
+""")
     
-    # Prepend new entry (newest at top)
-    header = "# S&P 500 High Tracker - AI Analysis\n\n"
-    if existing_content.startswith(header):
-        existing_content = existing_content[len(header):]
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(parts))
+
+    storage.atomic_write(path, write)
+    return path
+
+
+def save_analysis_md(analysis_text: str, when: datetime = None, entry_id: str = None):
+    """
+    Append an analysis to the entry log and re-render ai_analysis.md
+    (newest at top).
     
-    content = header + new_entry + existing_content
+    Args:
+        analysis_text: Analysis markdown
+        when: Time the analysed data was captured (defaults to now)
+        entry_id: Stored with the entry; if one of the newest LOG_KEEP entries
+            already has it, nothing is appended (a re-saved queue job)
+    """
+    now = when or datetime.now(timezone.utc)
+    timestamp = now.strftime("%Y-%m-%d %H:%M UTC")
     
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(content)
+    _ensure_log()
+    if entry_id is not None and entry_log.has_entry(ANALYSIS_LOG, entry_id, LOG_KEEP):
+        print(f"Analysis {entry_id} already saved; not appending it again")
+        return render_analysis_md()
+    entry_log.append_entry(ANALYSIS_LOG, timestamp, analysis_text, entry_id)
+    archived = entry_log.maybe_compact(ANALYSIS_LOG, LOG_KEEP)
+    if archived:
+        print(f"Archived {archived} old analyses to {entry_log.archive_path(ANALYSIS_LOG)}")
     
-    return filepath
+    return render_analysis_md()
 
 
-def main(df_momentum: pd.DataFrame = None, df_breakouts: pd.DataFrame = None):
+def main(df_momentum: pd.DataFrame = None, df_breakouts: pd.DataFrame = None, llm=None):
     """
     Main function to generate AI analysis.
     
     Args:
         df_momentum: Pre-computed momentum DataFrame (optional)
         df_breakouts: Pre-computed breakouts DataFrame (optional)
+        llm: Chat model to use (defaults to gpt-4o-mini, see generate_high_analysis)
     """
     print("\n=== Generating AI High Analysis ===")
     
@@ -174,14 +425,14 @@ def main(df_momentum: pd.DataFrame = None, df_breakouts: pd.DataFrame = None):
         if df_latest.empty:
             print("No recent data to analyze.")
             return
-        df_momentum = df_latest
+        df_momentum = sectors.add_sectors(df_latest)
         df_breakouts = pd.DataFrame()
     
     if df_breakouts is None:
         df_breakouts = pd.DataFrame()
     
     # Generate analysis
-    analysis = generate_high_analysis(df_momentum, df_breakouts)
+    analysis = generate_high_analysis(df_momentum, df_breakouts, llm=llm)
     
     print(f"\n{analysis}\n")
     
@@ -191,4 +442,15 @@ def main(df_momentum: pd.DataFrame = None, df_breakouts: pd.DataFrame = None):
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="NASDAQ High Tracker AI analysis")
+    parser.add_argument(
+        "--render",
+        action="store_true",
+        help="Only re-render output/ai_analysis.md from the full analysis log"
+    )
+    args = parser.parse_args()
+    
+    if args.render:
+        print(f"Rendered {render_analysis_md(limit=None)}")
+    else:
+        main()
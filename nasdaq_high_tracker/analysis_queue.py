@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Background AI analysis queue for NASDAQ High Tracker.
+The tracker enqueues the momentum/breakout tables of a run and returns;
+queued jobs are analysed later by `python analysis_queue.py`.
+
+Layout (one JSON file per job, moved between directories):
+    output/analysis_queue/pending/      waiting to be analysed
+    output/analysis_queue/processing/   claimed by a worker
+    output/analysis_queue/done/         analysed and saved to ai_analysis.md
+    output/analysis_queue/failed/       gave up after all retries
+
+Claiming a job is an atomic rename from pending/ to processing/, so several
+queue processors can run at once without analysing a job twice.
+
+Usage:
+    python analysis_queue.py                # Process all pending jobs
+    python analysis_queue.py --workers 4    # Analyse up to 4 jobs concurrently
+    python analysis_queue.py --fake         # Use a fake chat model (no OpenAI calls)
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import storage
+
+# Get the directory where this script is located
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
+QUEUE_DIR = os.path.join(OUTPUT_DIR, "analysis_queue")
+STATES = ("pending", "processing", "done", "failed")
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 2.0
+STALE_AFTER = 30 * 60   # seconds before a claimed job is assumed abandoned
+KEEP_DONE = 50          # finished jobs kept in done/
+
+
+def _state_dir(state: str, queue_dir: str = QUEUE_DIR) -> str:
+    return os.path.join(queue_dir, state)
+
+
+def _jobs(state: str, queue_dir: str = QUEUE_DIR) -> list:
+    """Job file names in a state directory, oldest first."""
+    path = _state_dir(state, queue_dir)
+    if not os.path.isdir(path):
+        return []
+    return sorted(name for name in os.listdir(path) if name.endswith(".json"))
+
+
+def _write_job(job: dict, path: str):
+    """Write a job file (see storage.atomic_write)."""
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, separators=(",", ":"))
+
+    storage.atomic_write(path, write)
+
+
+def _read_frame(data: str) -> pd.DataFrame:
+    if not data:
+        return pd.DataFrame()
+    return pd.read_json(io.StringIO(data), orient="split")
+
+
+def enqueue(
+    df_momentum: pd.DataFrame,
+    df_breakouts: pd.DataFrame,
+    queue_dir: str = QUEUE_DIR,
+) -> str:
+    """
+    Queue one analysis job for the tables of a tracker run.
+
+    Returns:
+        Path of the pending job file
+    """
+    for state in STATES:
+        os.makedirs(_state_dir(state, queue_dir), exist_ok=True)
+
+    created = datetime.now(timezone.utc)
+    job_id = created.strftime("%Y%m%dT%H%M%S%f")
+    job = {
+        "id": job_id,
+        "created": created.isoformat(),
+        "attempts": 0,
+        "error": None,
+        "momentum": df_momentum.to_json(orient="split", index=False),
+        "breakouts": None if df_breakouts is None or df_breakouts.empty
+                     else df_breakouts.to_json(orient="split", index=False),
+    }
+    path = os.path.join(_state_dir("pending", queue_dir), f"{job_id}.json")
+    _write_job(job, path)
+    return path
+
+
+def pending_count(queue_dir: str = QUEUE_DIR) -> int:
+    """Number of jobs waiting to be analysed."""
+    return len(_jobs("pending", queue_dir))
+
+
+def requeue_stale(stale_after: float = STALE_AFTER, queue_dir: str = QUEUE_DIR) -> int:
+    """Move jobs claimed longer than stale_after seconds ago back to pending/."""
+    now = time.time()
+    requeued = 0
+    for name in _jobs("processing", queue_dir):
+        path = os.path.join(_state_dir("processing", queue_dir), name)
+        try:
+            if now - os.path.getmtime(path) < stale_after:
+                continue
+            os.rename(path, os.path.join(_state_dir("pending", queue_dir), name))
+            requeued += 1
+        except OSError:
+            continue  # picked up by another processor
+    return requeued
+
+
+def claim(name: str, queue_dir: str = QUEUE_DIR) -> str:
+    """Claim a pending job. Returns its processing/ path, or None if already taken."""
+    path = os.path.join(_state_dir("processing", queue_dir), name)
+    try:
+        os.rename(os.path.join(_state_dir("pending", queue_dir), name), path)
+    except OSError:
+        return None
+    os.utime(path)  # staleness is measured from the claim
+    return path
+
+
+def analyse_job(
+    job: dict,
+    llm=None,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+) -> str:
+    """
+    Run the LLM analysis for one job, retrying with exponential backoff.
+    job["attempts"] and job["error"] are updated in place.
+
+    Raises:
+        The last error once all attempts have failed
+    """
+    import agent  # deferred: pulls in LangChain
+
+    df_momentum = _read_frame(job["momentum"])
+    df_breakouts = _read_frame(job["breakouts"])
+    for attempt in range(retries + 1):
+        job["attempts"] += 1
+        try:
+            return agent.generate_high_analysis(df_momentum, df_breakouts, llm=llm)
+        except Exception as e:
+            job["error"] = f"{type(e).__name__}: {e}"
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            print(f"Warning: analysis {job['id']} failed ({job['error']}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _prune_done(keep: int, queue_dir: str):
+    names = _jobs("done", queue_dir)
+    for name in names[:max(0, len(names) - keep)]:
+        os.remove(os.path.join(_state_dir("done", queue_dir), name))
+
+
+def process_queue(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    llm=None,
+    queue_dir: str = QUEUE_DIR,
+    keep_done: int = KEEP_DONE,
+) -> dict:
+    """
+    Analyse every pending job, at most max_workers at a time.
+
+    Analyses run concurrently, but results are saved to ai_analysis.md one at
+    a time in job order, so entries stay newest-first.
+
+    Args:
+        max_workers: Concurrent LLM requests
+        retries: Retries per job after the first attempt
+        backoff: Base delay in seconds between retries (doubles each retry)
+        llm: Chat model passed to agent.generate_high_analysis (None = default)
+        queue_dir: Queue directory
+        keep_done: Finished jobs kept in done/
+
+    Returns:
+        {"done": n, "failed": n} for this call
+    """
+    import agent
+
+    counts = {"done": 0, "failed": 0}
+    requeued = requeue_stale(queue_dir=queue_dir)
+    if requeued:
+        print(f"Requeued {requeued} abandoned analysis jobs")
+
+    claimed = [path for path in (claim(n, queue_dir) for n in _jobs("pending", queue_dir)) if path]
+    if not claimed:
+        print("No pending analysis jobs.")
+        return counts
+
+    jobs = []
+    for path in claimed:
+        with open(path, "r", encoding="utf-8") as f:
+            jobs.append((path, json.load(f)))
+
+    print(f"\n=== Analysing {len(jobs)} queued runs ({max_workers} workers) ===")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as pool:
+        futures = [pool.submit(analyse_job, job, llm, retries, backoff) for _, job in jobs]
+
+        for (path, job), future in zip(jobs, futures):
+            name = os.path.basename(path)
+            try:
+                analysis = future.result()
+            except Exception as e:
+                print(f"Warning: giving up on analysis {job['id']} after {job['attempts']} attempts: {e}")
+                _write_job(job, os.path.join(_state_dir("failed", queue_dir), name))
+                os.remove(path)
+                counts["failed"] += 1
+                continue
+
+            # Saved under the job id: a job requeued after a crash past this
+            # point is not appended to the log a second time
+            filepath = agent.save_analysis_md(analysis, datetime.fromisoformat(job["created"]), job["id"])
+            job["error"] = None
+            _write_job(job, os.path.join(_state_dir("done", queue_dir), name))
+            os.remove(path)
+            counts["done"] += 1
+            print(f"Analysis for run {job['created']} saved to {filepath}")
+
+    _prune_done(keep_done, queue_dir)
+    print(f"Analysis queue: {counts['done']} done, {counts['failed']} failed "
+          f"in {time.perf_counter() - start:.2f}s")
+    return counts
+
+
+def fake_llm():
+    """Fake chat model returning a canned analysis (for testing without OpenAI)."""
+    from langchain_core.language_models import FakeListChatModel
+
+    return FakeListChatModel(responses=["**Fake analysis** - no model was called."])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NASDAQ High Tracker AI analysis queue")
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Jobs analysed concurrently (default: {DEFAULT_MAX_WORKERS})"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=f"Retries per job after the first attempt (default: {DEFAULT_RETRIES})"
+    )
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="Use a fake chat model instead of OpenAI"
+    )
+    args = parser.parse_args()
+
+    process_queue(
+        max_workers=args.workers,
+        retries=args.retries,
+        llm=fake_llm() if args.fake else None,
+    )
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark for tracker.detect_new_highs.
+Compares the vectorized implementation with the original per-ticker loop on
+synthetic histories and checks that both return identical output.
+
+Usage:
+    python benchmarks/bench_detect_new_highs.py
+    python benchmarks/bench_detect_new_highs.py --rows 2000000 --tickers 1000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracker import detect_new_highs
+
+
+def detect_new_highs_loop(df_hist: pd.DataFrame) -> pd.DataFrame:
+    """Original implementation: Python loop over groupby("Ticker")."""
+    if df_hist.empty:
+        return pd.DataFrame()
+    
+    df_hist = df_hist.sort_values(["Ticker", "timestamp"], kind="stable")
+    
+    breakouts = []
+    for ticker, g in df_hist.groupby("Ticker"):
+        if len(g) < 2:
+            continue
+        
+        g = g.reset_index(drop=True)
+        current = g.iloc[-1]
+        previous = g.iloc[-2]
+        
+        new_52w = (
+            current.get("At 52W High", False) == True and 
+            previous.get("At 52W High", False) == False
+        )
+        new_ath = (
+            current.get("At ATH", False) == True and 
+            previous.get("At ATH", False) == False
+        )
+        
+        if new_52w or new_ath:
+            breakouts.append({
+                "Ticker": ticker,
+                "Name": current.get("Name"),
+                "Price": current["Price"],
+                "New 52W High": new_52w,
+                "New ATH": new_ath,
+                "% From 52W High": current.get("% From 52W High"),
+                "% From ATH": current.get("% From ATH"),
+                "Sentiment": current.get("Sentiment"),
+            })
+    
+    return pd.DataFrame(breakouts)
+
+
+def synthetic_history(rows: int, tickers: int, seed: int = 0) -> pd.DataFrame:
+    """Build a random history of `rows` rows spread over `tickers` tickers."""
+    rng = np.random.default_rng(seed)
+    symbols = np.array([f"T{i:05d}" for i in range(tickers)])
+    start = pd.Timestamp("2020-01-01", tz="UTC")
+    
+    df = pd.DataFrame({
+        "timestamp": start + pd.to_timedelta(rng.integers(0, 5 * 365 * 24, rows), unit="h"),
+        "Ticker": symbols[rng.integers(0, tickers, rows)],
+        "Price": rng.uniform(10, 500, rows),
+        "% From 52W High": rng.uniform(-10, 0, rows),
+        "% From ATH": rng.uniform(-30, 0, rows),
+        "At 52W High": rng.random(rows) < 0.5,
+        "At ATH": rng.random(rows) < 0.3,
+        "Sentiment": rng.choice(["Bullish", "Neutral", "Bearish"], rows),
+    })
+    df["Name"] = df["Ticker"] + " Inc."
+    return df
+
+
+def timed(fn, *args, repeat: int = 1) -> tuple:
+    """Run fn repeat times and return (best seconds, last result)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(rows: int, tickers: int, repeat: int):
+    print(f"Building synthetic history: {rows:,} rows, {tickers:,} tickers...")
+    df = synthetic_history(rows, tickers)
+    
+    t_loop, expected = timed(detect_new_highs_loop, df, repeat=repeat)
+    t_vec, actual = timed(detect_new_highs, df, repeat=repeat)
+    
+    pd.testing.assert_frame_equal(actual, expected)
+    
+    print(f"  loop:       {t_loop:8.3f}s")
+    print(f"  vectorized: {t_vec:8.3f}s")
+    print(f"  speedup:    {t_loop / t_vec:8.1f}x  ({len(actual)} breakouts, outputs identical)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark detect_new_highs")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="History rows")
+    parser.add_argument("--tickers", type=int, default=500, help="Distinct tickers")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation (best is reported)")
+    args = parser.parse_args()
+    
+    main(args.rows, args.tickers, args.repeat)
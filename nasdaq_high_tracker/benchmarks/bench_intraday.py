@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Per-poll latency of the intraday tracker (intraday.py), fully offline.
+
+Prices are replayed from a synthetic fixture (tracker_core.providers.ReplayProvider)
+with a fixed latency per request. Between polls every price takes a random
+step and a few tickers jump above their 52-week high, so each poll has
+breakouts to emit and rows to save. Each size runs in its own subprocess
+on a temporary copy of the tracker, on top of --runs days of history.
+
+Reported per size: startup (full snapshot and state load), then the
+median, 95th percentile and worst poll, the price request alone, breakouts
+emitted and requests made per poll.
+
+Usage:
+    python benchmarks/bench_intraday.py
+    python benchmarks/bench_intraday.py --sizes 500 --polls 50 --latency 0.5
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+from bench_pipeline import TRACKER_DIR, CORE_DIR, seed_history
+
+DEFAULT_SIZES = [20, 500, 5000]
+DEFAULT_POLLS = 20
+DEFAULT_LATENCY = 0.2       # seconds per replayed request
+DEFAULT_RUNS = 30           # days of history before the tracker starts
+DEFAULT_BREAKOUTS = 0.01    # fraction of tickers pushed to a new high per poll
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_child(tickers: int, polls: int, latency: float, runs: int, breakouts: float):
+    """Start the intraday tracker and poll it; runs inside a temporary copy of the tracker."""
+    sys.path.insert(0, os.getcwd())
+    import snapshot
+    import intraday
+    from tracker_core import providers
+
+    symbols = [f"T{i:04d}" for i in range(tickers)]
+    with open(snapshot.TICKER_FILE, "w", encoding="utf-8") as f:
+        f.writelines(f"{ticker}\n" for ticker in symbols)
+    fixture = providers.synthetic_fixture(symbols, days=400 + runs)
+    seed_history(symbols, fixture, runs)
+
+    provider = providers.ReplayProvider(fixture, latency=latency)
+    daemon = intraday.IntradayTracker(provider=provider, interval=0)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        daemon.start()
+    startup = time.perf_counter() - start
+
+    rng = random.Random(1)
+    quotes = fixture["quotes"]
+    results = []
+    for _ in range(polls):
+        for ticker in symbols:
+            quotes[ticker]["price"] *= 1 + rng.gauss(0, 0.002)
+        for ticker in rng.sample(symbols, max(1, int(tickers * breakouts))):
+            quotes[ticker]["price"] = daemon.quotes[ticker]["52W High"] * 1.05
+        requests = provider.requests
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = daemon.poll()
+        stats["requests"] = provider.requests - requests
+        results.append(stats)
+
+    totals = [r["total"] for r in results]
+    print("RESULT " + json.dumps({
+        "startup": startup,
+        "median": percentile(totals, 0.5),
+        "p95": percentile(totals, 0.95),
+        "max": max(totals),
+        "fetch": percentile([r["fetch"] for r in results], 0.5),
+        "breakouts": sum(r["breakouts"] for r in results) / len(results),
+        "requests": sum(r["requests"] for r in results) / len(results),
+    }))
+
+
+def run_size(tickers: int, polls: int, latency: float, runs: int, breakouts: float) -> dict:
+    """Benchmark one universe size in a subprocess on a temporary copy of the tracker."""
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = os.path.join(tmp, os.path.basename(TRACKER_DIR))
+        shutil.copytree(TRACKER_DIR, work_dir,
+                        ignore=shutil.ignore_patterns("output", "benchmarks", "__pycache__", "*.png"))
+        shutil.copytree(CORE_DIR, os.path.join(tmp, "tracker_core"),
+                        ignore=shutil.ignore_patterns("__pycache__", "benchmarks"))
+        command = [sys.executable, os.path.abspath(__file__), "--child",
+                   "--sizes", str(tickers), "--polls", str(polls), "--latency", str(latency),
+                   "--runs", str(runs), "--breakouts", str(breakouts)]
+        proc = subprocess.run(command, cwd=work_dir, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(f"benchmark for {tickers} tickers failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+
+
+def main(args):
+    print(f"Intraday polls offline: {args.latency * 1000:.0f} ms/request, {args.polls} polls, "
+          f"{args.breakouts:.0%} of tickers breaking out per poll\n")
+    columns = ["startup", "median", "p95", "max", "fetch"]
+    print(f"{'tickers':>7} " + " ".join(f"{c:>9}" for c in columns) + f" {'breakouts':>9} {'requests':>9}")
+    for size in args.sizes:
+        stats = run_size(size, args.polls, args.latency, args.runs, args.breakouts)
+        print(f"{size:>7} " + " ".join(f"{stats[c]:>8.3f}s" for c in columns)
+              + f" {stats['breakouts']:>9.1f} {stats['requests']:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark intraday polling without network access")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help=f"Universe sizes to run (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument("--polls", type=int, default=DEFAULT_POLLS,
+                        help=f"Polls per size (default: {DEFAULT_POLLS})")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help=f"Seconds per replayed request (default: {DEFAULT_LATENCY})")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help=f"Days of history before the tracker starts (default: {DEFAULT_RUNS})")
+    parser.add_argument("--breakouts", type=float, default=DEFAULT_BREAKOUTS,
+                        help=f"Fraction of tickers pushed to a new high per poll (default: {DEFAULT_BREAKOUTS})")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.sizes[0], args.polls, args.latency, args.runs, args.breakouts)
+    else:
+        main(args)
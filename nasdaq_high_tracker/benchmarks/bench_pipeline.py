@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for tracker.main, fully offline.
+
+Quotes, history and news are replayed from a synthetic fixture
+(tracker_core.providers.ReplayProvider) with a fixed latency per request,
+and the AI analysis runs inline against a fake chat model. Each size runs
+in its own subprocess on a temporary copy of the tracker, on top of
+--runs days of existing history.
+
+Stages timed (the rest of tracker.main is reported as "other"):
+    snapshot   quotes and highs for every ticker
+    sentiment  news and scoring for the stocks at highs
+    history    history append, last prices and latest-state update
+    momentum   breakout detection and momentum
+    agent      prompt building, (fake) model call and analysis log
+    render     waiting for the background news image render
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 20 500 --latency 0.05 --batched
+    python benchmarks/bench_pipeline.py --save baseline.json
+    python benchmarks/bench_pipeline.py --baseline baseline.json --tolerance 0.3
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from datetime import datetime, timedelta, timezone
+
+TRACKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_DIR = os.path.join(os.path.dirname(TRACKER_DIR), "tracker_core")
+
+STAGES = ["snapshot", "sentiment", "history", "momentum", "agent", "render"]
+DEFAULT_SIZES = [20, 500, 5000]
+DEFAULT_LATENCY = 0.02    # seconds per replayed request
+DEFAULT_RUNS = 30         # days of history before the measured run
+DEFAULT_TOLERANCE = 0.25  # allowed slowdown vs --baseline before failing
+DEFAULT_WORKERS = 16
+
+
+def timed(stats: dict, stage: str, fn):
+    """Wrap fn so its time is added to stats[stage]."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stats[stage] = stats.get(stage, 0.0) + time.perf_counter() - start
+    return wrapper
+
+
+def seed_history(tickers: list, fixture: dict, runs: int):
+    """Store one run per day for the last `runs` days, priced from the fixture bars."""
+    import pandas as pd
+    import snapshot
+    import tracker
+    import history_store
+    import latest_state
+    from tracker_core import changes
+
+    start = datetime.now(timezone.utc) - timedelta(days=runs)
+    for day in range(runs):
+        rows = []
+        for ticker in tickers:
+            highs = fixture["bars"][ticker]["High"]
+            quote = fixture["quotes"][ticker]
+            bar = len(highs) - runs + day
+            rows.append(snapshot.build_quote(
+                ticker, quote["name"], highs[bar], quote["market_cap"],
+                max(highs[max(0, bar - 251):bar + 1]), quote["year_low"], max(highs[:bar + 1]),
+            ))
+        df = pd.DataFrame(rows).assign(timestamp=start + timedelta(days=day))
+        # The tracker only stores stocks at highs
+        history_store.append_history(df[(df["At 52W High"] == True) | (df["At ATH"] == True)])
+
+    latest_state.rebuild_state()
+    # Last prices from yesterday's bars, so every ticker has moved
+    last_prices = pd.Series({t: fixture["bars"][t]["High"][-1] for t in tickers}, dtype=float)
+    changes.save_last_prices(last_prices, tracker.LAST_PRICES_FILE)
+
+
+def run_child(tickers: int, latency: float, runs: int, batched: bool, workers: int):
+    """Run tracker.main once; runs inside a temporary copy of the tracker."""
+    sys.path.insert(0, os.getcwd())
+    import snapshot
+    import sentiment
+    import tracker
+    import agent
+    import analysis_queue
+    from tracker_core import providers
+
+    symbols = [f"T{i:04d}" for i in range(tickers)]
+    with open(snapshot.TICKER_FILE, "w", encoding="utf-8") as f:
+        f.writelines(f"{ticker}\n" for ticker in symbols)
+    fixture = providers.synthetic_fixture(symbols, days=400 + runs)
+
+    stats = {}
+    start = time.perf_counter()
+    seed_history(symbols, fixture, runs)
+    setup = time.perf_counter() - start
+
+    snapshot.main = timed(stats, "snapshot", snapshot.main)
+    sentiment.main = timed(stats, "sentiment", sentiment.main)
+    tracker.save_history = timed(stats, "history", tracker.save_history)
+    tracker.changes.save_last_prices = timed(stats, "history", tracker.changes.save_last_prices)
+    tracker.latest_state.update_state = timed(stats, "history", tracker.latest_state.update_state)
+    tracker.detect_new_highs = timed(stats, "momentum", tracker.detect_new_highs)
+    tracker.compute_momentum = timed(stats, "momentum", tracker.compute_momentum)
+    agent.main = timed(stats, "agent", agent.main)
+    tracker.render.Renderer.finish = timed(stats, "render", tracker.render.Renderer.finish)
+
+    provider = providers.ReplayProvider(fixture, latency=latency)
+    llm = analysis_queue.fake_llm()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracker.main(
+            max_workers=workers,
+            batched=batched,
+            analysis="inline",
+            provider=provider,
+            llm=llm,
+        )
+    stats["total"] = time.perf_counter() - start
+    stats["other"] = stats["total"] - sum(stats.get(s, 0.0) for s in STAGES)
+    stats["requests"] = provider.requests
+    stats["setup"] = setup
+    print("RESULT " + json.dumps(stats))
+
+
+def run_size(tickers: int, latency: float, runs: int, batched: bool, workers: int) -> dict:
+    """Benchmark one universe size in a subprocess on a temporary copy of the tracker."""
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = os.path.join(tmp, os.path.basename(TRACKER_DIR))
+        shutil.copytree(TRACKER_DIR, work_dir,
+                        ignore=shutil.ignore_patterns("output", "benchmarks", "__pycache__", "*.png"))
+        shutil.copytree(CORE_DIR, os.path.join(tmp, "tracker_core"),
+                        ignore=shutil.ignore_patterns("__pycache__", "benchmarks"))
+        command = [sys.executable, os.path.abspath(__file__), "--child",
+                   "--sizes", str(tickers), "--latency", str(latency),
+                   "--runs", str(runs), "--workers", str(workers)]
+        if batched:
+            command.append("--batched")
+        proc = subprocess.run(command, cwd=work_dir, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(f"benchmark for {tickers} tickers failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return (size, stage, seconds, baseline seconds) for stages slower than allowed."""
+    regressions = []
+    for size, stats in results.items():
+        for stage in STAGES + ["total"]:
+            before = baseline.get(size, {}).get(stage)
+            if before and stats.get(stage, 0.0) > before * (1 + tolerance):
+                regressions.append((size, stage, stats[stage], before))
+    return regressions
+
+
+def main(args) -> int:
+    mode = "batched" if args.batched else "per-ticker history"
+    print(f"tracker.main offline: {args.latency * 1000:.0f} ms/request, {args.workers} workers, "
+          f"{mode}, {args.runs} days of history\n")
+    print(f"{'tickers':>7} " + " ".join(f"{s:>10}" for s in STAGES + ["other", "total"]) + f" {'requests':>9}")
+
+    results = {}
+    for size in args.sizes:
+        stats = run_size(size, args.latency, args.runs, args.batched, args.workers)
+        results[str(size)] = stats
+        print(f"{size:>7} " + " ".join(f"{stats.get(s, 0.0):>9.3f}s" for s in STAGES + ["other", "total"])
+              + f" {stats['requests']:>9}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for size, stage, seconds, before in regressions:
+            print(f"REGRESSION {size} tickers {stage}: {seconds:.3f}s vs {before:.3f}s")
+        if regressions:
+            return 1
+        print(f"\nNo stage slower than baseline by more than {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tracker.main end to end without network access")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help=f"Universe sizes to run (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help=f"Seconds per replayed request (default: {DEFAULT_LATENCY})")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help=f"Days of history before the measured run (default: {DEFAULT_RUNS})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Quotes fetched concurrently (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--batched", action="store_true", help="Download highs in multi-ticker batches")
+    parser.add_argument("--save", metavar="FILE", help="Save results as JSON (a baseline for later runs)")
+    parser.add_argument("--baseline", metavar="FILE", help="Fail if a stage is slower than in this saved run")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed slowdown vs baseline (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.sizes[0], args.latency, args.runs, args.batched, args.workers)
+    else:
+        sys.exit(main(args))
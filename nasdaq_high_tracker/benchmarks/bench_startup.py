@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the tracker CLI.
+Runs `python -X importtime -c "import tracker"` in a fresh interpreter,
+reports the slowest imports and checks the total against STARTUP_BUDGET_MS.
+Also checks that the cached / no-price-change path never loads the heavy
+optional modules (matplotlib, LangChain, NLTK, yfinance).
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 800 --top 15
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+TRACKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_DIR = os.path.join(os.path.dirname(TRACKER_DIR), "tracker_core")
+
+# Budget for `import tracker` (cumulative import time, milliseconds)
+STARTUP_BUDGET_MS = 1500
+
+# Modules that only the sentiment / AI / live-fetch stages may import
+HEAVY_MODULES = ["matplotlib", "langchain_core", "langchain_openai", "nltk", "yfinance"]
+
+# The --use-cache path up to the "No price changes" early exit
+CACHED_PATH = """
+import sys, tracker
+df = tracker.load_snapshot_from_file()
+last_prices = tracker.load_last_prices()
+tracker.changes.price_changes(df, last_prices)
+print("HEAVY:" + ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def import_times() -> list:
+    """Return [(cumulative_us, self_us, module)] from -X importtime for `import tracker`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import tracker"],
+        cwd=TRACKER_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    return rows
+
+
+def heavy_modules_on_cached_path() -> list:
+    """
+    Run the cached no-change path in a fresh interpreter and list heavy modules
+    it loaded. Runs on a temporary copy of the tracker so output/ is untouched.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = os.path.join(tmp, os.path.basename(TRACKER_DIR))
+        shutil.copytree(TRACKER_DIR, work_dir, ignore=shutil.ignore_patterns("benchmarks", "__pycache__"))
+        shutil.copytree(CORE_DIR, os.path.join(tmp, "tracker_core"), ignore=shutil.ignore_patterns("__pycache__"))
+        result = subprocess.run(
+            [sys.executable, "-c", CACHED_PATH.format(heavy=HEAVY_MODULES)],
+            cwd=work_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    loaded = next(
+        (line[len("HEAVY:"):] for line in result.stdout.splitlines() if line.startswith("HEAVY:")),
+        "",
+    )
+    return [m for m in loaded.split(",") if m]
+
+
+def main(budget_ms: float, top: int) -> int:
+    rows = import_times()
+    tracker_row = next(r for r in rows if r[2].strip() == "tracker")
+    total_ms = tracker_row[0] / 1000
+
+    print(f"Slowest imports under `import tracker` (cumulative):")
+    for cumulative_us, self_us, module in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {module}")
+
+    failures = 0
+    status = "OK" if total_ms <= budget_ms else "OVER BUDGET"
+    print(f"\nimport tracker: {total_ms:.1f} ms (budget {budget_ms:.0f} ms) {status}")
+    if total_ms > budget_ms:
+        failures += 1
+
+    loaded = heavy_modules_on_cached_path()
+    if loaded:
+        print(f"Cached path loaded heavy modules: {', '.join(loaded)}  FAIL")
+        failures += 1
+    else:
+        print(f"Cached path loaded none of: {', '.join(HEAVY_MODULES)}  OK")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tracker startup")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="Import time budget")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to show")
+    args = parser.parse_args()
+
+    sys.exit(main(args.budget_ms, args.top))
@@ -2,63 +2,260 @@
 """
 Fetch all S&P 500 tickers from Wikipedia and save to ticker.txt.
 Run this manually to update the ticker list.
+
+The ticker universe is kept in output/universe/:
+    page_meta.json      ETag / Last-Modified of the last parsed page
+    constituents.json   per-ticker metadata (name, sector, industry, dates)
+    changes.jsonl       one line per refresh that added or removed tickers
+
+A refresh sends If-None-Match / If-Modified-Since, so an unchanged page is
+neither downloaded nor parsed again. Only the constituents table is parsed.
+
+Usage:
+    python fetch_tickers.py            # Conditional refresh
+    python fetch_tickers.py --force    # Download and parse even if unchanged
 """
 
 import io
+import os
+import sys
+import json
+import argparse
+from datetime import datetime, timezone
+
 import requests
 import pandas as pd
 
+import snapshot
+import sectors
+import highs_store
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import storage
+
+URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+
+# Get the directory where this script is located
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+UNIVERSE_DIR = os.path.join(SCRIPT_DIR, "output", "universe")
+PAGE_META_FILE = os.path.join(UNIVERSE_DIR, "page_meta.json")
+CONSTITUENTS_FILE = sectors.CONSTITUENTS_FILE
+CHANGES_FILE = os.path.join(UNIVERSE_DIR, "changes.jsonl")
+
+# Use requests with a User-Agent header to avoid 403 Forbidden
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+# Constituents table column -> metadata key
+METADATA_COLUMNS = {
+    "Security": "Name",
+    "GICS Sector": "Sector",
+    "GICS Sub-Industry": "Industry",
+    "Date added": "Added",
+}
+
+
+def _read_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read {path}: {e}")
+        return default
+
+
+def _write_text(path: str, text: str):
+    """Write a file (see storage.atomic_write)."""
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    storage.atomic_write(path, write)
+
+
+def fetch_page(force: bool = False) -> tuple:
+    """
+    Download the Wikipedia page unless it is unchanged since the last fetch.
+
+    Conditional headers are only sent once constituents.json exists, so a
+    304 always has parsed constituents to fall back on. The new validators
+    are returned rather than saved: call save_page_meta() once the page has
+    been parsed, so a page that fails to parse is downloaded again next run.
+
+    Returns:
+        (html, meta) - both None when the server answered 304 Not Modified
+    """
+    meta = _read_json(PAGE_META_FILE, {})
+    headers = dict(HEADERS)
+    if not force and os.path.exists(CONSTITUENTS_FILE):
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = requests.get(URL, headers=headers, timeout=30)
+    if response.status_code == 304:
+        print("S&P 500 page not modified since last fetch; using stored constituents.")
+        return None, None
+    response.raise_for_status()
+
+    meta = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched": datetime.now(timezone.utc).isoformat(),
+    }
+    return response.text, meta
+
+
+def save_page_meta(meta: dict):
+    """Store the validators of a page whose constituents were saved."""
+    _write_text(PAGE_META_FILE, json.dumps(meta, indent=2))
+
+
+def constituents_html(html: str) -> str:
+    """
+    Cut the constituents table (id="constituents") out of the page so only
+    that table is parsed. Returns the whole page if the table is not found.
+    """
+    marker = html.find('id="constituents"')
+    if marker == -1:
+        return html
+    start = html.rfind("<table", 0, marker)
+    end = html.find("</table>", marker)
+    if start == -1 or end == -1:
+        return html
+    return html[start:end + len("</table>")]
+
+
+def parse_constituents(html: str) -> pd.DataFrame:
+    """
+    Parse the constituents table.
+
+    Returns:
+        DataFrame with Ticker plus the METADATA_COLUMNS values that exist
+    """
+    table = pd.read_html(io.StringIO(constituents_html(html)), match="Symbol")[0]
+
+    # Clean up tickers (some have dots like BRK.B, replace with dash for yfinance)
+    df = pd.DataFrame({"Ticker": table["Symbol"].astype(str).str.replace(".", "-", regex=False)})
+    for column, key in METADATA_COLUMNS.items():
+        if column in table.columns:
+            df[key] = table[column].astype(str).where(table[column].notna(), None)
+    return df.sort_values("Ticker").reset_index(drop=True)
+
+
+def load_universe() -> dict:
+    """Load per-ticker metadata {ticker: {Name, Sector, Industry, Added, First Seen}}."""
+    return _read_json(CONSTITUENTS_FILE, {})
+
+
+def load_changes() -> list:
+    """Load the recorded universe changes, oldest first."""
+    if not os.path.exists(CHANGES_FILE):
+        return []
+    with open(CHANGES_FILE, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def diff_universe(old: dict, new: dict) -> dict:
+    """Tickers added to and removed from the universe."""
+    return {
+        "added": sorted(set(new) - set(old)),
+        "removed": sorted(set(old) - set(new)),
+    }
+
+
+def update_universe(df: pd.DataFrame) -> tuple:
+    """
+    Store the parsed constituents and record what changed.
+
+    Returns:
+        (universe, diff) - diff is empty on the first run, which only
+        establishes the baseline
+    """
+    old = load_universe()
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    universe = {}
+    for row in df.to_dict("records"):
+        ticker = row.pop("Ticker")
+        row["First Seen"] = old.get(ticker, {}).get("First Seen", today)
+        universe[ticker] = row
+
+    diff = diff_universe(old, universe) if old else diff_universe(universe, universe)
+    _write_text(CONSTITUENTS_FILE, json.dumps(universe, indent=1, sort_keys=True))
+
+    if diff["added"] or diff["removed"]:
+        with open(CHANGES_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"date": today, **diff}) + "\n")
+    return universe, diff
 
-def fetch_sp500_tickers() -> list:
+
+def invalidate_removed(removed: list) -> int:
+    """Drop removed tickers from the highs store. Returns entries dropped."""
+    with storage.file_lock(highs_store.STORE_FILE):
+        store = highs_store.load_store()
+        dropped = [t for t in removed if t in store]
+        if dropped:
+            for ticker in dropped:
+                del store[ticker]
+            highs_store.save_store(store)
+    return len(dropped)
+
+
+def fetch_sp500_tickers(force: bool = False) -> list:
     """
     Fetch current S&P 500 constituents from Wikipedia.
     Returns list of ticker symbols.
     """
-    url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-    
     print("Fetching S&P 500 tickers from Wikipedia...")
-    
-    # Use requests with a User-Agent header to avoid 403 Forbidden
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
-    
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    
-    # Parse HTML tables from the response content
-    tables = pd.read_html(io.StringIO(response.text))
-    df = tables[0]
-    
-    # The ticker column is named "Symbol"
-    tickers = df["Symbol"].tolist()
-    
-    # Clean up tickers (some have dots like BRK.B, replace with dash for yfinance)
-    tickers = [t.replace(".", "-") for t in tickers]
-    
+
+    html, meta = fetch_page(force)
+    universe = load_universe()
+    if meta is not None:
+        universe, diff = update_universe(parse_constituents(html))
+        save_page_meta(meta)
+        if diff["added"] or diff["removed"]:
+            print(f"Universe changes: +{len(diff['added'])} {', '.join(diff['added'])}  "
+                  f"-{len(diff['removed'])} {', '.join(diff['removed'])}")
+            dropped = invalidate_removed(diff["removed"])
+            if dropped:
+                print(f"Dropped {dropped} removed tickers from the highs store")
+
+    tickers = sorted(universe)
     print(f"Found {len(tickers)} tickers")
-    
-    return sorted(tickers)
 
+    return tickers
+
+
+def save_tickers(tickers: list, filename: str = snapshot.TICKER_FILE):
+    """Save tickers to a text file, one per line (next to snapshot.py by default)."""
+    _write_text(filename, "".join(f"{ticker}\n" for ticker in tickers))
 
-def save_tickers(tickers: list, filename: str = "ticker.txt"):
-    """Save tickers to a text file, one per line."""
-    with open(filename, "w", encoding="utf-8") as f:
-        for ticker in tickers:
-            f.write(f"{ticker}\n")
-    
     print(f"Saved {len(tickers)} tickers to {filename}")
 
 
-def main():
+def main(force: bool = False):
     """Fetch S&P 500 tickers and save to file."""
-    tickers = fetch_sp500_tickers()
+    tickers = fetch_sp500_tickers(force)
     save_tickers(tickers)
-    
+
     # Preview first 20
     print("\nFirst 20 tickers:")
     print(", ".join(tickers[:20]))
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Fetch S&P 500 tickers")
+    parser.add_argument(
+        "--force", "-f",
+        action="store_true",
+        help="Download and parse the page even if it has not changed"
+    )
+    args = parser.parse_args()
+
+    main(force=args.force)
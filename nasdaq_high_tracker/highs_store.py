@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Highs store for NASDAQ High Tracker.
+Persists all-time highs and a rolling 52-week window per ticker so each run
+only needs the daily bars since the last stored date.
+"""
+
+import os
+import sys
+import json
+
+import pandas as pd
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import storage
+
+# Get the directory where this script is located
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
+STORE_FILE = os.path.join(OUTPUT_DIR, "highs_store.json")
+
+WINDOW_DAYS = 365
+
+
+def new_entry() -> dict:
+    """
+    Create an empty store entry.
+
+    "Window High" / "Window Low" are monotonic queues of [date, value] pairs
+    (decreasing highs / increasing lows), so the 52-week high and low are
+    always the first element and expired bars are evicted from the front.
+    """
+    return {
+        "All-Time High": None,
+        "ATH Date": None,
+        "Last Date": None,
+        "Window High": [],
+        "Window Low": [],
+    }
+
+
+def load_store(path: str = STORE_FILE) -> dict:
+    """Load the highs store from disk. Returns {} if missing or unreadable."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read highs store {path}: {e}")
+        return {}
+
+
+def save_store(store: dict, path: str = STORE_FILE):
+    """
+    Save the highs store to disk (see storage.atomic_write). Callers that
+    load, update and save the store hold storage.file_lock(path) throughout.
+    """
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(store, f, separators=(",", ":"))
+
+    storage.atomic_write(path, write)
+
+
+def _push(queue: list, date: str, value: float, dominates):
+    """Push a bar onto a monotonic queue, dropping values it dominates."""
+    # A re-downloaded bar replaces the stored bar for the same date
+    while queue and queue[-1][0] >= date:
+        queue.pop()
+    while queue and dominates(value, queue[-1][1]):
+        queue.pop()
+    queue.append([date, value])
+
+
+def evict(entry: dict, as_of: str):
+    """Drop window bars that are older than WINDOW_DAYS before as_of."""
+    cutoff = (pd.Timestamp(as_of) - pd.Timedelta(days=WINDOW_DAYS)).strftime("%Y-%m-%d")
+    for key in ("Window High", "Window Low"):
+        queue = entry[key]
+        expired = 0
+        while expired < len(queue) and queue[expired][0] <= cutoff:
+            expired += 1
+        if expired:
+            del queue[:expired]
+
+
+def update_entry(entry: dict, bars: pd.DataFrame) -> dict:
+    """
+    Fold new daily bars into a store entry.
+
+    Args:
+        entry: Store entry (modified in place)
+        bars: DataFrame indexed by date with High and Low columns
+
+    Returns:
+        The updated entry
+    """
+    bars = bars.dropna(subset=["High"]).sort_index()
+    if bars.empty:
+        return entry
+
+    # All-time high only moves up, so the max over the new bars is enough
+    bar_max = float(bars["High"].max())
+    if entry["All-Time High"] is None or bar_max >= entry["All-Time High"]:
+        entry["All-Time High"] = bar_max
+        entry["ATH Date"] = bars["High"].idxmax().strftime("%Y-%m-%d")
+
+    last_date = bars.index.max()
+    entry["Last Date"] = last_date.strftime("%Y-%m-%d")
+
+    # Only bars inside the window can affect the 52-week high/low
+    recent = bars[bars.index > last_date - pd.Timedelta(days=WINDOW_DAYS)]
+    dates = recent.index.strftime("%Y-%m-%d")
+    for date, high, low in zip(dates, recent["High"], recent["Low"]):
+        _push(entry["Window High"], date, float(high), lambda new, old: new >= old)
+        if pd.notna(low):
+            _push(entry["Window Low"], date, float(low), lambda new, old: new <= old)
+
+    evict(entry, entry["Last Date"])
+    return entry
+
+
+def entry_highs(entry: dict) -> dict:
+    """Return the tracked highs for a store entry in fetch_highs() format."""
+    window_high = entry["Window High"]
+    window_low = entry["Window Low"]
+    return {
+        "All-Time High": entry["All-Time High"],
+        "52W High": window_high[0][1] if window_high else None,
+        "52W Low": window_low[0][1] if window_low else None,
+        "Last Date": entry["Last Date"],
+    }
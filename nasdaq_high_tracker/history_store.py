@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+History store for NASDAQ High Tracker.
+Append-only, date-partitioned Parquet history of stocks at highs, stored
+with the shared tracker_core.history store.
+
+Layout:
+    output/history/date=YYYY-MM-DD/part-HHMMSSffffff.parquet
+
+Each tracker run appends one part file, so saving never rewrites old data,
+and readers only open the partitions and columns they ask for.
+"""
+
+import os
+import sys
+import argparse
+
+import pandas as pd
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import history, storage
+
+# Get the directory where this script is located
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
+HISTORY_DIR = os.path.join(OUTPUT_DIR, "history")
+CSV_HISTORY_FILE = os.path.join(OUTPUT_DIR, "stocks_at_highs.txt")
+
+# Column name -> dtype for every history row
+HISTORY_COLUMNS = {
+    "timestamp": "datetime64[ns, UTC]",
+    "Ticker": "string",
+    "Name": "string",
+    "Price": "float64",
+    "Market Cap (B)": "float64",
+    "52W High": "float64",
+    "52W Low": "float64",
+    "% From 52W High": "float64",
+    "All-Time High": "float64",
+    "% From ATH": "float64",
+    "At 52W High": "bool",
+    "At ATH": "bool",
+    "Sentiment": "string",
+    "Sentiment Score": "float64",
+}
+
+
+def empty_history(columns: list = None) -> pd.DataFrame:
+    """Return an empty, typed history DataFrame."""
+    return history.empty_history(HISTORY_COLUMNS, columns)
+
+
+def normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce a history DataFrame to the typed schema (missing columns are added as NA)."""
+    return history.normalize(df, HISTORY_COLUMNS)
+
+
+def list_partitions(history_dir: str = HISTORY_DIR) -> list:
+    """Return sorted partition dates (YYYY-MM-DD) present in the store."""
+    return history.list_partitions(history_dir)
+
+
+def exists(history_dir: str = HISTORY_DIR) -> bool:
+    """True if the store has at least one partition."""
+    return history.exists(history_dir)
+
+
+def append_history(df_append: pd.DataFrame, history_dir: str = HISTORY_DIR) -> list:
+    """
+    Append rows to the store, one part file per date partition.
+    Existing files are never rewritten.
+
+    Returns:
+        List of part file paths written
+    """
+    return history.append_history(df_append, history_dir, HISTORY_COLUMNS)
+
+
+def load_history(
+    columns: list = None,
+    since: str = None,
+    history_dir: str = HISTORY_DIR,
+) -> pd.DataFrame:
+    """
+    Load history from the store.
+
+    Args:
+        columns: Columns to read (default: all)
+        since: Only read partitions on or after this date (YYYY-MM-DD)
+        history_dir: Store directory
+
+    Returns:
+        Typed history DataFrame
+    """
+    return history.load_history(history_dir, HISTORY_COLUMNS, columns, since)
+
+
+def load_latest_run(columns: list = None, history_dir: str = HISTORY_DIR) -> pd.DataFrame:
+    """Load only the rows written by the most recent run (latest timestamp)."""
+    return history.load_latest_run(history_dir, HISTORY_COLUMNS, columns)
+
+
+def migrate_csv(csv_path: str = CSV_HISTORY_FILE, history_dir: str = HISTORY_DIR) -> int:
+    """
+    One-shot migration of the legacy CSV history into the Parquet store.
+    The CSV file is left in place.
+
+    Returns:
+        Number of rows migrated
+    """
+    if not os.path.exists(csv_path):
+        print(f"No CSV history at {csv_path}; nothing to migrate.")
+        return 0
+
+    # Locked, so two runs starting on a fresh store cannot both migrate
+    with storage.file_lock(history_dir):
+        if exists(history_dir):
+            print(f"History store {history_dir} already exists; skipping migration.")
+            return 0
+
+        df = pd.read_csv(csv_path)
+        if df.empty:
+            return 0
+        df = normalize(df)
+        for _, run in df.groupby("timestamp", sort=True):
+            append_history(run, history_dir)
+
+    print(f"Migrated {len(df)} rows from {csv_path} to {history_dir}")
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NASDAQ High Tracker history store")
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Migrate output/stocks_at_highs.txt into the Parquet history store"
+    )
+    args = parser.parse_args()
+
+    if args.migrate:
+        migrate_csv()
+    else:
+        df = load_history()
+        print(f"{len(df)} rows in {len(list_partitions())} partitions under {HISTORY_DIR}")
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Intraday polling mode for NASDAQ High Tracker.
+
+tracker.main is one-shot: every run imports everything, reloads history and
+fetches full quotes and highs for every ticker. The intraday tracker does
+that once at startup and then keeps quotes, highs, the latest state, last
+prices and the sentiment analyzer in memory. Each poll is a single batched
+price request (provider.prices); quotes are rebuilt from the in-memory
+highs, so a poll costs one round trip plus a few milliseconds.
+
+    - A price above the 52W high or ATH becomes the new high in memory;
+      highs are refreshed from the highs store when the date changes.
+    - A ticker whose At 52W High / At ATH flag flips to True is emitted as
+      a breakout event at once: printed, appended to output/breakouts.jsonl
+      and passed to on_breakout.
+    - After a breakout, every save_interval seconds and on exit, the rows at
+      highs are appended to history and the last prices and latest state
+      are updated (under the history lock, see tracker_core/storage.py),
+      as long as a stock at highs moved by more than the tolerance.
+
+Usage:
+    python tracker.py --daemon                    # poll every 60 seconds
+    python tracker.py --daemon --interval 15      # poll every 15 seconds
+    python tracker.py --daemon --polls 10 --replay fixture.json
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import threading
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import snapshot
+import tracker
+import history_store
+import latest_state
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import changes, providers, storage
+from tracker_core import sentiment as pipeline
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
+EVENTS_FILE = os.path.join(OUTPUT_DIR, "breakouts.jsonl")
+
+DEFAULT_INTERVAL = 60           # seconds between polls
+DEFAULT_SAVE_INTERVAL = 30 * 60  # seconds between history saves without breakouts
+
+
+def _higher(high, price):
+    """price if it is above a known high, else the high (an unknown high stays unknown)."""
+    if high is None or pd.isna(high) or price is None:
+        return high
+    return max(high, price)
+
+
+def _flags(quote: dict) -> tuple:
+    return quote.get("At 52W High") == True, quote.get("At ATH") == True
+
+
+class IntradayTracker:
+    """
+    Long-running tracker: start() loads everything once, poll() fetches
+    prices and emits breakouts, save() persists the rows at highs.
+    run() polls every interval seconds until stopped.
+    """
+
+    def __init__(
+        self,
+        tickers: list = None,
+        interval: float = DEFAULT_INTERVAL,
+        save_interval: float = DEFAULT_SAVE_INTERVAL,
+        tolerance: float = changes.DEFAULT_TOLERANCE,
+        max_workers: int = snapshot.DEFAULT_MAX_WORKERS,
+        batch_size: int = snapshot.DEFAULT_BATCH_SIZE,
+        provider=None,
+        on_breakout=None,
+        events_file: str = EVENTS_FILE,
+    ):
+        self.tickers = tickers
+        self.interval = interval
+        self.save_interval = save_interval
+        self.tolerance = tolerance
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.provider = provider or providers.YFinanceProvider()
+        self.on_breakout = on_breakout
+        self.events_file = events_file
+
+        self.quotes = {}        # ticker -> latest quote (snapshot.build_quote fields)
+        self.flags = {}         # ticker -> (At 52W High, At ATH) of the last poll
+        self.sentiment = {}     # ticker -> (label, score), scored once per day
+        self.state = None
+        self.state_mtime = None
+        self.last_prices = None
+        self.highs_date = None
+        self.saved_at = None
+        self.polls = 0
+
+    def start(self) -> list:
+        """
+        Take a full snapshot (highs from the persistent highs store) and load
+        the state the polls work from.
+
+        Returns:
+            Breakout events since the previous run's snapshot
+        """
+        if self.tickers is None:
+            self.tickers = snapshot.get_tickers()
+
+        # Flags of the last saved snapshot, so breakouts since then are reported
+        previous = None
+        if os.path.exists(snapshot.SNAPSHOT_BINARY_FILE):
+            try:
+                df_previous = snapshot.load_snapshot_binary()
+                previous = {row["Ticker"]: _flags(row) for row in df_previous.to_dict("records")}
+            except Exception as e:
+                print(f"Warning: could not read {snapshot.SNAPSHOT_BINARY_FILE} ({e})")
+
+        df = snapshot.main(
+            tickers=self.tickers,
+            max_workers=self.max_workers,
+            batch_size=self.batch_size,
+            incremental=True,
+            provider=self.provider,
+        )
+        self.quotes = {row["Ticker"]: row for row in df.to_dict("records")}
+        self.highs_date = datetime.now(timezone.utc).date()
+
+        self.state = tracker.load_latest_state()
+        self.state_mtime = self._state_mtime()
+        self.last_prices = tracker.load_last_prices()
+        self.saved_at = time.monotonic()
+        # Score the stocks already at highs now, so saves only score new breakouts
+        pipeline.get_analyzer()
+        self._score([ticker for ticker, quote in self.quotes.items() if any(_flags(quote))])
+
+        if previous is None:
+            self.flags = {ticker: _flags(quote) for ticker, quote in self.quotes.items()}
+            events = []
+        else:
+            self.flags = previous
+            events = self._breakouts(self.quotes.values())
+        for event in events:
+            self.emit(event)
+        if events:
+            self.save()
+        print(f"\nIntraday tracker started: {len(self.quotes)} tickers, "
+              f"polling every {self.interval:g}s")
+        return events
+
+    @staticmethod
+    def _state_mtime():
+        try:
+            return os.path.getmtime(latest_state.STATE_FILE)
+        except OSError:
+            return None
+
+    def refresh_highs(self):
+        """Fold the bars since the last run into the highs (new trading day)."""
+        print("New day: refreshing highs from the highs store...")
+        highs = snapshot.fetch_highs_incremental(
+            self.tickers, batch_size=self.batch_size, provider=self.provider
+        )
+        for ticker, quote in self.quotes.items():
+            entry = highs.get(ticker)
+            if entry:
+                quote["52W High"] = entry.get("52W High", quote["52W High"])
+                quote["52W Low"] = entry.get("52W Low", quote["52W Low"])
+                quote["All-Time High"] = entry.get("All-Time High", quote["All-Time High"])
+        self.highs_date = datetime.now(timezone.utc).date()
+        self.sentiment = {}
+        self._score([ticker for ticker, quote in self.quotes.items() if any(_flags(quote))])
+
+    def _quote(self, ticker: str, price: float) -> dict:
+        """Rebuild a ticker's quote at a new price, raising its highs if the price is above them."""
+        quote = self.quotes[ticker]
+        market_cap = quote.get("Market Cap (B)")
+        return snapshot.build_quote(
+            ticker,
+            quote.get("Name"),
+            price,
+            None if market_cap is None or pd.isna(market_cap) else market_cap * 1e9,
+            _higher(quote.get("52W High"), price),
+            quote.get("52W Low"),
+            _higher(quote.get("All-Time High"), price),
+        )
+
+    def _breakouts(self, quotes) -> list:
+        """Update flags from quotes and return an event per flag that flipped to True."""
+        now = datetime.now(timezone.utc).isoformat()
+        events = []
+        for quote in quotes:
+            ticker = quote["Ticker"]
+            was_52w, was_ath = self.flags.get(ticker, (False, False))
+            at_52w, at_ath = _flags(quote)
+            self.flags[ticker] = (at_52w, at_ath)
+            new_52w, new_ath = at_52w and not was_52w, at_ath and not was_ath
+            if new_52w or new_ath:
+                events.append({
+                    "timestamp": now,
+                    "Ticker": ticker,
+                    "Name": quote.get("Name"),
+                    "Price": quote["Price"],
+                    "New 52W High": new_52w,
+                    "New ATH": new_ath,
+                    "% From 52W High": quote.get("% From 52W High"),
+                    "% From ATH": quote.get("% From ATH"),
+                })
+        return events
+
+    def emit(self, event: dict):
+        """Report a breakout: print it, append it to the events file and call on_breakout."""
+        kinds = [kind for kind, flag in (("52W High", event["New 52W High"]), ("ATH", event["New ATH"])) if flag]
+        name = event.get("Name") or ""
+        name_short = name[:25] + "..." if len(name) > 25 else name
+        print(f"⚡ {event['timestamp'][11:19]} {event['Ticker']:6} {name_short:28} "
+              f"${event['Price']:8.2f}  → New {', '.join(kinds)}!", flush=True)
+
+        line = json.dumps(event, default=lambda v: v.item() if hasattr(v, "item") else str(v)) + "\n"
+        with storage.file_lock(self.events_file):
+            storage.append_bytes(self.events_file, line.encode("utf-8"))
+        if self.on_breakout is not None:
+            self.on_breakout(event)
+
+    def poll(self) -> dict:
+        """
+        Fetch prices, rebuild quotes and emit breakouts. Saves after a
+        breakout or once save_interval has passed.
+
+        Returns:
+            {"prices", "breakouts", "saved", "fetch", "total"} (times in seconds)
+        """
+        start = time.perf_counter()
+        if datetime.now(timezone.utc).date() != self.highs_date:
+            self.refresh_highs()
+
+        prices = self.provider.prices(self.tickers)
+        fetched = time.perf_counter()
+
+        quotes = [self._quote(ticker, price) for ticker, price in prices.items() if ticker in self.quotes]
+        self.quotes.update((quote["Ticker"], quote) for quote in quotes)
+        events = self._breakouts(quotes)
+        for event in events:
+            self.emit(event)
+
+        saved = 0
+        if events or time.monotonic() - self.saved_at >= self.save_interval:
+            saved = self.save()
+
+        self.polls += 1
+        stats = {
+            "prices": len(prices),
+            "breakouts": len(events),
+            "saved": saved,
+            "fetch": fetched - start,
+            "total": time.perf_counter() - start,
+        }
+        print(f"Poll {self.polls} {datetime.now(timezone.utc).strftime('%H:%M:%S')}: "
+              f"{stats['prices']}/{len(self.tickers)} prices in {stats['fetch']:.2f}s, "
+              f"{stats['breakouts']} breakouts, {saved} rows saved, {stats['total']:.2f}s total",
+              flush=True)
+        return stats
+
+    def _score(self, tickers: list):
+        """Sentiment for tickers at highs not scored yet today."""
+        missing = [ticker for ticker in tickers if ticker not in self.sentiment]
+        if not missing:
+            return
+        import sentiment
+
+        df, _ = sentiment.fetch_sentiment(missing, news_fn=self.provider.news)
+        for row in df.to_dict("records"):
+            self.sentiment[row["Ticker"]] = (row["Sentiment"], row.get("Sentiment Score"))
+
+    def save(self) -> int:
+        """
+        Append the rows at highs to history and update the latest state and
+        last prices, unless no stock at highs moved by more than the tolerance.
+
+        Returns:
+            Number of history rows appended
+        """
+        self.saved_at = time.monotonic()
+        df = pd.DataFrame(list(self.quotes.values()))
+        if df.empty:
+            return 0
+        at_highs = df[(df["At 52W High"] == True) | (df["At ATH"] == True)]
+        if changes.price_changes(at_highs, self.last_prices, self.tolerance).empty:
+            return 0
+
+        self._score(at_highs["Ticker"].tolist())
+        scored = [self.sentiment.get(ticker, (None, None)) for ticker in at_highs["Ticker"]]
+        df_append = history_store.normalize(at_highs.assign(
+            **{"Sentiment": [label for label, _ in scored],
+               "Sentiment Score": [score for _, score in scored],
+               "timestamp": datetime.now(timezone.utc)}
+        ))
+
+        with storage.file_lock(history_store.HISTORY_DIR):
+            tracker.save_history(df_append)
+            # Another run may have written the state since it was loaded
+            if self._state_mtime() != self.state_mtime:
+                self.state = latest_state.load_state()
+            self.state = latest_state.merge(self.state, df_append)
+            latest_state.save_state(self.state)
+            self.state_mtime = self._state_mtime()
+            # After the state, which a missing last-prices index is rebuilt from
+            self.last_prices = changes.update_last_prices(tracker.load_last_prices(), df)
+            changes.save_last_prices(self.last_prices, tracker.LAST_PRICES_FILE)
+
+        snapshot.save_snapshot_binary(df)
+        return len(df_append)
+
+    def run(self, polls: int = None):
+        """
+        Start, then poll every interval seconds until interrupted (Ctrl-C or
+        SIGTERM) or after `polls` polls. Saves before returning.
+        """
+        stop = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+        self.start()
+        try:
+            while not stop.is_set() and (polls is None or self.polls < polls):
+                started = time.monotonic()
+                self.poll()
+                if polls is not None and self.polls >= polls:
+                    break
+                stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            print("\nStopping intraday tracker...")
+        finally:
+            saved = self.save()
+            print(f"Intraday tracker stopped after {self.polls} polls ({saved} rows saved on exit)")
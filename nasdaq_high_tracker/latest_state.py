@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Latest-state cache for NASDAQ High Tracker.
+Keeps only the history rows each ticker still needs, so the tracker can
+compute latest prices, breakouts and momentum without reading or sorting
+the full history.
+
+For every ticker the state holds:
+    - its last STATE_ROWS rows (current + previous for breakouts/daily change)
+    - every row inside the longest momentum lookback window
+    - the last row before that window (the as-of row for the lookback)
+
+Usage:
+    python latest_state.py --rebuild    # Regenerate from full history
+"""
+
+import os
+import sys
+import argparse
+
+import pandas as pd
+
+import history_store
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import momentum, storage
+
+# Get the directory where this script is located
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
+STATE_FILE = os.path.join(OUTPUT_DIR, "latest_state.parquet")
+
+STATE_ROWS = 2
+STATE_WINDOW = max([*momentum.DEFAULT_WINDOWS.values(), *momentum.EXTENDED_WINDOWS.values()])
+
+
+def prune(df_hist: pd.DataFrame, rows: int = STATE_ROWS, window: pd.Timedelta = STATE_WINDOW) -> pd.DataFrame:
+    """
+    Reduce history to the rows the latest state keeps for each ticker.
+    Returns rows ordered by Ticker then timestamp.
+    """
+    if df_hist.empty:
+        return df_hist
+
+    df_hist = df_hist.dropna(subset=["Ticker", "timestamp"]).reset_index(drop=True)
+    stamps = df_hist["timestamp"]
+    latest = stamps.groupby(df_hist["Ticker"]).transform("max")
+
+    # As-of anchor: the last row at or before (latest - window), per ticker
+    before = stamps.where(stamps <= latest - window)
+    anchor = before.groupby(df_hist["Ticker"]).transform("max")
+    in_window = anchor.isna() | (stamps >= anchor)
+
+    tail = momentum.last_rows_by_ticker(df_hist, n=rows)
+    keep = in_window.to_numpy().copy()
+    keep[tail.index.to_numpy()] = True
+
+    kept = df_hist[keep]
+    return kept.sort_values(["Ticker", "timestamp"], kind="stable").reset_index(drop=True)
+
+
+def save_state(df_state: pd.DataFrame, path: str = STATE_FILE):
+    """Write the state file (see storage.atomic_write)."""
+    df_state = history_store.normalize(df_state)
+    storage.atomic_write(path, lambda tmp_path: df_state.to_parquet(tmp_path, index=False))
+
+
+def rebuild_state(path: str = STATE_FILE) -> pd.DataFrame:
+    """Regenerate the state from the full history store."""
+    with storage.file_lock(history_store.HISTORY_DIR):
+        df_state = prune(history_store.load_history())
+        save_state(df_state, path)
+    print(f"Rebuilt latest state: {len(df_state)} rows for "
+          f"{df_state['Ticker'].nunique()} tickers -> {path}")
+    return df_state
+
+
+def load_state(path: str = STATE_FILE) -> pd.DataFrame:
+    """
+    Load the latest state. Rebuilds it from full history if the file is
+    missing but history exists.
+    """
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    if history_store.exists():
+        return rebuild_state(path)
+    return history_store.empty_history()
+
+
+def update_state(df_append: pd.DataFrame, path: str = STATE_FILE) -> pd.DataFrame:
+    """
+    Fold newly appended history rows into the state and persist it.
+    Call after df_append has been saved to the history store.
+    Cost is O(state rows + new rows), independent of total history size.
+    Holds the history store's lock, so concurrent runs cannot drop each
+    other's rows from the state.
+    """
+    with storage.file_lock(history_store.HISTORY_DIR):
+        if not os.path.exists(path):
+            # Rebuilding from history already includes the appended rows
+            return rebuild_state(path)
+
+        df_state = merge(load_state(path), df_append)
+        save_state(df_state, path)
+    return df_state
+
+
+def merge(df_state: pd.DataFrame, df_append: pd.DataFrame) -> pd.DataFrame:
+    """Fold new history rows into an in-memory state (not saved)."""
+    parts = [df for df in (df_state, history_store.normalize(df_append)) if not df.empty]
+    if not parts:
+        return df_state
+    return prune(pd.concat(parts, ignore_index=True))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NASDAQ High Tracker latest-state cache")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Regenerate output/latest_state.parquet from the full history"
+    )
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_state()
+    else:
+        df = load_state()
+        print(f"{len(df)} rows for {df['Ticker'].nunique()} tickers in {STATE_FILE}")
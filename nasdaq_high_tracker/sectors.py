@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Sector index for NASDAQ High Tracker.
+Tags tickers with their GICS sector and sub-industry from the constituents
+table saved by fetch_tickers.py, so grouping and the Tech & AI picks need
+no network calls and no model tokens.
+"""
+
+import os
+import json
+
+import pandas as pd
+
+# Get the directory where this script is located
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONSTITUENTS_FILE = os.path.join(SCRIPT_DIR, "output", "universe", "constituents.json")
+
+UNKNOWN = "Unknown"
+SECTOR_COLUMNS = ["Sector", "Industry", "Tech"]
+
+# Sub-industries outside the Information Technology sector that count as Tech & AI
+TECH_INDUSTRIES = {
+    "Interactive Media & Services",
+    "Broadline Retail",
+    "Movies & Entertainment",
+    "Transaction & Payment Processing Services",
+}
+
+
+def is_tech(sector: str, industry: str) -> bool:
+    """True for Information Technology stocks and the TECH_INDUSTRIES sub-industries."""
+    return sector == "Information Technology" or industry in TECH_INDUSTRIES
+
+
+def load_index(path: str = CONSTITUENTS_FILE) -> pd.DataFrame:
+    """
+    Load the sector index.
+
+    Returns:
+        DataFrame indexed by Ticker with Sector, Industry and Tech columns
+        (empty if fetch_tickers.py has not saved constituents yet)
+    """
+    empty = pd.DataFrame(columns=SECTOR_COLUMNS, index=pd.Index([], name="Ticker"))
+    if not os.path.exists(path):
+        return empty
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            universe = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read sector index {path}: {e}")
+        return empty
+
+    rows = {
+        ticker: {
+            "Sector": meta.get("Sector") or UNKNOWN,
+            "Industry": meta.get("Industry") or UNKNOWN,
+        }
+        for ticker, meta in universe.items()
+    }
+    index = pd.DataFrame.from_dict(rows, orient="index", columns=["Sector", "Industry"])
+    index.index.name = "Ticker"
+    index["Tech"] = [is_tech(s, i) for s, i in zip(index["Sector"], index["Industry"])]
+    return index
+
+
+def add_sectors(df: pd.DataFrame, index: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Join Sector, Industry and Tech onto a DataFrame with a Ticker column
+    (placed after Name). Tickers missing from the index get "Unknown".
+    """
+    if index is None:
+        index = load_index()
+    if df.empty:
+        return df.reindex(columns=[*df.columns, *[c for c in SECTOR_COLUMNS if c not in df.columns]])
+
+    df = df.drop(columns=[c for c in SECTOR_COLUMNS if c in df.columns])
+    tags = index.reindex(df["Ticker"].to_numpy())
+    df = df.assign(
+        Sector=tags["Sector"].fillna(UNKNOWN).to_numpy(),
+        Industry=tags["Industry"].fillna(UNKNOWN).to_numpy(),
+        Tech=tags["Tech"].fillna(False).astype(bool).to_numpy(),
+    )
+
+    columns = [c for c in df.columns if c not in SECTOR_COLUMNS]
+    at = columns.index("Name") + 1 if "Name" in columns else 1
+    return df[columns[:at] + SECTOR_COLUMNS + columns[at:]]
+
+
+def has_sectors(df: pd.DataFrame) -> bool:
+    """True if at least one row has a known sector."""
+    return "Sector" in df.columns and (df["Sector"] != UNKNOWN).any()
@@ -4,19 +4,34 @@ Sentiment module for NASDAQ High Tracker.
 Fetches news headlines and computes VADER sentiment scores.
 """
 
+import os
+import sys
+
 import pandas as pd
-import yfinance as yf
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import matplotlib.pyplot as plt
 
-from snapshot import TICKERS
+import snapshot
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import news_image, render
+from tracker_core import sentiment as pipeline
+
+# Get the directory where this script is located
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
+CACHE_FILE = os.path.join(OUTPUT_DIR, "sentiment_cache.json")
+NEWS_IMAGE_FILE = os.path.join(OUTPUT_DIR, "news_summary.png")
+
+DEFAULT_MAX_WORKERS = pipeline.DEFAULT_MAX_WORKERS
 
-# Download VADER lexicon if not present
-try:
-    nltk.data.find('sentiment/vader_lexicon.zip')
-except LookupError:
-    nltk.download('vader_lexicon', quiet=True)
+
+def classify(avg_score: float) -> str:
+    """Classify an average compound score with market-friendly labels."""
+    if avg_score >= 0.1:
+        return "Bullish"
+    elif avg_score <= -0.1:
+        return "Bearish"
+    return "Neutral"
 
 
 def fetch_sentiment_for_ticker(ticker: str, max_headlines: int = 5) -> tuple:
@@ -30,156 +45,155 @@ def fetch_sentiment_for_ticker(ticker: str, max_headlines: int = 5) -> tuple:
         - compound_score: float average VADER compound score
         - headlines_list: list of headline strings
     """
-    try:
-        t = yf.Ticker(ticker)
-        news = t.news
-        
-        if not news:
-            return "Neutral", 0.0, []
-        
-        sia = SentimentIntensityAnalyzer()
-        scores = []
-        headlines = []
-        
-        for item in news[:max_headlines]:
-            title = None
-            if isinstance(item, dict):
-                content = item.get("content", {})
-                if isinstance(content, dict):
-                    title = content.get("title")
-            
-            if title and isinstance(title, str):
-                sentiment = sia.polarity_scores(title)
-                scores.append(sentiment["compound"])
-                headlines.append(title)
-        
-        if not scores:
-            return "Neutral", 0.0, headlines
-        
-        avg_score = sum(scores) / len(scores)
-        
-        # Classify with market-friendly labels
-        if avg_score >= 0.1:
-            label = "Bullish"
-        elif avg_score <= -0.1:
-            label = "Bearish"
-        else:
-            label = "Neutral"
-        
-        return label, avg_score, headlines
-    
-    except Exception as e:
-        print(f"Warning: failed to get sentiment for {ticker}: {e}")
-        return "Neutral", 0.0, []
+    df, news_dict = fetch_sentiment([ticker], max_headlines=max_headlines, max_workers=1)
+    row = df.iloc[0]
+    return row["Sentiment"], row["Sentiment Score"], news_dict[ticker]
 
 
-def fetch_sentiment(tickers: list) -> tuple:
+def start_prefetch(max_headlines: int = 5, max_workers: int = DEFAULT_MAX_WORKERS, news_fn=None):
+    """
+    Create a news prefetcher backed by output/sentiment_cache.json.
+    Submit tickers as their quotes arrive, then pass it to main()/fetch_sentiment().
+    news_fn overrides the yfinance news provider.
+    """
+    return pipeline.NewsPrefetcher(
+        max_headlines=max_headlines,
+        max_workers=max_workers,
+        news_fn=news_fn,
+        cache_path=CACHE_FILE,
+    )
+
+
+def fetch_sentiment(
+    tickers: list,
+    max_headlines: int = 5,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    prefetcher=None,
+    news_fn=None,
+) -> tuple:
     """
     Fetch sentiment scores for a list of tickers.
+    News is fetched concurrently and all headlines are scored in one batch
+    with a single shared VADER analyzer. Recently fetched news and previously
+    scored headlines come from output/sentiment_cache.json.
+    With a prefetcher (see start_prefetch), news already fetched in the
+    background is reused and only the remaining tickers are fetched.
+    news_fn overrides the yfinance news provider when no prefetcher is given.
     
     Returns:
         (DataFrame, news_dict)
-        - DataFrame: columns Ticker, Sentiment, Sentiment Score
+        - DataFrame: columns Ticker, Sentiment, Sentiment Score; timings and
+          cache hit/miss counters are in df.attrs["stats"]
         - news_dict: {ticker: [headlines]}
     """
-    results = []
-    news_dict = {}
-    
-    for ticker in tickers:
-        label, score, headlines = fetch_sentiment_for_ticker(ticker)
-        results.append({
-            "Ticker": ticker, 
-            "Sentiment": label,
-            "Sentiment Score": score
-        })
-        news_dict[ticker] = headlines
-    
-    return pd.DataFrame(results), news_dict
+    if prefetcher is None:
+        prefetcher = start_prefetch(max_headlines, max_workers, news_fn)
+    headlines_by_ticker, scores, stats = prefetcher.finish(tickers)
+    df, news_dict = pipeline.sentiment_frame(tickers, headlines_by_ticker, scores, classify)
+    df.attrs["stats"] = stats
+    return df, news_dict
+
 
+TICKER_COLORS = {"Bullish": '#00ff88', "Bearish": '#ff4444'}
 
-def create_news_image(news_dict: dict, filename: str = "news_summary.png"):
+
+def ticker_color(headlines: list, sentiment: str = None) -> str:
     """
-    Create a shareable image with news headlines per ticker.
-    Highlights tickers with bullish sentiment for breakout potential.
+    News image color for a ticker from its sentiment label (see classify):
+    green bullish, red bearish, white neutral, grey without news.
     """
-    fig, ax = plt.subplots(figsize=(14, len(TICKERS) * 0.9 + 2))
-    ax.axis('off')
-    ax.set_facecolor('#1a1a2e')
-    fig.patch.set_facecolor('#1a1a2e')
-    
-    y_pos = 0.97
-    line_height = 1.0 / (len(TICKERS) + 3)
-    
-    # Title
-    ax.text(0.5, y_pos, "📈 NASDAQ High Tracker - News Summary", 
-            fontsize=18, weight='bold', ha='center', va='top',
-            color='#00d4ff', transform=ax.transAxes)
-    y_pos -= line_height * 1.8
-    
-    sia = SentimentIntensityAnalyzer()
-    
-    for ticker in TICKERS:
-        headlines = news_dict.get(ticker, [])
-        
-        # Calculate sentiment for color coding
-        if headlines:
-            scores = [sia.polarity_scores(h)["compound"] for h in headlines[:3]]
-            avg_score = sum(scores) / len(scores) if scores else 0
-            if avg_score >= 0.1:
-                ticker_color = '#00ff88'  # Green for bullish
-            elif avg_score <= -0.1:
-                ticker_color = '#ff4444'  # Red for bearish
-            else:
-                ticker_color = '#ffffff'  # White for neutral
-        else:
-            ticker_color = '#888888'
-        
-        # Ticker name
-        ax.text(0.02, y_pos, f"{ticker}", 
-                fontsize=12, weight='bold', va='top',
-                color=ticker_color, transform=ax.transAxes)
-        
-        # Headlines
-        if headlines:
-            headline_text = headlines[0][:90] + "..." if len(headlines[0]) > 90 else headlines[0]
-            ax.text(0.10, y_pos, f"• {headline_text}", 
-                    fontsize=9, va='top', color='#cccccc',
-                    transform=ax.transAxes)
-        else:
-            ax.text(0.10, y_pos, "• No recent news", 
-                    fontsize=9, style='italic', va='top', color='#666666',
-                    transform=ax.transAxes)
-        
-        y_pos -= line_height
-    
-    plt.tight_layout()
-    plt.savefig(filename, dpi=150, bbox_inches='tight', 
-                facecolor='#1a1a2e', edgecolor='none')
-    plt.close()
-    print(f"Saved {filename}")
+    if not headlines:
+        return '#888888'
+    return TICKER_COLORS.get(sentiment, '#ffffff')
+
 
+# News image style (see tracker_core/news_image.py)
+NEWS_IMAGE_STYLE = {
+    "title": "NASDAQ High Tracker - News Summary",
+    "width": 14,
+    "row_height": 0.9,
+    "title_height": 1.0,
+    "background": '#1a1a2e',
+    "title_color": '#00d4ff',
+    "title_size": 18,
+    "ticker_size": 12,
+    "headline_size": 9,
+    "headline_color": '#cccccc',
+    "empty_color": '#666666',
+    "headlines": 1,
+    "max_chars": 93,
+    "inline": True,
+    "ticker_suffix": "",
+    "ticker_color": ticker_color,
+}
 
-def main(tickers: list = None) -> pd.DataFrame:
+
+def create_news_image(
+    news_dict: dict,
+    filename: str = NEWS_IMAGE_FILE,
+    tickers: list = None,
+    renderer: render.Renderer = None,
+    sentiments: dict = None,
+):
+    """
+    Create a shareable image with news headlines per ticker (the tickers in
+    news_dict unless tickers is given), paginated into fixed-height pages.
+    Tickers are colored by their sentiment label ({ticker: label}, as
+    computed by fetch_sentiment) to highlight bullish breakout candidates.
+    Skipped when the headlines are unchanged since the image was written;
+    with a renderer it is drawn on the renderer's background thread.
+    """
+    tickers = list(news_dict) if tickers is None else tickers
+    render.render(
+        filename,
+        news_image.image_key(news_dict, tickers, NEWS_IMAGE_STYLE, sentiments),
+        lambda path, metadata: news_image.create_news_image(
+            news_dict, tickers, path, NEWS_IMAGE_STYLE, metadata=metadata, sentiments=sentiments
+        ),
+        renderer,
+    )
+
+
+def main(
+    tickers: list = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    prefetcher=None,
+    news_fn=None,
+    renderer: render.Renderer = None,
+) -> pd.DataFrame:
     """
     Main function to fetch sentiment for specified tickers.
     
     Args:
         tickers: List of ticker symbols. If None, uses all TICKERS from snapshot.
+        max_workers: Number of news requests made concurrently.
+        prefetcher: Prefetcher from start_prefetch() that tickers were
+            already submitted to while quotes were being fetched.
+        news_fn: Callable(ticker) -> raw news items when no prefetcher is
+            given (defaults to yfinance, e.g. a provider's news method).
+        renderer: Background renderer for output/news_summary.png (the
+            image is drawn inline without one).
     """
     if tickers is None:
-        tickers = TICKERS
+        tickers = snapshot.get_tickers()
     
     if not tickers:
+        if prefetcher is not None:
+            prefetcher.close()
         print("No tickers to fetch sentiment for.")
         return pd.DataFrame(columns=["Ticker", "Sentiment", "Sentiment Score"])
     
     print(f"Fetching sentiment scores for {len(tickers)} stocks...")
-    df, news_dict = fetch_sentiment(tickers)
+    df, news_dict = fetch_sentiment(tickers, max_workers=max_workers, prefetcher=prefetcher, news_fn=news_fn)
     
     # Sort by sentiment score descending
     df = df.sort_values("Sentiment Score", ascending=False)
     print(df.to_string(index=False))
     
+    # News image, most bullish first
+    create_news_image(news_dict, tickers=df["Ticker"].tolist(), renderer=renderer,
+                      sentiments=dict(zip(df["Ticker"], df["Sentiment"])))
+    
     return df
 
 
@@ -5,15 +5,44 @@ Fetches current quotes, 52-week high, and all-time high data for S&P 500 stocks.
 """
 
 import os
-import yfinance as yf
+import sys
 import pandas as pd
-from tabulate import tabulate
 from datetime import datetime, timezone
 
+import highs_store
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import fetch, providers, storage
+
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 TICKER_FILE = os.path.join(SCRIPT_DIR, "ticker.txt")
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
+SNAPSHOT_TEXT_FILE = os.path.join(OUTPUT_DIR, "snapshot.txt")
+SNAPSHOT_BINARY_FILE = os.path.join(OUTPUT_DIR, "snapshot.feather")
+
+# Column name -> dtype for the binary snapshot
+SNAPSHOT_COLUMNS = {
+    "Ticker": "string",
+    "Name": "string",
+    "Price": "float64",
+    "Market Cap (B)": "float64",
+    "52W High": "float64",
+    "52W Low": "float64",
+    "% From 52W High": "float64",
+    "All-Time High": "float64",
+    "% From ATH": "float64",
+    "At 52W High": "bool",
+    "At ATH": "bool",
+}
+
+# Fetch engine defaults (see tracker_core/fetch.py)
+DEFAULT_MAX_WORKERS = fetch.DEFAULT_MAX_WORKERS
+DEFAULT_TIMEOUT = fetch.DEFAULT_TIMEOUT
+DEFAULT_RETRIES = fetch.DEFAULT_RETRIES
+DEFAULT_BACKOFF = fetch.DEFAULT_BACKOFF
+DEFAULT_BATCH_SIZE = 50       # tickers per yf.download call in batched mode
 
 
 def load_tickers() -> list:
@@ -37,55 +66,252 @@ def load_tickers() -> list:
     return tickers
 
 
-TICKERS = load_tickers()
+_tickers = None
+
 
+def get_tickers() -> list:
+    """Return the ticker list, reading ticker.txt on first use only."""
+    global _tickers
+    if _tickers is None:
+        _tickers = load_tickers()
+    return _tickers
 
-def fetch_quote(ticker: str) -> dict:
+
+def __getattr__(name):
+    # snapshot.TICKERS is loaded lazily so importing this module stays cheap
+    if name == "TICKERS":
+        return get_tickers()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def fetch_quote(ticker: str, highs: dict = None, provider=None) -> dict:
     """
     Fetch current price, 52-week high, and all-time high for a ticker.
     Returns a dict with all relevant high-tracking metrics.
+    
+    Args:
+        ticker: Ticker symbol
+        highs: Precomputed highs from fetch_highs() for this ticker. When given,
+            the per-ticker history(period="max") download is skipped.
+        provider: Market data provider (defaults to yfinance, see
+            tracker_core/providers.py)
     """
-    t = yf.Ticker(ticker)
-    price = None
-    market_cap = None
-    yr_high = None
-    yr_low = None
+    provider = provider or providers.YFinanceProvider()
+    quote = provider.quote(ticker)
+    yr_high = quote["year_high"]
+    yr_low = quote["year_low"]
     all_time_high = None
-    company_name = None
-
-    # Try fast_info first (faster)
-    try:
-        fi = t.fast_info
-        price = getattr(fi, "last_price", None) or getattr(fi, "last_close", None)
-        market_cap = getattr(fi, "market_cap", None)
-        yr_high = getattr(fi, "year_high", None)
-        yr_low = getattr(fi, "year_low", None)
-    except Exception:
-        pass
-
-    # Get company name and fallback values from info
-    try:
-        info = t.info
-        company_name = info.get("shortName") or info.get("longName")
-        if price is None:
-            price = info.get("regularMarketPrice")
-        if market_cap is None:
-            market_cap = info.get("marketCap")
+
+    if highs is not None:
+        # Use highs from the batched download
+        all_time_high = highs.get("All-Time High")
         if yr_high is None:
-            yr_high = info.get("fiftyTwoWeekHigh")
+            yr_high = highs.get("52W High")
         if yr_low is None:
-            yr_low = info.get("fiftyTwoWeekLow")
-    except Exception:
-        pass
-
-    # Fetch all-time high from historical data (max available)
-    try:
-        hist = t.history(period="max")
-        if not hist.empty:
-            all_time_high = hist["High"].max()
-    except Exception:
-        pass
+            yr_low = highs.get("52W Low")
+    else:
+        # Fetch all-time high from historical data (max available)
+        try:
+            hist = provider.history(ticker, period="max")
+            if not hist.empty:
+                all_time_high = hist["High"].max()
+        except Exception:
+            pass
+
+    return build_quote(ticker, quote["name"], quote["price"], quote["market_cap"],
+                       yr_high, yr_low, all_time_high)
+
+
+def reduce_history(hist: pd.DataFrame) -> dict:
+    """
+    Reduce a daily High/Low history for one ticker to the fields we track.
+    Returns a dict with All-Time High, 52W High, 52W Low and Last Date.
+    """
+    hist = hist.dropna(subset=["High"])
+    if hist.empty:
+        return {}
+    
+    last_date = hist.index.max()
+    recent = hist[hist.index > last_date - pd.Timedelta(days=365)]
+    
+    return {
+        "All-Time High": float(hist["High"].max()),
+        "52W High": float(recent["High"].max()),
+        "52W Low": float(recent["Low"].min()),
+        "Last Date": last_date,
+    }
+
+
+def download_bars(tickers: list, provider=None, **kwargs) -> dict:
+    """
+    Download daily bars for several tickers in one request.
+    
+    Args:
+        tickers: List of ticker symbols
+        provider: Market data provider (defaults to yfinance)
+        **kwargs: Passed to the provider's download (period, start, actions, ...)
+    
+    Returns:
+        {ticker: DataFrame indexed by date with High, Low[, Stock Splits]}
+    """
+    return (provider or providers.YFinanceProvider()).download(tickers, **kwargs)
+
+
+def download_history(tickers: list, period: str = "max", provider=None) -> dict:
+    """
+    Download daily bars for several tickers in one request, without letting
+    a failed or partial batch cost every ticker in it: tickers missing from
+    the batch are retried in one more batch, then fetched one by one
+    through provider.history.
+    
+    Returns:
+        {ticker: DataFrame indexed by date with High, Low}
+    """
+    provider = provider or providers.YFinanceProvider()
+    bars = download_bars(tickers, provider, period=period)
+    missing = [ticker for ticker in tickers if ticker not in bars]
+    if missing:
+        bars.update(download_bars(missing, provider, period=period))
+        missing = [ticker for ticker in missing if ticker not in bars]
+    for ticker in missing:
+        try:
+            frame = provider.history(ticker, period=period)
+        except Exception:
+            continue
+        if frame is not None and "High" in frame and frame["High"].notna().any():
+            bars[ticker] = frame
+    
+    missing = [ticker for ticker in tickers if ticker not in bars]
+    if missing:
+        print(f"  Warning: {len(missing)} of {len(tickers)} tickers still without highs: "
+              f"{', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}")
+    return bars
+
+
+def fetch_highs_batch(tickers: list, period: str = "max", provider=None) -> dict:
+    """
+    Download daily history for several tickers at once and reduce each to
+    its highs (see download_history for how failed batches are retried).
+    
+    Returns:
+        {ticker: {"All-Time High", "52W High", "52W Low", "Last Date"}}
+    """
+    bars = download_history(tickers, period, provider)
+    return {ticker: reduce_history(frame) for ticker, frame in bars.items()}
+
 
+def fetch_highs(tickers: list, batch_size: int = DEFAULT_BATCH_SIZE, provider=None) -> dict:
+    """
+    Fetch all-time and 52-week highs for all tickers, batch_size tickers per
+    download. Peak memory is bounded by one batch of High/Low columns.
+    """
+    highs = {}
+    for start in range(0, len(tickers), batch_size):
+        batch = tickers[start:start + batch_size]
+        print(f"  Downloading history batch {start // batch_size + 1} "
+              f"({len(batch)} tickers)...", flush=True)
+        highs.update(fetch_highs_batch(batch, provider=provider))
+    return highs
+
+
+def fetch_highs_incremental(
+    tickers: list,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    store_path: str = None,
+    rebuild: bool = False,
+    provider=None,
+) -> dict:
+    """
+    Fetch highs using the persistent highs store.
+    
+    Tickers already in the store only download bars since their last stored
+    date; new tickers (and tickers with a stock split in the new bars, since
+    split-adjusted history invalidates the stored values) download full history.
+    
+    Args:
+        tickers: List of ticker symbols
+        batch_size: Tickers per download
+        store_path: Path to the store file (defaults to highs_store.STORE_FILE)
+        rebuild: If True, ignore the stored state and download full history
+        provider: Market data provider (defaults to yfinance)
+    
+    Returns:
+        {ticker: {"All-Time High", "52W High", "52W Low", "Last Date"}}
+    """
+    store_path = store_path or highs_store.STORE_FILE
+    # Held for the whole update, so an overlapping run cannot lose this run's bars
+    with storage.file_lock(store_path):
+        store = {} if rebuild else highs_store.load_store(store_path)
+        
+        # Group warm tickers by last stored date so each group shares one start date
+        cold = []
+        warm = {}
+        for ticker in tickers:
+            entry = store.get(ticker)
+            if entry and entry.get("Last Date"):
+                warm.setdefault(entry["Last Date"], []).append(ticker)
+            else:
+                cold.append(ticker)
+        
+        print(f"  Highs store: {len(tickers) - len(cold)} warm, {len(cold)} cold")
+        
+        # Warm tickers missing from their batch twice fall back to a full download
+        refetch = []
+        for last_date, group in sorted(warm.items()):
+            for start in range(0, len(group), batch_size):
+                batch = group[start:start + batch_size]
+                # Re-download the last stored bar too; it may have been intraday
+                bars = download_bars(batch, provider, start=last_date, actions=True)
+                missing = [ticker for ticker in batch if ticker not in bars]
+                if missing:
+                    bars.update(download_bars(missing, provider, start=last_date, actions=True))
+                for ticker in batch:
+                    frame = bars.get(ticker)
+                    if frame is None:
+                        refetch.append(ticker)
+                        continue
+                    if "Stock Splits" in frame.columns and (frame["Stock Splits"].fillna(0) > 0).any():
+                        print(f"  {ticker}: stock split detected, rebuilding highs")
+                        store.pop(ticker, None)
+                        cold.append(ticker)
+                        continue
+                    highs_store.update_entry(store[ticker], frame)
+        
+        if refetch:
+            print(f"  {len(refetch)} warm tickers missing from their batches; downloading full history")
+            cold.extend(refetch)
+        
+        updated = set()
+        for start in range(0, len(cold), batch_size):
+            batch = cold[start:start + batch_size]
+            print(f"  Downloading full history batch {start // batch_size + 1} "
+                  f"({len(batch)} tickers)...", flush=True)
+            bars = download_history(batch, "max", provider)
+            for ticker, frame in bars.items():
+                store[ticker] = highs_store.update_entry(highs_store.new_entry(), frame)
+            updated.update(bars)
+        
+        stale = [ticker for ticker in refetch if ticker not in updated]
+        if stale:
+            print(f"  Warning: {len(stale)} tickers still stale (highs as of their last stored date): "
+                  f"{', '.join(stale[:10])}{' ...' if len(stale) > 10 else ''}")
+        
+        highs_store.save_store(store, store_path)
+        return {ticker: highs_store.entry_highs(store[ticker]) for ticker in tickers if ticker in store}
+
+
+def build_quote(ticker: str, company_name=None, price=None, market_cap=None,
+                yr_high=None, yr_low=None, all_time_high=None) -> dict:
+    """
+    Build the quote dict for a ticker from raw values.
+    Computes % from highs and the At 52W High / At ATH flags.
+    
+    The all-time high comes from daily bars that may lag the live quote, so
+    it is raised to the quote's 52-week high or price when they are higher.
+    """
+    known = [v for v in (all_time_high, yr_high, price) if v is not None and not pd.isna(v)]
+    all_time_high = max(known) if known else None
+    
     # Calculate percentages from highs
     pct_from_52w_high = None
     pct_from_ath = None
@@ -115,19 +341,122 @@ def fetch_quote(ticker: str) -> dict:
     }
 
 
-def main() -> pd.DataFrame:
+def fetch_quotes(
+    tickers: list,
+    fetch_fn=None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    on_result=None,
+) -> list:
+    """
+    Fetch quotes for many tickers on the shared bounded worker pool
+    (see tracker_core.fetch.fetch_all); a ticker that never succeeds gets
+    an empty quote.
+    
+    Args:
+        tickers: List of ticker symbols
+        fetch_fn: Callable(ticker) -> quote dict (defaults to fetch_quote);
+            pass a stub provider to test without network access
+        max_workers: Concurrency limit
+        timeout: Per-attempt timeout in seconds
+        retries: Number of retries after the first failed attempt
+        backoff: Base retry delay in seconds
+        on_result: Optional callable(index, quote) called as each ticker finishes
+    
+    Returns:
+        List of quote dicts in the same order as tickers
+    """
+    return fetch.fetch_all(
+        tickers,
+        fetch_fn or fetch_quote,
+        fallback_fn=build_quote,
+        max_workers=max_workers,
+        timeout=timeout,
+        retries=retries,
+        backoff=backoff,
+        on_result=on_result,
+    )
+
+
+def save_snapshot_binary(df: pd.DataFrame, path: str = SNAPSHOT_BINARY_FILE):
+    """
+    Save the snapshot as a typed Feather file next to snapshot.txt, so cached
+    runs can load it directly instead of parsing the text table.
+    """
+    typed = pd.DataFrame(index=df.index)
+    for col, dtype in SNAPSHOT_COLUMNS.items():
+        values = df[col] if col in df.columns else pd.Series(pd.NA, index=df.index)
+        if dtype == "float64":
+            typed[col] = pd.to_numeric(values, errors="coerce").astype("float64")
+        elif dtype == "bool":
+            typed[col] = values.astype("boolean").fillna(False).astype(bool)
+        else:
+            typed[col] = values.astype(dtype)
+    
+    storage.atomic_write(path, typed.reset_index(drop=True).to_feather)
+
+
+def load_snapshot_binary(path: str = SNAPSHOT_BINARY_FILE) -> pd.DataFrame:
+    """Load the typed Feather snapshot written by save_snapshot_binary()."""
+    return pd.read_feather(path)
+
+
+def main(
+    tickers: list = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    batched: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    incremental: bool = False,
+    on_quote=None,
+    provider=None,
+) -> pd.DataFrame:
     """
     Fetch quotes for all tickers and return a DataFrame.
-    Also exports a styled PNG table.
+    Also saves the formatted table to output/snapshot.txt.
+    
+    Args:
+        tickers: List of ticker symbols. If None, uses all TICKERS.
+        max_workers: Number of quotes fetched concurrently.
+        batched: If True, download highs for batch_size tickers per call
+            instead of one history(period="max") call per ticker.
+        batch_size: Tickers per download in batched mode.
+        incremental: If True, update highs from the persistent highs store,
+            downloading only bars since the last run (implies batched).
+        on_quote: Optional callable(quote) called as each quote arrives,
+            before the whole snapshot is complete.
+        provider: Market data provider (defaults to yfinance); pass a
+            providers.ReplayProvider to run without network access.
     """
-    print(f"Fetching quotes for {len(TICKERS)} NASDAQ stocks...")
+    if tickers is None:
+        tickers = get_tickers()
+    
+    highs = None
+    if incremental:
+        print(f"Updating highs store for {len(tickers)} stocks...")
+        highs = fetch_highs_incremental(tickers, batch_size=batch_size, provider=provider)
+    elif batched:
+        print(f"Downloading highs for {len(tickers)} stocks in batches of {batch_size}...")
+        highs = fetch_highs(tickers, batch_size=batch_size, provider=provider)
+    
+    if highs is None:
+        fetch_fn = lambda ticker: fetch_quote(ticker, provider=provider)
+    else:
+        fetch_fn = lambda ticker: fetch_quote(ticker, highs=highs.get(ticker, {}), provider=provider)
+    
+    print(f"Fetching quotes for {len(tickers)} NASDAQ stocks ({max_workers} workers)...")
     
-    rows = []
-    for symbol in TICKERS:
-        print(f"  {symbol}...", end=" ", flush=True)
-        quote = fetch_quote(symbol)
-        rows.append(quote)
-        print("✓")
+    done_count = 0
+
+    def progress(idx, quote):
+        nonlocal done_count
+        done_count += 1
+        print(f"  [{done_count}/{len(tickers)}] {tickers[idx]} ✓", flush=True)
+        if on_quote is not None:
+            on_quote(quote)
+
+    rows = fetch_quotes(tickers, fetch_fn, max_workers=max_workers, on_result=progress)
 
     df = pd.DataFrame(rows)
 
@@ -144,6 +473,8 @@ def main() -> pd.DataFrame:
     ]
     
     # Format table output
+    from tabulate import tabulate
+
     table_output = tabulate(
         df[display_cols],
         headers="keys",
@@ -158,7 +489,7 @@ def main() -> pd.DataFrame:
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     # Save to single output file (overwrite each time)
-    output_file = os.path.join(OUTPUT_DIR, "snapshot.txt")
+    output_file = SNAPSHOT_TEXT_FILE
     
     with open(output_file, "w", encoding="utf-8") as f:
         f.write(f"S&P 500 High Tracker Snapshot\n")
@@ -168,7 +499,10 @@ def main() -> pd.DataFrame:
         f.write(table_output)
         f.write("\n")
     
-    print(f"\nSaved to {output_file}")
+    # Typed copy for fast --use-cache loads
+    save_snapshot_binary(df)
+    
+    print(f"\nSaved to {output_file} and {SNAPSHOT_BINARY_FILE}")
 
     return df
 
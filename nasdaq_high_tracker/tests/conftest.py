@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import the tracker's modules the way its scripts do: from the tracker directory
+TRACKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(TRACKER_DIR))
+sys.path.insert(0, TRACKER_DIR)
@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+import pytest
+
+import agent
+import analysis_queue
+from tracker_core import entry_log
+
+
+@pytest.fixture
+def queue_dir(tmp_path, monkeypatch):
+    """A temporary queue, analysis log and response cache (nothing under output/)."""
+    monkeypatch.setattr(agent, "ANALYSIS_LOG", str(tmp_path / "ai_analysis.log"))
+    monkeypatch.setattr(agent, "ANALYSIS_FILE", str(tmp_path / "ai_analysis.md"))
+    monkeypatch.setattr(agent, "load_response_cache", lambda path=None: {})
+    monkeypatch.setattr(agent, "cache_response", lambda *args, **kwargs: None)
+    return str(tmp_path / "analysis_queue")
+
+
+def momentum():
+    return pd.DataFrame([{
+        "Ticker": "AAA", "Name": "Alpha", "Price": 101.0, "Daily Change %": 1.5,
+        "Weekly Change %": 3.0, "% From 52W High": 0.0, "% From ATH": 0.0,
+        "At 52W High": True, "At ATH": True, "Sentiment": "Bullish",
+        "Sector": "Information Technology", "Tech": True,
+    }])
+
+
+def test_claim_moves_a_job_once(queue_dir):
+    name = os.path.basename(analysis_queue.enqueue(momentum(), pd.DataFrame(), queue_dir))
+
+    path = analysis_queue.claim(name, queue_dir)
+    assert path == os.path.join(queue_dir, "processing", name)
+    assert analysis_queue.claim(name, queue_dir) is None
+    assert analysis_queue.pending_count(queue_dir) == 0
+
+
+def test_stale_claims_are_requeued(queue_dir):
+    name = os.path.basename(analysis_queue.enqueue(momentum(), pd.DataFrame(), queue_dir))
+    analysis_queue.claim(name, queue_dir)
+
+    assert analysis_queue.requeue_stale(stale_after=60, queue_dir=queue_dir) == 0
+    assert analysis_queue.requeue_stale(stale_after=0, queue_dir=queue_dir) == 1
+    assert analysis_queue.pending_count(queue_dir) == 1
+
+
+def test_process_queue_saves_each_job(queue_dir):
+    analysis_queue.enqueue(momentum(), pd.DataFrame(), queue_dir)
+    analysis_queue.enqueue(momentum(), pd.DataFrame(), queue_dir)
+
+    counts = analysis_queue.process_queue(llm=analysis_queue.fake_llm(), queue_dir=queue_dir, backoff=0)
+
+    assert counts == {"done": 2, "failed": 0}
+    assert len(os.listdir(os.path.join(queue_dir, "done"))) == 2
+    entries = entry_log.read_entries(agent.ANALYSIS_LOG)
+    assert [e["text"] for e in entries] == ["**Fake analysis** - no model was called."] * 2
+    with open(agent.ANALYSIS_FILE, encoding="utf-8") as f:
+        assert "Fake analysis" in f.read()
+
+
+def test_requeued_job_is_saved_once(queue_dir, monkeypatch):
+    analysis_queue.enqueue(momentum(), pd.DataFrame(), queue_dir)
+
+    # Crash after the analysis is saved but before the job reaches done/
+    def crash(job, path):
+        raise KeyboardInterrupt
+    with monkeypatch.context() as m:
+        m.setattr(analysis_queue, "_write_job", crash)
+        with pytest.raises(KeyboardInterrupt):
+            analysis_queue.process_queue(llm=analysis_queue.fake_llm(), queue_dir=queue_dir, backoff=0)
+    assert entry_log.count_entries(agent.ANALYSIS_LOG) == 1
+
+    assert analysis_queue.requeue_stale(stale_after=0, queue_dir=queue_dir) == 1
+    counts = analysis_queue.process_queue(llm=analysis_queue.fake_llm(), queue_dir=queue_dir, backoff=0)
+
+    assert counts == {"done": 1, "failed": 0}
+    assert entry_log.count_entries(agent.ANALYSIS_LOG) == 1
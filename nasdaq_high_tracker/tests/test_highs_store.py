@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+import highs_store
+
+
+def bars(days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    index = pd.date_range("2024-01-01", periods=days, freq="D")
+    return pd.DataFrame({"High": close * 1.01, "Low": close * 0.99}, index=index)
+
+
+def expected(frame: pd.DataFrame) -> dict:
+    """Highs computed directly from the full history."""
+    last = frame.index.max()
+    window = frame[frame.index > last - pd.Timedelta(days=highs_store.WINDOW_DAYS)]
+    return {
+        "All-Time High": float(frame["High"].max()),
+        "52W High": float(window["High"].max()),
+        "52W Low": float(window["Low"].min()),
+        "Last Date": last.strftime("%Y-%m-%d"),
+    }
+
+
+def test_incremental_updates_match_full_history():
+    frame = bars(900)
+    entry = highs_store.new_entry()
+    for start in range(0, len(frame), 37):
+        highs_store.update_entry(entry, frame.iloc[start:start + 37])
+        assert highs_store.entry_highs(entry) == expected(frame.iloc[:start + 37])
+
+
+def test_window_queues_stay_monotonic():
+    entry = highs_store.update_entry(highs_store.new_entry(), bars(500, seed=1))
+
+    highs = [value for _, value in entry["Window High"]]
+    lows = [value for _, value in entry["Window Low"]]
+    assert highs == sorted(highs, reverse=True)
+    assert lows == sorted(lows)
+    assert len(highs) < highs_store.WINDOW_DAYS
+
+
+def test_redownloaded_bar_replaces_the_stored_one():
+    frame = bars(10)
+    entry = highs_store.update_entry(highs_store.new_entry(), frame)
+
+    # The last day is downloaded again with a lower, revised high
+    revised = frame.iloc[-1:].copy()
+    revised["High"] = frame["High"].min() - 1
+    highs_store.update_entry(entry, revised)
+
+    assert [date for date, _ in entry["Window High"]].count(entry["Last Date"]) == 1
+    assert entry["Window High"][-1][1] == revised["High"].iloc[0]
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / "highs_store.json")
+    store = {"AAA": highs_store.update_entry(highs_store.new_entry(), bars(30))}
+
+    highs_store.save_store(store, path)
+
+    assert highs_store.load_store(path) == store
+    assert highs_store.load_store(str(tmp_path / "missing.json")) == {}
@@ -0,0 +1,62 @@
+import json
+from datetime import datetime, timezone
+
+import snapshot
+from intraday import IntradayTracker
+
+from tracker_core import providers
+
+
+def daemon_at(tmp_path, monkeypatch, prices: dict) -> IntradayTracker:
+    """A started tracker without the startup snapshot: AAA has a 52W high of 100, ATH 120."""
+    fixture = {"quotes": {ticker: {"price": price} for ticker, price in prices.items()}}
+    daemon = IntradayTracker(
+        tickers=list(prices),
+        provider=providers.ReplayProvider(fixture),
+        events_file=str(tmp_path / "breakouts.jsonl"),
+    )
+    for ticker, price in prices.items():
+        quote = snapshot.build_quote(ticker, ticker, price, None, 100.0, 50.0, 120.0)
+        daemon.quotes[ticker] = quote
+        daemon.flags[ticker] = (quote["At 52W High"], quote["At ATH"])
+    daemon.highs_date = datetime.now(timezone.utc).date()
+    daemon.saved_at = float("inf")
+    monkeypatch.setattr(daemon, "save", lambda: 0)
+    return daemon
+
+
+def test_breakouts_emitted_once_per_flag_flip(tmp_path, monkeypatch):
+    daemon = daemon_at(tmp_path, monkeypatch, {"AAA": 90.0, "BBB": 60.0})
+    events = []
+    daemon.on_breakout = events.append
+    quotes = daemon.provider.fixture["quotes"]
+
+    assert daemon.poll()["breakouts"] == 0
+
+    quotes["AAA"]["price"] = 101.0
+    assert daemon.poll()["breakouts"] == 1
+    # Still at the 52W high: no second event
+    quotes["AAA"]["price"] = 101.5
+    assert daemon.poll()["breakouts"] == 0
+
+    quotes["AAA"]["price"] = 125.0
+    assert daemon.poll()["breakouts"] == 1
+
+    assert [(e["Ticker"], e["New 52W High"], e["New ATH"]) for e in events] == [
+        ("AAA", True, False),
+        ("AAA", False, True),
+    ]
+    # The new price became the in-memory high
+    assert daemon.quotes["AAA"]["All-Time High"] == 125.0
+    with open(daemon.events_file, encoding="utf-8") as f:
+        assert [json.loads(line)["Ticker"] for line in f] == ["AAA", "AAA"]
+
+
+def test_breakout_after_falling_back(tmp_path, monkeypatch):
+    daemon = daemon_at(tmp_path, monkeypatch, {"AAA": 101.0})
+    quotes = daemon.provider.fixture["quotes"]
+
+    quotes["AAA"]["price"] = 80.0
+    assert daemon.poll()["breakouts"] == 0
+    quotes["AAA"]["price"] = 102.0
+    assert daemon.poll()["breakouts"] == 1
@@ -0,0 +1,43 @@
+import pandas as pd
+
+import latest_state
+
+
+def rows(ticker: str, days: list, start: float = 100.0) -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": [pd.Timestamp("2026-01-01", tz="UTC") + pd.Timedelta(days=d) for d in days],
+        "Ticker": ticker,
+        "Price": [start + d for d in days],
+    })
+
+
+def test_prune_keeps_window_anchor_and_last_rows():
+    window = pd.Timedelta(days=10)
+    df = pd.concat([rows("AAA", [0, 5, 15, 20, 25, 30]), rows("BBB", [0, 1])])
+
+    out = latest_state.prune(df, rows=2, window=window)
+
+    # AAA: rows inside the window (>= day 20) plus the as-of row before it (day 20 itself)
+    assert out[out["Ticker"] == "AAA"]["Price"].tolist() == [120.0, 125.0, 130.0]
+    # BBB has no row before its window: everything is kept
+    assert out[out["Ticker"] == "BBB"]["Price"].tolist() == [100.0, 101.0]
+
+
+def test_prune_keeps_anchor_when_window_has_no_exact_row():
+    df = rows("AAA", [0, 5, 18, 30])
+
+    out = latest_state.prune(df, rows=2, window=pd.Timedelta(days=10))
+
+    assert out["Price"].tolist() == [118.0, 130.0]
+
+
+def test_merge_matches_pruning_the_full_history():
+    first, second = rows("AAA", list(range(0, 60, 3))), rows("AAA", list(range(60, 90, 3)))
+    state = latest_state.prune(latest_state.history_store.normalize(first))
+
+    merged = latest_state.merge(state, second)
+
+    full = latest_state.prune(latest_state.history_store.normalize(pd.concat([first, second])))
+    pd.testing.assert_frame_equal(merged.reset_index(drop=True), full.reset_index(drop=True))
+    # Pruning is idempotent, so merging nothing keeps the state
+    pd.testing.assert_frame_equal(latest_state.merge(state, second.iloc[:0]), state)
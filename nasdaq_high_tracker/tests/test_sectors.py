@@ -0,0 +1,52 @@
+import json
+
+import pandas as pd
+
+import sectors
+
+
+def write_constituents(tmp_path) -> str:
+    path = tmp_path / "constituents.json"
+    path.write_text(json.dumps({
+        "AAPL": {"Sector": "Information Technology", "Industry": "Technology Hardware"},
+        "GOOGL": {"Sector": "Communication Services", "Industry": "Interactive Media & Services"},
+        "PEP": {"Sector": "Consumer Staples", "Industry": "Soft Drinks"},
+        "NEW": {},
+    }), encoding="utf-8")
+    return str(path)
+
+
+def test_load_index(tmp_path):
+    index = sectors.load_index(write_constituents(tmp_path))
+
+    assert index.loc["AAPL", "Tech"] and index.loc["GOOGL", "Tech"]
+    assert not index.loc["PEP", "Tech"]
+    assert index.loc["NEW", "Sector"] == sectors.UNKNOWN
+    assert sectors.load_index(str(tmp_path / "missing.json")).empty
+
+
+def test_add_sectors_places_tags_after_name(tmp_path):
+    index = sectors.load_index(write_constituents(tmp_path))
+    df = pd.DataFrame({
+        "Ticker": ["PEP", "ZZZ", "AAPL"],
+        "Name": ["PepsiCo", "Unlisted", "Apple"],
+        "Price": [150.0, 1.0, 200.0],
+    })
+
+    tagged = sectors.add_sectors(df, index)
+
+    assert list(tagged.columns) == ["Ticker", "Name", *sectors.SECTOR_COLUMNS, "Price"]
+    assert tagged["Sector"].tolist() == ["Consumer Staples", sectors.UNKNOWN, "Information Technology"]
+    assert tagged["Tech"].tolist() == [False, False, True]
+    assert tagged["Price"].tolist() == df["Price"].tolist()
+    # Re-tagging replaces the old columns instead of duplicating them
+    assert list(sectors.add_sectors(tagged, index).columns) == list(tagged.columns)
+    assert sectors.has_sectors(tagged)
+
+
+def test_add_sectors_empty_frame(tmp_path):
+    index = sectors.load_index(write_constituents(tmp_path))
+    empty = pd.DataFrame(columns=["Ticker", "Name"])
+
+    assert list(sectors.add_sectors(empty, index).columns) == ["Ticker", "Name", *sectors.SECTOR_COLUMNS]
+    assert not sectors.has_sectors(empty)
@@ -0,0 +1,73 @@
+import snapshot
+from tracker_core import providers
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+class FailingBatches:
+    """Provider whose batch downloads return nothing; per-ticker history still works."""
+
+    def __init__(self, fixture, failing_history=()):
+        self.replay = providers.ReplayProvider(fixture)
+        self.failing_history = failing_history
+        self.downloads = 0
+
+    def download(self, tickers, **kwargs):
+        self.downloads += 1
+        return {}
+
+    def history(self, ticker, period="max"):
+        if ticker in self.failing_history:
+            raise ConnectionError("down")
+        return self.replay.history(ticker, period)
+
+
+def test_failed_batch_falls_back_to_per_ticker_history(capsys):
+    fixture = providers.synthetic_fixture(TICKERS, days=400)
+    provider = FailingBatches(fixture, failing_history=["CCC"])
+
+    highs = snapshot.fetch_highs(TICKERS, provider=provider)
+
+    assert provider.downloads == 2  # the batch and one retry
+    assert highs == snapshot.fetch_highs(TICKERS[:2], provider=providers.ReplayProvider(fixture))
+    assert "1 of 3 tickers still without highs: CCC" in capsys.readouterr().out
+
+
+class FailingDeltas(providers.ReplayProvider):
+    """Replay provider whose since-last-run downloads return nothing."""
+
+    def download(self, tickers, start=None, **kwargs):
+        if start is not None:
+            return {}
+        return super().download(tickers, start=start, **kwargs)
+
+
+def truncated(fixture: dict, days: int) -> dict:
+    return {**fixture, "bars": {
+        ticker: {key: values[:days] for key, values in bars.items()}
+        for ticker, bars in fixture["bars"].items()
+    }}
+
+
+def test_failed_warm_batch_falls_back_to_full_history(tmp_path, capsys):
+    store_path = str(tmp_path / "highs_store.json")
+    fixture = providers.synthetic_fixture(TICKERS, days=400)
+    snapshot.fetch_highs_incremental(TICKERS, store_path=store_path,
+                                     provider=providers.ReplayProvider(truncated(fixture, 390)))
+
+    highs = snapshot.fetch_highs_incremental(TICKERS, store_path=store_path, provider=FailingDeltas(fixture))
+
+    assert highs == snapshot.fetch_highs_incremental(
+        TICKERS, store_path=str(tmp_path / "fresh.json"), provider=providers.ReplayProvider(fixture))
+    assert "3 warm tickers missing from their batches" in capsys.readouterr().out
+
+
+def test_all_time_high_is_never_below_the_quote():
+    quote = snapshot.build_quote("ACGL", price=360.0, yr_high=366.75, all_time_high=366.01)
+    assert quote["All-Time High"] == 366.75
+    assert quote["% From ATH"] == quote["% From 52W High"]
+
+    quote = snapshot.build_quote("NEW", price=12.0, yr_high=None, all_time_high=None)
+    assert quote["All-Time High"] == 12.0 and quote["At ATH"]
+
+    assert snapshot.build_quote("NONE")["All-Time High"] is None
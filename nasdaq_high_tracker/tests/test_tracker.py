@@ -0,0 +1,34 @@
+import pandas as pd
+
+from benchmarks.bench_detect_new_highs import detect_new_highs_loop, synthetic_history
+from tracker import detect_new_highs
+
+
+def sort(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values("Ticker").reset_index(drop=True)
+
+
+def test_detect_new_highs_matches_loop_version():
+    df = synthetic_history(5000, 300)
+
+    expected = detect_new_highs_loop(df)
+    assert not expected.empty
+    pd.testing.assert_frame_equal(sort(detect_new_highs(df)), sort(expected), check_dtype=False)
+
+
+def test_detect_new_highs_on_missing_flags_and_single_rows():
+    df = pd.DataFrame({
+        "timestamp": pd.to_datetime(["2026-01-01", "2026-01-02", "2026-01-01", "2026-01-02", "2026-01-02"], utc=True),
+        "Ticker": ["AAA", "AAA", "BBB", "BBB", "CCC"],
+        "Price": [1.0, 2.0, 3.0, 4.0, 5.0],
+        "At 52W High": [False, True, None, True, True],
+        "At ATH": [False, False, False, True, True],
+    })
+
+    out = detect_new_highs(df)
+
+    # BBB's missing previous 52W flag is not a "was not at high"; CCC has no previous row
+    assert out["Ticker"].tolist() == ["AAA", "BBB"]
+    assert out["New 52W High"].tolist() == [True, False]
+    assert out["New ATH"].tolist() == [False, True]
+    assert detect_new_highs(df.iloc[:0]).empty
@@ -5,56 +5,86 @@ Orchestrates snapshots, tracks history, and identifies high breakouts.
 """
 
 import os
+import sys
 import argparse
-from datetime import datetime, timezone, timedelta
+import subprocess
+from datetime import datetime, timezone
 
 import pandas as pd
 
 import snapshot
-import sentiment
-import agent
+import sectors
+import history_store
+import latest_state
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import changes, momentum, providers, render, storage
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
-HISTORY_FILE = os.path.join(OUTPUT_DIR, "stocks_at_highs.txt")
+HISTORY_FILE = os.path.join(OUTPUT_DIR, "stocks_at_highs.txt")  # legacy CSV, migrated on first run
 SNAPSHOT_FILE = os.path.join(OUTPUT_DIR, "snapshot.txt")
+LAST_PRICES_FILE = os.path.join(OUTPUT_DIR, "last_prices.json")
 
 
-def load_history() -> pd.DataFrame:
-    """Load historical data from CSV file."""
-    if os.path.exists(HISTORY_FILE):
-        return pd.read_csv(HISTORY_FILE, parse_dates=["timestamp"])
-    else:
-        return pd.DataFrame(
-            columns=[
-                "timestamp",
-                "Ticker",
-                "Name",
-                "Price",
-                "Market Cap (B)",
-                "52W High",
-                "52W Low",
-                "% From 52W High",
-                "All-Time High",
-                "% From ATH",
-                "At 52W High",
-                "At ATH",
-                "Sentiment",
-                "Sentiment Score",
-            ]
-        )
+def migrate_history():
+    """Migrate the legacy CSV history into the Parquet store on first use."""
+    if not history_store.exists() and os.path.exists(HISTORY_FILE):
+        history_store.migrate_csv(HISTORY_FILE)
+
+
+def load_history(columns: list = None) -> pd.DataFrame:
+    """
+    Load historical data from the Parquet history store.
+    
+    Args:
+        columns: Columns to read (default: all)
+    """
+    migrate_history()
+    return history_store.load_history(columns=columns)
 
 
-def save_history(df_hist: pd.DataFrame):
-    """Save historical data to CSV file."""
-    df_hist.to_csv(HISTORY_FILE, index=False)
+def load_latest_state() -> pd.DataFrame:
+    """
+    Load the latest-state cache (last rows per ticker plus the momentum
+    lookback window). Rebuilt from full history if missing.
+    """
+    migrate_history()
+    return latest_state.load_state()
+
+
+def save_history(df_append: pd.DataFrame):
+    """Append new rows to the history store (existing data is not rewritten)."""
+    history_store.append_history(df_append)
 
 
 def load_snapshot_from_file() -> pd.DataFrame:
     """
-    Load snapshot data from output/snapshot.txt file.
-    Used for testing without making API calls to yfinance.
+    Load the cached snapshot without making API calls to yfinance.
+    Reads the typed output/snapshot.feather when it is at least as new as
+    snapshot.txt, otherwise falls back to parsing the text table.
+    """
+    binary_file = snapshot.SNAPSHOT_BINARY_FILE
+    if os.path.exists(binary_file) and (
+        not os.path.exists(SNAPSHOT_FILE)
+        or os.path.getmtime(binary_file) >= os.path.getmtime(SNAPSHOT_FILE)
+    ):
+        try:
+            df = snapshot.load_snapshot_binary(binary_file)
+            print(f"Loaded {len(df)} stocks from {binary_file}")
+            return df
+        except Exception as e:
+            print(f"Warning: could not read {binary_file} ({e}); parsing {SNAPSHOT_FILE}")
+    
+    return parse_snapshot_text()
+
+
+def parse_snapshot_text() -> pd.DataFrame:
+    """
+    Load snapshot data from the output/snapshot.txt table.
+    Fallback for --use-cache when no binary snapshot is available.
     """
     if not os.path.exists(SNAPSHOT_FILE):
         print(f"Error: {SNAPSHOT_FILE} not found.")
@@ -108,146 +138,138 @@ def load_snapshot_from_file() -> pd.DataFrame:
 
 def latest_prices_by_ticker(df_hist: pd.DataFrame) -> pd.Series:
     """Get the latest price for each ticker from history."""
-    if df_hist.empty:
-        return pd.Series(dtype=float)
-    df_sorted = df_hist.sort_values(["Ticker", "timestamp"])
-    return df_sorted.groupby("Ticker")["Price"].last()
+    return changes.latest_prices(df_hist)
 
 
-def prices_changed(df_snap: pd.DataFrame, last_prices: pd.Series) -> bool:
+def load_last_prices() -> pd.Series:
+    """
+    Load the last stored price per ticker from the persisted index.
+    Rebuilds the index from history if it is missing.
+    """
+    if not history_store.exists() and not os.path.exists(HISTORY_FILE):
+        return pd.Series(dtype=float)
+    
+    last_prices = changes.load_last_prices(LAST_PRICES_FILE)
+    if last_prices is None:
+        last_prices = latest_prices_by_ticker(load_latest_state())
+        changes.save_last_prices(last_prices, LAST_PRICES_FILE)
+    return last_prices
+
+
+def prices_changed(
+    df_snap: pd.DataFrame,
+    last_prices: pd.Series,
+    tolerance: float = changes.DEFAULT_TOLERANCE,
+) -> bool:
     """Check if any prices have changed since last snapshot."""
-    if last_prices.empty:
-        return True
-
-    for _, row in df_snap.iterrows():
-        ticker = row["Ticker"]
-        new_price = row["Price"]
-        old_price = last_prices.get(ticker, None)
-
-        if pd.isna(new_price):
-            continue
-
-        if old_price is None or pd.isna(old_price):
-            return True
+    return changes.prices_changed(df_snap, last_prices, tolerance)
 
-        try:
-            if abs(float(new_price) - float(old_price)) > 0.01:
-                return True
-        except Exception:
-            return True
 
-    return False
+def _matches(df: pd.DataFrame, col: str, value: bool, default: bool) -> pd.Series:
+    """Vectorized `row.get(col, default) == value` that treats NaN/NA as no match."""
+    if col not in df.columns:
+        return pd.Series(default == value, index=df.index)
+    return df[col].eq(value).fillna(False).astype(bool)
 
 
 def detect_new_highs(df_hist: pd.DataFrame) -> pd.DataFrame:
     """
     Detect stocks that recently broke to new 52W highs or ATH.
+    Compares each ticker's latest row with the one before it.
     Returns DataFrame of breakout stocks.
     """
     if df_hist.empty:
         return pd.DataFrame()
     
-    df_hist = df_hist.sort_values(["Ticker", "timestamp"])
+    current, previous = momentum.latest_and_previous(df_hist)
     
-    breakouts = []
-    for ticker, g in df_hist.groupby("Ticker"):
-        if len(g) < 2:
-            continue
-        
-        g = g.reset_index(drop=True)
-        current = g.iloc[-1]
-        previous = g.iloc[-2]
-        
-        # Check if just broke to 52W high (wasn't at high, now is)
-        new_52w = (
-            current.get("At 52W High", False) == True and 
-            previous.get("At 52W High", False) == False
-        )
-        
-        # Check if just broke to ATH
-        new_ath = (
-            current.get("At ATH", False) == True and 
-            previous.get("At ATH", False) == False
-        )
-        
-        if new_52w or new_ath:
-            breakouts.append({
-                "Ticker": ticker,
-                "Name": current.get("Name"),
-                "Price": current["Price"],
-                "New 52W High": new_52w,
-                "New ATH": new_ath,
-                "% From 52W High": current.get("% From 52W High"),
-                "% From ATH": current.get("% From ATH"),
-                "Sentiment": current.get("Sentiment"),
-            })
-    
-    return pd.DataFrame(breakouts)
-
-
-def compute_momentum(df_hist: pd.DataFrame) -> pd.DataFrame:
+    # Only tickers with at least two rows can break out
+    current = current.loc[previous.index]
+    
+    # Just broke to 52W high / ATH (wasn't at high, now is)
+    new_52w = (
+        _matches(current, "At 52W High", True, False) &
+        _matches(previous, "At 52W High", False, False)
+    )
+    new_ath = (
+        _matches(current, "At ATH", True, False) &
+        _matches(previous, "At ATH", False, False)
+    )
+    
+    mask = (new_52w | new_ath).to_numpy()
+    if not mask.any():
+        return pd.DataFrame()
+    
+    current = current[mask]
+    
+    def column(col):
+        if col in current.columns:
+            return current[col].to_numpy()
+        return None
+    
+    return pd.DataFrame({
+        "Ticker": current.index.to_numpy(),
+        "Name": column("Name"),
+        "Price": current["Price"].to_numpy(),
+        "New 52W High": new_52w.to_numpy()[mask],
+        "New ATH": new_ath.to_numpy()[mask],
+        "% From 52W High": column("% From 52W High"),
+        "% From ATH": column("% From ATH"),
+        "Sentiment": column("Sentiment"),
+    })
+
+
+def compute_momentum(df_hist: pd.DataFrame, windows: dict = None) -> pd.DataFrame:
     """
     Compute daily and weekly price momentum for each ticker.
     Also tracks movement toward/away from highs.
+    
+    Args:
+        df_hist: Full history DataFrame
+        windows: Extra lookback windows, {column name: pd.Timedelta},
+            e.g. momentum.EXTENDED_WINDOWS for 1D/5D/21D/63D changes
     """
-    df_hist = df_hist.sort_values(["Ticker", "timestamp"])
+    all_windows = dict(momentum.DEFAULT_WINDOWS)
+    all_windows.update(windows or {})
     
-    results = []
-    for ticker, g in df_hist.groupby("Ticker"):
-        g = g.reset_index(drop=True)
-        if len(g) == 0:
-            continue
+    df = momentum.compute_momentum(
+        df_hist, windows=all_windows, high_col="% From 52W High"
+    )
+    if df.empty:
+        return df
+    
+    columns = [
+        "Ticker", "Name", "Price", "Market Cap (B)", "Daily Change %",
+        *all_windows, "% From 52W High", "% From ATH", "High Momentum",
+        "At 52W High", "At ATH", "Sentiment", "Sentiment Score",
+    ]
+    return df.reindex(columns=columns)
+
+
+def _print_by_sector(df: pd.DataFrame, pct_col: str):
+    """Print stock rows under a header per sector (largest sector first), or flat without sector data."""
+    if sectors.has_sectors(df):
+        groups = df.groupby("Sector", sort=False)
+        order = groups.size().sort_values(ascending=False, kind="stable").index
+        parts = [(f"   [{sector}]", groups.get_group(sector)) for sector in order]
+    else:
+        parts = [(None, df)]
+    
+    for title, rows in parts:
+        if title:
+            print(title)
+        for _, row in rows.iterrows():
+            name = row.get('Name', '') or ''
+            name_short = name[:25] + "..." if len(name) > 25 else name
+            print(f"   {row['Ticker']:6} {name_short:28} ${row['Price']:8.2f}  "
+                  f"({row[pct_col]:+.2f}%)")
 
-        last_row = g.iloc[-1]
-        last_time = last_row["timestamp"]
-        last_price = last_row["Price"]
-
-        # Daily change
-        daily_change = None
-        if len(g) >= 2 and pd.notna(g["Price"].iloc[-2]) and pd.notna(last_price):
-            prev_price = g["Price"].iloc[-2]
-            if prev_price not in (None, 0):
-                daily_change = (last_price / prev_price - 1) * 100
-
-        # Weekly change (5 days)
-        weekly_change = None
-        cutoff_time = last_time - timedelta(days=5)
-        weekly_candidates = g[g["timestamp"] <= cutoff_time]
-        
-        if not weekly_candidates.empty and pd.notna(last_price) and last_price not in (None, 0):
-            weekly_row = weekly_candidates.iloc[-1]
-            weekly_price = weekly_row["Price"]
-            if pd.notna(weekly_price) and weekly_price not in (None, 0):
-                weekly_change = (last_price / weekly_price - 1) * 100
-
-        # Movement toward 52W high (positive = moving toward high)
-        high_momentum = None
-        if len(g) >= 2:
-            prev_pct = g["% From 52W High"].iloc[-2]
-            curr_pct = last_row.get("% From 52W High")
-            if pd.notna(prev_pct) and pd.notna(curr_pct):
-                high_momentum = curr_pct - prev_pct  # Positive = closer to high
-
-        results.append({
-            "Ticker": ticker,
-            "Name": last_row.get("Name"),
-            "Price": last_price,
-            "Market Cap (B)": last_row.get("Market Cap (B)"),
-            "Daily Change %": daily_change,
-            "Weekly Change %": weekly_change,
-            "% From 52W High": last_row.get("% From 52W High"),
-            "% From ATH": last_row.get("% From ATH"),
-            "High Momentum": high_momentum,
-            "At 52W High": last_row.get("At 52W High"),
-            "At ATH": last_row.get("At ATH"),
-            "Sentiment": last_row.get("Sentiment"),
-            "Sentiment Score": last_row.get("Sentiment Score"),
-        })
-
-    return pd.DataFrame(results)
-
-
-def print_summary(df_momentum: pd.DataFrame, df_breakouts: pd.DataFrame):
+
+def print_summary(
+    df_momentum: pd.DataFrame,
+    df_breakouts: pd.DataFrame,
+    sentiment_stats: dict = None,
+):
     """Print a summary of the high tracker analysis."""
     print("\n" + "=" * 70)
     print("📊 NASDAQ HIGH TRACKER SUMMARY")
@@ -257,21 +279,13 @@ def print_summary(df_momentum: pd.DataFrame, df_breakouts: pd.DataFrame):
     at_52w = df_momentum[df_momentum["At 52W High"] == True]
     if not at_52w.empty:
         print(f"\n🔥 Stocks at 52-Week High ({len(at_52w)}):")
-        for _, row in at_52w.iterrows():
-            name = row.get('Name', '') or ''
-            name_short = name[:25] + "..." if len(name) > 25 else name
-            print(f"   {row['Ticker']:6} {name_short:28} ${row['Price']:8.2f}  "
-                  f"({row['% From 52W High']:+.2f}%)")
+        _print_by_sector(at_52w, "% From 52W High")
     
     # Stocks at ATH
     at_ath = df_momentum[df_momentum["At ATH"] == True]
     if not at_ath.empty:
         print(f"\n🚀 Stocks at All-Time High ({len(at_ath)}):")
-        for _, row in at_ath.iterrows():
-            name = row.get('Name', '') or ''
-            name_short = name[:25] + "..." if len(name) > 25 else name
-            print(f"   {row['Ticker']:6} {name_short:28} ${row['Price']:8.2f}  "
-                  f"({row['% From ATH']:+.2f}%)")
+        _print_by_sector(at_ath, "% From ATH")
     
     # New breakouts
     if not df_breakouts.empty:
@@ -298,15 +312,42 @@ def print_summary(df_momentum: pd.DataFrame, df_breakouts: pd.DataFrame):
             print(f"   {row['Ticker']:6} {name_short:28} ${row['Price']:8.2f}  "
                   f"Momentum: {row['High Momentum']:+.2f}%")
     
+    # Sentiment pipeline timings and cache effectiveness
+    if sentiment_stats:
+        print(f"\n📰 Sentiment: fetch {sentiment_stats['fetch']:.2f}s, "
+              f"score {sentiment_stats['score']:.2f}s | cache: "
+              f"news {sentiment_stats['news_hits']} hits / {sentiment_stats['news_misses']} misses, "
+              f"headlines {sentiment_stats['score_hits']} hits / {sentiment_stats['score_misses']} misses")
+    
     print("\n" + "=" * 70)
 
 
-def main(use_cache: bool = False):
+def main(
+    use_cache: bool = False,
+    max_workers: int = snapshot.DEFAULT_MAX_WORKERS,
+    batched: bool = False,
+    batch_size: int = snapshot.DEFAULT_BATCH_SIZE,
+    incremental: bool = False,
+    tolerance: float = changes.DEFAULT_TOLERANCE,
+    analysis: str = "background",
+    provider=None,
+    llm=None,
+):
     """
     Main execution function.
     
     Args:
         use_cache: If True, load from output/snapshot.txt instead of calling yfinance API.
+        max_workers: Number of quotes fetched concurrently.
+        batched: If True, download highs in multi-ticker batches.
+        batch_size: Tickers per download in batched mode.
+        incremental: If True, update highs from the persistent highs store.
+        tolerance: Minimum price move (in $) that counts as a change.
+        analysis: How the AI analysis runs: "background" (queue it and start a
+            detached queue processor), "queue" (only queue it) or "inline".
+        provider: Market data provider for quotes, history and news (defaults
+            to yfinance); pass a providers.ReplayProvider to run offline.
+        llm: Chat model for inline analysis (defaults to gpt-4o-mini).
     """
     print("=" * 70)
     print("🎯 NASDAQ HIGH TRACKER")
@@ -316,20 +357,46 @@ def main(use_cache: bool = False):
     print("=" * 70)
     
     # 1) Fetch price data
+    prefetcher = None
     if use_cache:
         print("\n=== Loading from cached snapshot ===")
         df_prices = load_snapshot_from_file()
     else:
         print("\n=== Fetching stock prices ===")
-        df_prices = snapshot.main()
+        # News for stocks at highs is fetched while the remaining quotes are still downloading
+        import sentiment
+        prefetcher = sentiment.start_prefetch(news_fn=provider.news if provider else None)
+
+        def prefetch_news(quote):
+            if quote.get("At 52W High") == True or quote.get("At ATH") == True:
+                prefetcher.submit(quote["Ticker"])
+
+        df_prices = snapshot.main(
+            max_workers=max_workers,
+            batched=batched,
+            batch_size=batch_size,
+            incremental=incremental,
+            on_quote=prefetch_news,
+            provider=provider,
+        )
 
-    # 2) Check if prices changed
-    df_hist_before = load_history()
-    last_prices = latest_prices_by_ticker(df_hist_before)
+    # 2) Check if prices changed (against the persisted last-prices index)
+    last_prices = load_last_prices()
+    df_changes = changes.price_changes(df_prices, last_prices, tolerance)
 
-    if not prices_changed(df_prices, last_prices):
+    if not last_prices.empty and df_changes.empty:
+        if prefetcher is not None:
+            prefetcher.close()
         print("\nNo price changes vs last stored snapshot; skipping update.")
         return
+    
+    print(f"\n{len(df_changes)} of {len(df_prices)} prices changed (tolerance ${tolerance:.2f})")
+    moved = df_changes.dropna(subset=["Change %"])
+    if not moved.empty:
+        top = moved.reindex(moved["Change %"].abs().sort_values(ascending=False).index).head(5)
+        for _, row in top.iterrows():
+            print(f"   {row['Ticker']:6} ${row['Old Price']:8.2f} → ${row['New Price']:8.2f}  "
+                  f"({row['Change %']:+.2f}%)")
 
     # 3) Fetch sentiment only for stocks at 52W high or ATH
     high_stocks = df_prices[
@@ -338,7 +405,16 @@ def main(use_cache: bool = False):
     high_tickers = high_stocks["Ticker"].tolist()
     
     print(f"\n=== Fetching sentiment for {len(high_tickers)} stocks at highs ===")
-    df_sentiment = sentiment.main(tickers=high_tickers)
+    import sentiment  # deferred: only needed once prices have changed
+    # output/news_summary.png is drawn in the background while history is saved
+    renderer = render.Renderer()
+    df_sentiment = sentiment.main(
+        tickers=high_tickers,
+        prefetcher=prefetcher,
+        news_fn=provider.news if provider else None,
+        renderer=renderer,
+    )
+    sentiment_stats = df_sentiment.attrs.get("stats")
 
     # 4) Merge price + sentiment data
     df_snap = df_prices.merge(df_sentiment, on="Ticker", how="left")
@@ -348,17 +424,8 @@ def main(use_cache: bool = False):
     df_append = df_snap.copy()
     df_append["timestamp"] = now
 
-    # Ensure all columns exist
-    expected_cols = [
-        "timestamp", "Ticker", "Name", "Price", "Market Cap (B)", "52W High", "52W Low",
-        "% From 52W High", "All-Time High", "% From ATH", "At 52W High", 
-        "At ATH", "Sentiment", "Sentiment Score"
-    ]
-    for col in expected_cols:
-        if col not in df_append.columns:
-            df_append[col] = pd.NA
-
-    df_append = df_append[expected_cols]
+    # Ensure all columns exist with the history dtypes
+    df_append = history_store.normalize(df_append)
     
     # Filter to only stocks at 52W high or ATH
     df_append = df_append[
@@ -366,24 +433,63 @@ def main(use_cache: bool = False):
     ]
     print(f"\n{len(df_append)} stocks at 52W high or ATH")
     
-    df_hist_after = pd.concat([df_hist_before, df_append], ignore_index=True)
-    
-    # Create output directory if needed
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    save_history(df_hist_after)
-    print(f"History saved to {HISTORY_FILE}")
+    # History, last prices and latest state are updated under the history
+    # lock, so a run that overlaps this one cannot lose rows or prices
+    with storage.file_lock(history_store.HISTORY_DIR):
+        migrate_history()
+        save_history(df_append)
+        print(f"History appended to {history_store.HISTORY_DIR}")
+
+        # Breakouts and momentum only need the latest rows per ticker.
+        # Updated before the last prices: rebuilding a missing index reads
+        # the state, which must already hold this run's rows exactly once
+        df_state = latest_state.update_state(df_append)
+        # Every snapshot price, not just the rows at highs: the change check
+        # compares the whole next snapshot against this index
+        changes.save_last_prices(
+            changes.update_last_prices(load_last_prices(), df_snap), LAST_PRICES_FILE
+        )
 
     # 6) Detect breakouts
-    df_breakouts = detect_new_highs(df_hist_after)
+    df_breakouts = detect_new_highs(df_state)
 
-    # 7) Compute momentum
-    df_momentum = compute_momentum(df_hist_after)
+    # 7) Compute momentum, tagged with sector / industry from the local index
+    sector_index = sectors.load_index()
+    df_momentum = sectors.add_sectors(compute_momentum(df_state), sector_index)
+    df_breakouts = sectors.add_sectors(df_breakouts, sector_index)
 
     # 8) Print summary
-    print_summary(df_momentum, df_breakouts)
+    print_summary(df_momentum, df_breakouts, sentiment_stats)
+    renderer.finish()
 
     # 9) Generate AI analysis
-    agent.main(df_momentum, df_breakouts)
+    run_analysis(df_momentum, df_breakouts, analysis, llm=llm)
+
+
+def run_analysis(df_momentum: pd.DataFrame, df_breakouts: pd.DataFrame, mode: str = "background", llm=None):
+    """
+    Hand the run's tables to the AI analysis stage.
+    Only "inline" waits for the LLM; the other modes return once the job is queued.
+    """
+    if mode == "inline":
+        import agent  # deferred: pulls in LangChain
+        agent.main(df_momentum, df_breakouts, llm=llm)
+        return
+
+    import analysis_queue
+    path = analysis_queue.enqueue(df_momentum, df_breakouts)
+    print(f"\nAI analysis queued: {path}")
+    if mode == "background":
+        subprocess.Popen(
+            [sys.executable, os.path.join(SCRIPT_DIR, "analysis_queue.py")],
+            cwd=SCRIPT_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        print("Started background analysis worker")
+    else:
+        print("Run `python analysis_queue.py` to analyse queued runs")
 
 
 if __name__ == "__main__":
@@ -393,6 +499,100 @@ if __name__ == "__main__":
         action="store_true",
         help="Use cached snapshot.txt instead of fetching from yfinance API"
     )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=snapshot.DEFAULT_MAX_WORKERS,
+        help=f"Number of quotes fetched concurrently (default: {snapshot.DEFAULT_MAX_WORKERS})"
+    )
+    parser.add_argument(
+        "--batched", "-b",
+        action="store_true",
+        help="Download price history in multi-ticker batches instead of per ticker"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=snapshot.DEFAULT_BATCH_SIZE,
+        help=f"Tickers per download in batched mode (default: {snapshot.DEFAULT_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=changes.DEFAULT_TOLERANCE,
+        help=f"Minimum price move in $ that counts as a change (default: {changes.DEFAULT_TOLERANCE})"
+    )
+    parser.add_argument(
+        "--incremental", "-i",
+        action="store_true",
+        help="Update highs from output/highs_store.json, downloading only new bars"
+    )
+    parser.add_argument(
+        "--analysis",
+        choices=["background", "queue", "inline"],
+        default="background",
+        help="Run AI analysis in a background worker (default), only queue it, or wait for it inline"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running: poll prices every --interval seconds and report breakouts as they happen"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=60,
+        help="Seconds between polls in --daemon mode (default: 60)"
+    )
+    parser.add_argument(
+        "--polls",
+        type=int,
+        help="Stop --daemon mode after this many polls (default: run until stopped)"
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="FIXTURE",
+        help="Replay quotes, history and news from a recorded fixture instead of yfinance"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Synthetic seconds per request when replaying a fixture (default: 0)"
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FIXTURE",
+        help="Record every yfinance response of this run to a fixture for --replay"
+    )
     args = parser.parse_args()
     
-    main(use_cache=args.use_cache)
+    provider = None
+    if args.replay:
+        provider = providers.ReplayProvider(args.replay, latency=args.latency)
+    elif args.record:
+        provider = providers.RecordingProvider()
+    
+    if args.daemon:
+        import intraday
+        intraday.IntradayTracker(
+            interval=args.interval,
+            tolerance=args.tolerance,
+            max_workers=args.workers,
+            batch_size=args.batch_size,
+            provider=provider,
+        ).run(polls=args.polls)
+    else:
+        main(
+            use_cache=args.use_cache,
+            max_workers=args.workers,
+            batched=args.batched,
+            batch_size=args.batch_size,
+            incremental=args.incremental,
+            tolerance=args.tolerance,
+            analysis=args.analysis,
+            provider=provider,
+        )
+    if args.record:
+        provider.save(args.record)
+        print(f"Recorded fixture saved to {args.record}")
@@ -1,19 +1,28 @@
 #!/usr/bin/env python3
 
 import os
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 import pandas as pd
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import entry_log, history, storage
 
 HISTORY_FILE = "stock_history.txt"
 RECOMMENDATIONS_FILE = "recommendations.md"
+RECOMMENDATIONS_LOG = "recommendations.log"    # append-only; recommendations.md is rendered from it
+RECOMMENDATIONS_HEADER = "# Daily Stock Recommendations\n\n"
+RENDER_LIMIT = 100
+LOG_KEEP = 500
 
 
 def load_latest_snapshot() -> pd.DataFrame:
     """
     Load stock_history.txt and return only the latest timestamp's data.
+    The Open/High/Low columns are dropped: they are only set on downsampled
+    rows, never on the latest (full-resolution) snapshot.
     """
     if not os.path.exists(HISTORY_FILE):
         return pd.DataFrame()
@@ -27,16 +36,17 @@ def load_latest_snapshot() -> pd.DataFrame:
     latest_time = df["timestamp"].max()
     
     # Filter to latest snapshot only
-    df_latest = df[df["timestamp"] == latest_time].copy()
+    df_latest = df[df["timestamp"] == latest_time]
     
-    return df_latest
+    return df_latest.drop(columns=history.OHLC_COLUMNS, errors="ignore")
 
 
-def generate_recommendation(df_latest: pd.DataFrame) -> str:
+def generate_recommendation(df_latest: pd.DataFrame, llm=None) -> str:
     """
     Use LangChain + GPT to analyze the latest stock data and generate
     buy recommendations based on sentiment, market cap, price changes, etc.
     Returns a concise recommendation string.
+    llm overrides the gpt-4o-mini chat model (e.g. a fake model for offline runs).
     """
     if df_latest.empty:
         return "No data available for analysis."
@@ -44,6 +54,10 @@ def generate_recommendation(df_latest: pd.DataFrame) -> str:
     # Convert DataFrame to a clean markdown table for the LLM
     table_md = df_latest.to_markdown(index=False)
     
+    # LangChain is only imported when a recommendation actually runs
+    from langchain_openai import ChatOpenAI
+    from langchain_core.prompts import ChatPromptTemplate
+
     # Create prompt
     prompt_template = ChatPromptTemplate.from_messages([
         ("system", """You are an expert stock analyst. Analyze the provided stock data and identify 2-3 BUY opportunities based on:
@@ -59,7 +73,8 @@ Keep under 100 words."""),
     ])
     
     # Initialize LLM with temperature=0 for deterministic recommendations
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    if llm is None:
+        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
     
     # Create chain
     chain = prompt_template | llm
@@ -70,41 +85,47 @@ Keep under 100 words."""),
     return response.content.strip()
 
 
-def append_recommendation_md(recommendation_text: str, path: str = RECOMMENDATIONS_FILE):
-    """
-    Prepend a timestamped recommendation so newest is at the top (after header).
-    """
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-    p = Path(path)
-    new_line = f"- {now} — {recommendation_text}\n"
-    
-    if not p.exists():
-        # Create file with header + first line
-        p.write_text("# Daily Stock Recommendations\n\n" + new_line, encoding="utf-8")
+def _ensure_log():
+    """Import the legacy recommendations.md into the entry log on first use."""
+    if entry_log.exists(RECOMMENDATIONS_LOG) or not os.path.exists(RECOMMENDATIONS_FILE):
         return
+    entries = []
+    for line in Path(RECOMMENDATIONS_FILE).read_text(encoding="utf-8").splitlines():
+        if line.startswith("- ") and " — " in line:
+            timestamp, text = line[2:].split(" — ", 1)
+            entries.append({"timestamp": timestamp, "text": text})
+    entry_log.import_entries(RECOMMENDATIONS_LOG, entries[::-1])
 
-    # Read existing content
-    existing = p.read_text(encoding="utf-8")
-    lines = existing.splitlines(keepends=True)
 
-    if not lines:
-        # Empty file, just write header + line
-        p.write_text("# Daily Stock Recommendations\n\n" + new_line, encoding="utf-8")
-        return
-
-    # Assume first line is the header
-    header = lines[0]
-    rest = lines[1:]  # keep whatever is after header as-is
+def render_recommendations_md(limit: int = RENDER_LIMIT, path: str = RECOMMENDATIONS_FILE):
+    """
+    Write the newest-first markdown view of the recommendations log.
+    Only the newest `limit` entries are read (None renders the whole log).
+    """
+    _ensure_log()
+    lines = [
+        f"- {entry['timestamp']} — {entry['text']}\n"
+        for entry in entry_log.read_entries(RECOMMENDATIONS_LOG, limit)
+    ]
+    storage.atomic_write(
+        path,
+        lambda tmp_path: Path(tmp_path).write_text(RECOMMENDATIONS_HEADER + "".join(lines), encoding="utf-8"),
+    )
 
-    # Ensure there is exactly one blank line after header
-    if rest and rest[0].strip() != "":
-        rest = ["\n"] + rest
 
-    new_content = header + "\n" + new_line + "".join(rest[1:])
-    p.write_text(new_content, encoding="utf-8")
+def append_recommendation_md(recommendation_text: str, path: str = RECOMMENDATIONS_FILE):
+    """
+    Append a timestamped recommendation to the log and re-render the
+    markdown view so newest is at the top (after header).
+    """
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    _ensure_log()
+    entry_log.append_entry(RECOMMENDATIONS_LOG, now, recommendation_text)
+    entry_log.maybe_compact(RECOMMENDATIONS_LOG, LOG_KEEP)
+    render_recommendations_md(path=path)
 
 
-def main():
+def main(llm=None):
     print("\n=== Generating AI Recommendation ===")
     
     df_latest = load_latest_snapshot()
@@ -113,7 +134,7 @@ def main():
         print("No recent data to analyze.")
         return
     
-    recommendation = generate_recommendation(df_latest)
+    recommendation = generate_recommendation(df_latest, llm=llm)
     
     print(f"\n📊 Recommendation:\n{recommendation}\n")
     
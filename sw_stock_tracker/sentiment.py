@@ -1,19 +1,27 @@
 #!/usr/bin/env python3
 
+import os
+import sys
+
 import pandas as pd
-import yfinance as yf
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 
 from snapshot import TICKERS  # import from snapshot.py
 
-# Download VADER lexicon if not present
-try:
-    nltk.data.find('sentiment/vader_lexicon.zip')
-except LookupError:
-    nltk.download('vader_lexicon', quiet=True)
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import news_image, render
+from tracker_core import sentiment as pipeline
+
+CACHE_FILE = "sentiment_cache.json"
+
+
+def classify(avg_score: float) -> str:
+    """Classify an average compound score with VADER's standard thresholds."""
+    if avg_score >= 0.05:
+        return "Positive"
+    elif avg_score <= -0.05:
+        return "Negative"
+    return "Neutral"
 
 
 def fetch_sentiment_for_ticker(ticker: str, max_headlines: int = 5) -> tuple:
@@ -24,124 +32,68 @@ def fetch_sentiment_for_ticker(ticker: str, max_headlines: int = 5) -> tuple:
     sentiment_label: "Positive", "Negative", or "Neutral"
     headlines_list: list of headline strings
     """
-    try:
-        t = yf.Ticker(ticker)
-        news = t.news
-        
-        if not news:
-            return "Neutral", []
-        
-        sia = SentimentIntensityAnalyzer()
-        scores = []
-        headlines = []
-        
-        for item in news[:max_headlines]:
-            # Title is nested in item["content"]["title"]
-            title = None
-            if isinstance(item, dict):
-                content = item.get("content", {})
-                if isinstance(content, dict):
-                    title = content.get("title")
-            
-            if title and isinstance(title, str):
-                sentiment = sia.polarity_scores(title)
-                scores.append(sentiment["compound"])
-                headlines.append(title)
-        
-        if not scores:
-            return "Neutral", headlines
-        
-        avg_score = sum(scores) / len(scores)
-        
-        # Classify based on compound score thresholds
-        if avg_score >= 0.05:
-            label = "Positive"
-        elif avg_score <= -0.05:
-            label = "Negative"
-        else:
-            label = "Neutral"
-        
-        return label, headlines
-    
-    except Exception as e:
-        print(f"Warning: failed to get sentiment for {ticker}: {e}")
-        return "Neutral", []
+    df, news_dict = fetch_sentiment([ticker], max_headlines=max_headlines, max_workers=1)
+    return df.iloc[0]["Sentiment"], news_dict[ticker]
 
 
-def fetch_sentiment(tickers: list) -> tuple:
+def fetch_sentiment(
+    tickers: list,
+    max_headlines: int = 5,
+    max_workers: int = pipeline.DEFAULT_MAX_WORKERS,
+    news_fn=None,
+) -> tuple:
     """
     Fetch sentiment scores for a list of tickers.
+    News is fetched concurrently and all headlines are scored in one batch
+    with a single shared VADER analyzer. Recently fetched news and previously
+    scored headlines come from sentiment_cache.json.
+    news_fn overrides the yfinance news provider.
     Returns (DataFrame, news_dict).
-    DataFrame: columns Ticker, Sentiment
+    DataFrame: columns Ticker, Sentiment (timings and cache counters in df.attrs["stats"])
     news_dict: {ticker: [headlines]}
     """
-    results = []
-    news_dict = {}
-    
-    for ticker in tickers:
-        label, headlines = fetch_sentiment_for_ticker(ticker)
-        results.append({"Ticker": ticker, "Sentiment": label})
-        news_dict[ticker] = headlines
-    
-    return pd.DataFrame(results), news_dict
+    headlines_by_ticker, scores, stats = pipeline.run_pipeline(
+        tickers,
+        max_headlines=max_headlines,
+        max_workers=max_workers,
+        news_fn=news_fn,
+        cache_path=CACHE_FILE,
+    )
+    df, news_dict = pipeline.sentiment_frame(
+        tickers, headlines_by_ticker, scores, classify, with_score=False
+    )
+    df.attrs["stats"] = stats
+    return df, news_dict
 
 
-def create_news_image(news_dict: dict, filename: str = "news_summary.png"):
+def create_news_image(
+    news_dict: dict,
+    filename: str = "news_summary.png",
+    renderer: render.Renderer = None,
+    tickers: list = None,
+):
     """
-    Create a WhatsApp-shareable image with news headlines per ticker.
+    Create a WhatsApp-shareable image with news headlines per ticker
+    (the tickers in news_dict unless tickers is given).
+    Skipped when the headlines are unchanged since the image was written;
+    with a renderer it is drawn on the renderer's background thread.
     """
-    fig, ax = plt.subplots(figsize=(12, len(TICKERS) * 1.2))
-    ax.axis('off')
-    
-    y_pos = 0.98
-    line_height = 1.0 / (len(TICKERS) + 2)
-    
-    # Title
-    ax.text(0.5, y_pos, "📰 Stock News Summary", 
-            fontsize=16, weight='bold', ha='center', va='top',
-            transform=ax.transAxes)
-    y_pos -= line_height * 1.5
-    
-    for ticker in TICKERS:
-        headlines = news_dict.get(ticker, [])
-        
-        # Ticker name
-        ax.text(0.02, y_pos, f"{ticker}:", 
-                fontsize=11, weight='bold', va='top',
-                transform=ax.transAxes)
-        y_pos -= line_height * 0.6
-        
-        if headlines:
-            # Show first 2 headlines to keep image compact
-            for i, headline in enumerate(headlines[:2]):
-                # Truncate long headlines
-                if len(headline) > 80:
-                    headline = headline[:77] + "..."
-                ax.text(0.05, y_pos, f"• {headline}", 
-                        fontsize=8, va='top', wrap=True,
-                        transform=ax.transAxes)
-                y_pos -= line_height * 0.5
-        else:
-            ax.text(0.05, y_pos, "• No recent news", 
-                    fontsize=8, style='italic', va='top',
-                    transform=ax.transAxes)
-            y_pos -= line_height * 0.5
-        
-        y_pos -= line_height * 0.3  # spacing between tickers
-    
-    plt.tight_layout()
-    plt.savefig(filename, dpi=150, bbox_inches='tight', facecolor='white')
-    plt.close()
-    print(f"Saved {filename} – share this image on WhatsApp.")
+    tickers = list(news_dict) if tickers is None else tickers
+    render.render(
+        filename,
+        news_image.image_key(news_dict, tickers),
+        lambda path, metadata: news_image.create_news_image(news_dict, tickers, path, metadata=metadata),
+        renderer,
+    )
 
 
-def main() -> pd.DataFrame:
+def main(news_fn=None, renderer: render.Renderer = None) -> pd.DataFrame:
     print("Fetching sentiment scores (VADER)...")
-    df, news_dict = fetch_sentiment(TICKERS)
+    df, news_dict = fetch_sentiment(TICKERS, news_fn=news_fn)
     print(df)
     
     # Create shareable news image
-    create_news_image(news_dict)
+    create_news_image(news_dict, renderer=renderer, tickers=TICKERS)
     
     return df
 
@@ -1,9 +1,21 @@
 #!/usr/bin/env python3
 
-import yfinance as yf
+import os
+import sys
+
 import pandas as pd
-import dataframe_image as dfi
-from tabulate import tabulate
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import fetch, providers, render
+
+TABLE_IMAGE = "stocks_table.png"
+TABLE_FORMATS = {
+    "Price": "{:.2f}",
+    "Market Cap (B)": "{:.2f}",
+    "52W High": "{:.2f}",
+    "% From 52W High": "{:.2f}",
+}
 
 TICKERS = [
     "DUOL", "HUBS", "MNDY", "TEAM", "GTLB", "KVYO", "NOW", "CSU.TO",
@@ -11,53 +23,62 @@ TICKERS = [
     "ZETA", "MSFT", "PLTR", "MDB", "FIG",
 ]
 
-def fetch_quote(ticker: str):
-    t = yf.Ticker(ticker)
-    price = None
-    market_cap = None
-    yr_high = None
-
-    # fast_info first
-    try:
-        fi = t.fast_info
-        price = getattr(fi, "last_price", None) or getattr(fi, "last_close", None)
-        market_cap = getattr(fi, "market_cap", None)
-        yr_high = getattr(fi, "year_high", None)
-    except Exception:
-        pass
-
-    # fallback to info
-    if price is None or market_cap is None or yr_high is None:
-        try:
-            info = t.info
-            if price is None:
-                price = info.get("regularMarketPrice")
-            if market_cap is None:
-                market_cap = info.get("marketCap")
-            if yr_high is None:
-                yr_high = info.get("fiftyTwoWeekHigh")
-        except Exception:
-            pass
+def fetch_quote(ticker: str, provider=None):
+    """
+    Fetch (price, market cap, 52-week high, % from 52-week high) for a ticker.
+    provider defaults to yfinance (see tracker_core/providers.py).
+    """
+    provider = provider or providers.YFinanceProvider()
+    quote = provider.quote(ticker, name=False)
+    price = quote["price"]
+    yr_high = quote["year_high"]
 
     pct_from_high = None
     if price is not None and yr_high not in (None, 0):
         pct_from_high = (price / yr_high - 1.0) * 100.0
 
-    return price, market_cap, yr_high, pct_from_high
-
-def main() -> pd.DataFrame:
-    rows = []
-    for symbol in TICKERS:
-        price, mcap, yr_high, pct_from_high = fetch_quote(symbol)
-        rows.append(
-            {
-                "Ticker": symbol,
-                "Price": price,
-                "Market Cap (B)": None if mcap is None else mcap / 1e9,
-                "52W High": yr_high,
-                "% From 52W High": pct_from_high,
-            }
-        )
+    return price, quote["market_cap"], yr_high, pct_from_high
+
+def quote_row(symbol: str, price=None, mcap=None, yr_high=None, pct_from_high=None) -> dict:
+    return {
+        "Ticker": symbol,
+        "Price": price,
+        "Market Cap (B)": None if mcap is None else mcap / 1e9,
+        "52W High": yr_high,
+        "% From 52W High": pct_from_high,
+    }
+
+
+def fetch_quotes(tickers: list, fetch_fn=None, max_workers: int = fetch.DEFAULT_MAX_WORKERS) -> list:
+    """
+    Fetch quote rows for all tickers on the shared worker pool
+    (tracker_core.fetch); fetch_fn(symbol) returns fetch_quote()'s tuple.
+    """
+    fetch_fn = fetch_fn or fetch_quote
+    return fetch.fetch_all(
+        tickers,
+        lambda symbol: quote_row(symbol, *fetch_fn(symbol)),
+        fallback_fn=quote_row,
+        max_workers=max_workers,
+    )
+
+
+def render_table(df: pd.DataFrame, renderer: render.Renderer = None):
+    """
+    Export the table to stocks_table.png with the direct rasterizer,
+    skipped when the table is unchanged since the image was written.
+    With a renderer the export runs on its background thread.
+    """
+    render.render(
+        TABLE_IMAGE,
+        render.input_hash(df, TABLE_FORMATS),
+        lambda path, metadata: render.render_table(df, path, TABLE_FORMATS, metadata),
+        renderer,
+    )
+
+
+def main(provider=None, renderer: render.Renderer = None) -> pd.DataFrame:
+    rows = fetch_quotes(TICKERS, lambda symbol: fetch_quote(symbol, provider))
 
     df = pd.DataFrame(rows)
 
@@ -69,6 +90,8 @@ def main() -> pd.DataFrame:
     )
 
     # print table
+    from tabulate import tabulate
+
     print(
         tabulate(
             df,
@@ -79,17 +102,8 @@ def main() -> pd.DataFrame:
         )
     )
 
-    # export PNG
-    styled = df.style.format(
-        {
-            "Price": "{:.2f}",
-            "Market Cap (B)": "{:.2f}",
-            "52W High": "{:.2f}",
-            "% From 52W High": "{:.2f}",
-        }
-    ).hide(axis="index")
-    dfi.export(styled, "stocks_table.png")
-    print("Saved stocks_table.png – share this image on WhatsApp.")
+    # export PNG (share this image on WhatsApp)
+    render_table(df, renderer)
 
     return df
 
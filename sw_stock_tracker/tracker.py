@@ -1,144 +1,156 @@
 #!/usr/bin/env python3
 
 import os
-from datetime import datetime, timezone, timedelta
+import sys
+from datetime import datetime, timezone
 
 import pandas as pd
 
 import snapshot
-import sentiment
-import agent
+
+# Shared tracking core lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracker_core import changes, history, momentum, render, storage
 
 HISTORY_FILE = "stock_history.txt"
+LAST_PRICES_FILE = "last_prices.json"
+
+# Column name -> dtype for every history row
+HISTORY_COLUMNS = {
+    "timestamp": "datetime64[ns, UTC]",
+    "Ticker": "string",
+    "Price": "float64",
+    "Market Cap (B)": "float64",
+    "52W High": "float64",
+    "% From 52W High": "float64",
+    "Sentiment": "string",
+    # Only set on rows downsampled to one per ticker and day
+    "Open": "float64",
+    "High": "float64",
+    "Low": "float64",
+}
+
+# Retention: every run is kept for FULL_RESOLUTION; older runs are reduced to
+# one OHLC-style row per ticker and day, and dropped after MAX_HISTORY_AGE
+FULL_RESOLUTION = pd.Timedelta(days=14)
+MAX_HISTORY_AGE = pd.Timedelta(days=3 * 365)
 
 
 def load_history() -> pd.DataFrame:
-    if os.path.exists(HISTORY_FILE):
-        return pd.read_csv(HISTORY_FILE, parse_dates=["timestamp"])
-    else:
-        return pd.DataFrame(
-            columns=[
-                "timestamp",
-                "Ticker",
-                "Price",
-                "Market Cap (B)",
-                "52W High",
-                "% From 52W High",
-                "Sentiment",
-            ]
-        )
-
-
-def save_history(df_hist: pd.DataFrame):
-    df_hist.to_csv(HISTORY_FILE, index=False)
+    return history.load_csv(HISTORY_FILE, HISTORY_COLUMNS)
+
+
+def save_history(df_hist: pd.DataFrame) -> pd.DataFrame:
+    """
+    Apply the retention policy (see history.downsample) and rewrite
+    stock_history.txt from a fsynced temp file, so compaction and the save
+    either both happen or neither does. Holds the history lock.
+
+    Returns:
+        The compacted history that was written
+    """
+    df_hist = history.downsample(df_hist, FULL_RESOLUTION, MAX_HISTORY_AGE)
+    df_hist = df_hist.reindex(columns=list(HISTORY_COLUMNS))
+    with storage.file_lock(HISTORY_FILE):
+        storage.atomic_write(HISTORY_FILE, lambda tmp_path: df_hist.to_csv(tmp_path, index=False))
+    return df_hist
+
+
+def append_history(df_append: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add a run to stock_history.txt under the history lock and return the
+    full history. The rows are appended to the file (and fsynced) instead
+    of rewriting it; the file is only rewritten when the retention policy
+    has a day of rows to compact, or its columns predate HISTORY_COLUMNS.
+    """
+    with storage.file_lock(HISTORY_FILE):
+        if history.append_csv(df_append, HISTORY_FILE, HISTORY_COLUMNS):
+            df_hist = load_history()
+            if not history.needs_downsample(df_hist, FULL_RESOLUTION, MAX_HISTORY_AGE):
+                return df_hist
+        else:
+            df_hist = pd.concat([load_history(), df_append], ignore_index=True)
+        return save_history(df_hist)
 
 
 def latest_prices_by_ticker(df_hist: pd.DataFrame) -> pd.Series:
-    if df_hist.empty:
-        return pd.Series(dtype=float)
-    df_sorted = df_hist.sort_values(["Ticker", "timestamp"])
-    return df_sorted.groupby("Ticker")["Price"].last()
-
-
-def prices_changed(df_snap: pd.DataFrame, last_prices: pd.Series) -> bool:
-    if last_prices.empty:
-        return True
-
-    for _, row in df_snap.iterrows():
-        ticker = row["Ticker"]
-        new_price = row["Price"]
-        old_price = last_prices.get(ticker, None)
-
-        if pd.isna(new_price):
-            continue
-
-        if old_price is None or pd.isna(old_price):
-            return True
-
-        try:
-            if abs(float(new_price) - float(old_price)) > 0.01:
-                return True
-        except Exception:
-            return True
-
-    return False
+    """Latest price per ticker from history (see changes.latest_prices)."""
+    return changes.latest_prices(df_hist)
 
 
-def compute_changes(df_hist: pd.DataFrame) -> pd.DataFrame:
-    df_hist = df_hist.sort_values(["Ticker", "timestamp"])
-
-    results = []
-    for ticker, g in df_hist.groupby("Ticker"):
-        g = g.reset_index(drop=True)
-        if len(g) == 0:
-            continue
-
-        last_row = g.iloc[-1]
-        last_time = last_row["timestamp"]
-        last_price = last_row["Price"]
+def load_last_prices() -> pd.Series:
+    """
+    Load the last stored price per ticker from the persisted index,
+    rebuilding it from history if it is missing.
+    """
+    if not os.path.exists(HISTORY_FILE):
+        return pd.Series(dtype=float)
 
-        # daily
-        if (
-            len(g) >= 2
-            and pd.notna(g["Price"].iloc[-2])
-            and pd.notna(last_price)
-            and g["Price"].iloc[-2] not in (None, 0)
-            and last_price not in (None, 0)
-        ):
-            prev_price = g["Price"].iloc[-2]
-            daily_change = (last_price / prev_price - 1) * 100
-        else:
-            daily_change = None
-
-        # weekly
-        cutoff_time = last_time - timedelta(days=5)
-        weekly_candidates = g[g["timestamp"] <= cutoff_time]
-
-        if (
-            not weekly_candidates.empty
-            and pd.notna(last_price)
-            and last_price not in (None, 0)
-        ):
-            weekly_row = weekly_candidates.iloc[-1]
-            weekly_price = weekly_row["Price"]
-            if pd.notna(weekly_price) and weekly_price not in (None, 0):
-                weekly_change = (last_price / weekly_price - 1) * 100
-            else:
-                weekly_change = None
-        else:
-            weekly_change = None
-
-        results.append(
-            {
-                "Ticker": ticker,
-                "Latest Price": last_price,
-                "Market Cap (B)": last_row.get("Market Cap (B)"),
-                "Daily Change %": daily_change,
-                "Weekly Change %": weekly_change,
-                "% From 52W High": last_row.get("% From 52W High"),
-                "Sentiment": last_row.get("Sentiment"),
-            }
-        )
+    last_prices = changes.load_last_prices(LAST_PRICES_FILE)
+    if last_prices is None:
+        last_prices = latest_prices_by_ticker(load_history())
+        changes.save_last_prices(last_prices, LAST_PRICES_FILE)
+    return last_prices
+
+
+def prices_changed(
+    df_snap: pd.DataFrame,
+    last_prices: pd.Series,
+    tolerance: float = changes.DEFAULT_TOLERANCE,
+) -> bool:
+    return changes.prices_changed(df_snap, last_prices, tolerance)
+
+
+def compute_changes(df_hist: pd.DataFrame, windows: dict = None) -> pd.DataFrame:
+    """
+    Daily (vs previous snapshot) and weekly (vs 5 days ago) change per ticker.
+    Extra lookbacks can be passed as {column name: pd.Timedelta}.
+    """
+    all_windows = dict(momentum.DEFAULT_WINDOWS)
+    all_windows.update(windows or {})
+
+    df = momentum.compute_momentum(df_hist, windows=all_windows)
+    if df.empty:
+        return df
+
+    df = df.rename(columns={"Price": "Latest Price"})
+    columns = [
+        "Ticker", "Latest Price", "Market Cap (B)", "Daily Change %",
+        *all_windows, "% From 52W High", "Sentiment",
+    ]
+    return df.reindex(columns=columns)
 
-    return pd.DataFrame(results)
 
+def main(tolerance: float = changes.DEFAULT_TOLERANCE, provider=None, llm=None):
+    """
+    provider replaces yfinance for quotes and news (see
+    tracker_core/providers.py); llm replaces the OpenAI chat model.
+    stocks_table.png and news_summary.png are drawn on a background
+    thread while history is saved; render times are reported before the
+    AI recommendation runs.
+    """
+    renderer = render.Renderer()
 
-def main():
     # 1) Fetch prices
     print("=== Fetching stock prices ===")
-    df_prices = snapshot.main()
+    df_prices = snapshot.main(provider, renderer)
 
-    # 2) Check if prices changed
-    df_hist_before = load_history()
-    last_prices = latest_prices_by_ticker(df_hist_before)
+    # 2) Check if prices changed (against the persisted last-prices index)
+    last_prices = load_last_prices()
+    df_changes = changes.price_changes(df_prices, last_prices, tolerance)
 
-    if not prices_changed(df_prices, last_prices):
+    if not last_prices.empty and df_changes.empty:
         print("\nNo price changes vs last stored snapshot; not appending or recomputing.")
+        renderer.finish()
         return
 
+    print(f"\n{len(df_changes)} of {len(df_prices)} prices changed (tolerance ${tolerance:.2f})")
+
     # 3) Fetch sentiment only if prices changed
     print("\n=== Fetching sentiment ===")
-    df_sentiment = sentiment.main()  # calls sentiment.main() which creates news_summary.png
+    import sentiment  # deferred: only needed once prices have changed
+    df_sentiment = sentiment.main(provider.news if provider else None, renderer)  # also queues news_summary.png
+    stats = df_sentiment.attrs.get("stats")
 
     # 4) Merge price + sentiment
     df_snap = df_prices.merge(df_sentiment, on="Ticker", how="left")
@@ -148,23 +160,14 @@ def main():
     df_append = df_snap.copy()
     df_append["timestamp"] = now
 
-    for col in ["Ticker", "Price", "Market Cap (B)", "52W High", "% From 52W High", "Sentiment"]:
-        if col not in df_append.columns:
-            df_append[col] = pd.NA
-
-    cols = [
-        "timestamp",
-        "Ticker",
-        "Price",
-        "Market Cap (B)",
-        "52W High",
-        "% From 52W High",
-        "Sentiment",
-    ]
-    df_append = df_append[cols]
+    df_append = history.normalize(df_append, HISTORY_COLUMNS)
 
-    df_hist_after = pd.concat([df_hist_before, df_append], ignore_index=True)
-    save_history(df_hist_after)
+    # Locked, so a run that overlaps this one cannot lose rows or prices
+    with storage.file_lock(HISTORY_FILE):
+        df_hist_after = append_history(df_append)
+        changes.save_last_prices(
+            changes.update_last_prices(load_last_prices(), df_append), LAST_PRICES_FILE
+        )
 
     # 6) Compute changes
     df_changes = compute_changes(df_hist_after)
@@ -172,8 +175,19 @@ def main():
         print("\n=== Daily & Weekly Changes + Sentiment ===")
         print(df_changes.sort_values("Ticker"))
 
-    # 7) Generate AI recommendation
-    agent.main()
+    if stats:
+        print(
+            f"\nSentiment cache: news {stats['news_hits']} hits / {stats['news_misses']} misses, "
+            f"headlines {stats['score_hits']} hits / {stats['score_misses']} misses"
+        )
+
+    # 7) Wait for the images
+    print("\n=== Rendering images ===")
+    renderer.finish()
+
+    # 8) Generate AI recommendation
+    import agent  # deferred: pulls in LangChain
+    agent.main(llm=llm)
 
 if __name__ == "__main__":
     main()
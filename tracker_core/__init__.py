@@ -0,0 +1,24 @@
+"""
+Shared tracking core for nasdaq_high_tracker and sw_stock_tracker.
+
+Modules:
+    fetch       bounded, retrying fetch engine
+    providers   market data providers (yfinance, fixture recording and replay)
+    history     typed schemas and the partitioned Parquet history store
+    changes     price change detection and the last-prices index
+    momentum    vectorized daily/weekly/lookback changes
+    sentiment   concurrent news fetch + batched VADER scoring with cache
+    news_image  news summary image
+    render      input-hashed PNG rendering, table rasterizer, background renderer
+    entry_log   append-only log behind the AI markdown files
+    storage     file locks, fsynced atomic writes and appends
+
+Each tracker keeps its own configuration (history schema, file locations,
+sentiment labels, image style) as module constants and passes it in.
+Both trackers run as plain scripts from their own folder, so they add the
+repository root to sys.path before importing this package.
+
+benchmarks/bench_trackers.py times the core stages for both trackers on
+replayed data; nasdaq_high_tracker/benchmarks/bench_pipeline.py times whole
+tracker runs.
+"""
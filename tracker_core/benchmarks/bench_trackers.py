@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared tracking core under both trackers' configurations.
+
+Each tracker runs in its own subprocess on a temporary copy of its folder
+(the trackers share module names such as snapshot and tracker, and write
+their files next to the scripts). Quotes and news are replayed from a
+synthetic fixture (tracker_core.providers.ReplayProvider) with a fixed
+latency per request, so no network access is needed. For whole tracker runs
+see nasdaq_high_tracker/benchmarks/bench_pipeline.py.
+
+Stages timed per tracker:
+    fetch      quotes for all tickers on the shared fetch engine
+    sentiment  news fetch + scoring through the shared pipeline
+    history    persisting one run on top of existing history
+    changes    change detection against the stored last prices
+    momentum   daily/weekly changes from history
+
+Usage:
+    python tracker_core/benchmarks/bench_trackers.py
+    python tracker_core/benchmarks/bench_trackers.py --tickers 500 --latency 0.05 --runs 60
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta, timezone
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TRACKERS = ["nasdaq_high_tracker", "sw_stock_tracker"]
+STAGES = ["fetch", "sentiment", "history", "changes", "momentum"]
+
+DEFAULT_TICKERS = {"nasdaq_high_tracker": 500, "sw_stock_tracker": 21}
+DEFAULT_LATENCY = 0.02   # seconds per replayed request
+DEFAULT_RUNS = 30        # tracker runs already in history
+
+
+def timed(stats: dict, stage: str, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    stats[stage] = time.perf_counter() - start
+    return result
+
+
+def synthetic_runs(tickers: list, runs: int, make_row) -> list:
+    """One row list per past run, oldest first, one run per day."""
+    start = datetime.now(timezone.utc) - timedelta(days=runs)
+    return [
+        [{**make_row(t, 100.0 + (i + j) % 17), "timestamp": start + timedelta(days=j)}
+         for i, t in enumerate(tickers)]
+        for j in range(runs)
+    ]
+
+
+def bench_nasdaq(tickers: list, latency: float, runs: int) -> dict:
+    import pandas as pd
+    import snapshot
+    import sentiment
+    import tracker
+    import history_store
+    import latest_state
+    from tracker_core import changes, providers
+
+    def quote(ticker, price=101.0):
+        return snapshot.build_quote(ticker, f"{ticker} Inc.", price, 5e10, price * 1.01, price * 0.7, price * 1.5)
+
+    provider = providers.ReplayProvider(providers.synthetic_fixture(tickers), latency=latency)
+    fetch_fn = lambda ticker: snapshot.fetch_quote(ticker, highs={}, provider=provider)
+
+    for rows in synthetic_runs(tickers, runs, quote):
+        history_store.append_history(pd.DataFrame(rows))
+    latest_state.rebuild_state()
+    changes.save_last_prices(tracker.latest_prices_by_ticker(latest_state.load_state()), tracker.LAST_PRICES_FILE)
+
+    stats = {}
+    df_prices = pd.DataFrame(timed(stats, "fetch", snapshot.fetch_quotes, tickers, fetch_fn))
+    df_sent, _ = timed(stats, "sentiment", sentiment.fetch_sentiment, tickers, news_fn=provider.news)
+
+    df_append = history_store.normalize(df_prices.merge(df_sent, on="Ticker").assign(timestamp=datetime.now(timezone.utc)))
+
+    def persist():
+        tracker.save_history(df_append)
+        return latest_state.update_state(df_append)
+
+    df_state = timed(stats, "history", persist)
+    timed(stats, "changes", lambda: changes.price_changes(df_prices, tracker.load_last_prices()))
+    timed(stats, "momentum", tracker.compute_momentum, df_state)
+    return stats
+
+
+def bench_sw(tickers: list, latency: float, runs: int) -> dict:
+    import pandas as pd
+    import snapshot
+    import sentiment
+    import tracker
+    from tracker_core import changes, providers
+
+    def row(ticker, price=101.0):
+        return snapshot.quote_row(ticker, price, 5e10, price * 1.2, (price / (price * 1.2) - 1) * 100)
+
+    provider = providers.ReplayProvider(providers.synthetic_fixture(tickers), latency=latency)
+    fetch_fn = lambda ticker: snapshot.fetch_quote(ticker, provider)
+
+    past = [r for rows in synthetic_runs(tickers, runs, row) for r in rows]
+    tracker.save_history(tracker.history.normalize(pd.DataFrame(past), tracker.HISTORY_COLUMNS))
+    changes.save_last_prices(tracker.latest_prices_by_ticker(tracker.load_history()), tracker.LAST_PRICES_FILE)
+
+    stats = {}
+    df_prices = pd.DataFrame(timed(stats, "fetch", snapshot.fetch_quotes, tickers, fetch_fn))
+    df_sent, _ = timed(stats, "sentiment", sentiment.fetch_sentiment, tickers, news_fn=provider.news)
+
+    df_append = tracker.history.normalize(
+        df_prices.merge(df_sent, on="Ticker").assign(timestamp=datetime.now(timezone.utc)),
+        tracker.HISTORY_COLUMNS,
+    )
+
+    def persist():
+        df_hist = pd.concat([tracker.load_history(), df_append], ignore_index=True)
+        tracker.save_history(df_hist)
+        return df_hist
+
+    df_hist = timed(stats, "history", persist)
+    timed(stats, "changes", lambda: changes.price_changes(df_prices, tracker.load_last_prices()))
+    timed(stats, "momentum", tracker.compute_changes, df_hist)
+    return stats
+
+
+BENCHES = {"nasdaq_high_tracker": bench_nasdaq, "sw_stock_tracker": bench_sw}
+
+
+def run_child(name: str, tickers: int, latency: float, runs: int):
+    """Benchmark one tracker; runs inside a temporary copy of its folder."""
+    sys.path.insert(0, os.getcwd())
+    symbols = [f"T{i:04d}" for i in range(tickers)]
+    stats = BENCHES[name](symbols, latency, runs)
+    print("RESULT " + json.dumps(stats))
+
+
+def run_tracker(name: str, tickers: int, latency: float, runs: int) -> dict:
+    """Run one tracker's benchmark in a subprocess on a temporary copy of the repo folders."""
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = os.path.join(tmp, name)
+        shutil.copytree(os.path.join(REPO_DIR, name), work_dir,
+                        ignore=shutil.ignore_patterns("output", "__pycache__", "*.png", "*.md", "*.json", "*.txt"))
+        shutil.copytree(os.path.join(REPO_DIR, "tracker_core"), os.path.join(tmp, "tracker_core"),
+                        ignore=shutil.ignore_patterns("__pycache__", "benchmarks"))
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", name,
+             "--tickers", str(tickers), "--latency", str(latency), "--runs", str(runs)],
+            cwd=work_dir, capture_output=True, text=True,
+        )
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(f"{name} benchmark failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark both trackers on the shared core")
+    parser.add_argument("--tickers", type=int, default=None,
+                        help="Tickers per tracker (default: 500 for nasdaq, 21 for sw)")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help=f"Seconds per replayed quote/news request (default: {DEFAULT_LATENCY})")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help=f"Past runs in the synthetic history (default: {DEFAULT_RUNS})")
+    parser.add_argument("--tracker", choices=TRACKERS, action="append",
+                        help="Only benchmark this tracker (repeatable)")
+    parser.add_argument("--child", choices=TRACKERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.tickers, args.latency, args.runs)
+        return
+
+    print(f"{'tracker':22} {'tickers':>7} " + " ".join(f"{s:>10}" for s in STAGES) + f" {'total':>10}")
+    for name in args.tracker or TRACKERS:
+        tickers = args.tickers or DEFAULT_TICKERS[name]
+        stats = run_tracker(name, tickers, args.latency, args.runs)
+        print(f"{name:22} {tickers:>7} " + " ".join(f"{stats[s]:>9.3f}s" for s in STAGES)
+              + f" {sum(stats.values()):>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Price change detection shared by both trackers.
+Aligns a new snapshot with the last stored price per ticker and keeps a small
+persisted last-prices index so the check never needs the full history.
+"""
+
+import os
+import json
+
+import pandas as pd
+
+from . import momentum, storage
+
+DEFAULT_TOLERANCE = 0.01  # absolute price difference that counts as a change
+
+CHANGE_COLUMNS = ["Ticker", "Old Price", "New Price", "Change", "Change %"]
+
+
+def price_changes(
+    df_snap: pd.DataFrame,
+    last_prices: pd.Series,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> pd.DataFrame:
+    """
+    Compare snapshot prices with the last stored prices.
+    
+    A ticker counts as changed if it has a price now and either had no stored
+    price or moved by more than tolerance. Tickers without a current price
+    are ignored.
+    
+    Returns:
+        DataFrame of changed tickers with Old Price, New Price, Change and
+        Change % (Old Price / Change are NaN for new tickers)
+    """
+    new = pd.to_numeric(df_snap["Price"], errors="coerce")
+    new.index = df_snap["Ticker"].to_numpy()
+    new = new[new.notna()]
+    
+    old = pd.to_numeric(last_prices, errors="coerce")
+    old = old[~old.index.duplicated(keep="last")].reindex(new.index)
+    
+    change = new - old
+    changed = (old.isna() | (change.abs() > tolerance)).to_numpy()
+    
+    df = pd.DataFrame({
+        "Ticker": new.index,
+        "Old Price": old.to_numpy(),
+        "New Price": new.to_numpy(),
+        "Change": change.to_numpy(),
+        "Change %": (change / old.where(old != 0) * 100).to_numpy(),
+    })
+    return df[changed].reset_index(drop=True)
+
+
+def prices_changed(
+    df_snap: pd.DataFrame,
+    last_prices: pd.Series,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> bool:
+    """True if there is no stored price yet or any ticker's price changed."""
+    if last_prices.empty:
+        return True
+    return not price_changes(df_snap, last_prices, tolerance).empty
+
+
+def load_last_prices(path: str):
+    """
+    Load the persisted last-prices index.
+    
+    Returns:
+        Series of last price by ticker, or None if the index is missing or unreadable
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            prices = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read last prices {path}: {e}")
+        return None
+    return pd.Series(prices, dtype=float)
+
+
+def save_last_prices(last_prices: pd.Series, path: str):
+    """Persist the last-prices index (see storage.atomic_write)."""
+    prices = {
+        str(ticker): (None if pd.isna(price) else float(price))
+        for ticker, price in last_prices.items()
+    }
+
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(prices, f, indent=0, sort_keys=True)
+
+    storage.atomic_write(path, write)
+
+
+def update_last_prices(last_prices: pd.Series, df_rows: pd.DataFrame) -> pd.Series:
+    """Return last_prices updated with the Price of each ticker in df_rows (last row wins)."""
+    latest = pd.Series(
+        pd.to_numeric(df_rows["Price"], errors="coerce").to_numpy(),
+        index=df_rows["Ticker"].to_numpy(),
+        dtype=float,
+    )
+    latest = latest[~latest.index.duplicated(keep="last")]
+    if last_prices is None or last_prices.empty:
+        return latest.sort_index()
+    return latest.combine_first(last_prices).sort_index()
+
+
+def latest_prices(df_hist: pd.DataFrame) -> pd.Series:
+    """
+    Latest non-missing Price per ticker from a history DataFrame, indexed by
+    Ticker. Picks rows with momentum.last_rows_by_ticker, so the history is
+    never sorted.
+    """
+    if df_hist.empty:
+        return pd.Series(dtype=float)
+    df_hist = df_hist.dropna(subset=["Price"]).reset_index(drop=True)
+    if df_hist.empty:
+        return pd.Series(dtype=float)
+    last = momentum.last_rows_by_ticker(df_hist, n=1)
+    return pd.Series(
+        pd.to_numeric(last["Price"], errors="coerce").to_numpy(),
+        index=pd.Index(last["Ticker"].to_numpy(), name="Ticker"),
+        name="Price",
+        dtype=float,
+    )
@@ -0,0 +1,174 @@
+"""
+Append-only entry log shared by both trackers' AI output.
+
+An entry log is two files:
+    <name>.log      one JSON object per entry ({"timestamp": ..., "text": ...},
+                    plus "id" when the writer gave one)
+    <name>.log.idx  one fixed-size (offset, length) record per entry
+
+Adding an entry appends to both files, so its cost does not depend on how
+many entries exist. The index lets readers seek straight to the newest
+entries for rendering. compact() moves old entries to <name>.archive.jsonl
+and rewrites the active log with the newest ones only.
+
+Appends, reads and compactions hold the log's file lock (see
+tracker_core.storage), so a queue worker appending while another process
+compacts never indexes an offset from the file it is replacing.
+"""
+
+import os
+import json
+import struct
+
+from . import storage
+
+INDEX_RECORD = struct.Struct("<QQ")  # byte offset, byte length
+
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+
+def archive_path(path: str) -> str:
+    root, _ = os.path.splitext(path)
+    return root + ".archive.jsonl"
+
+
+def count_entries(path: str) -> int:
+    """Number of entries in the log (0 if it does not exist)."""
+    try:
+        return os.path.getsize(index_path(path)) // INDEX_RECORD.size
+    except OSError:
+        return 0
+
+
+def exists(path: str) -> bool:
+    return os.path.exists(index_path(path))
+
+
+def _encode(timestamp: str, text: str, entry_id: str = None) -> bytes:
+    entry = {"timestamp": timestamp, "text": text}
+    if entry_id is not None:
+        entry["id"] = entry_id
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def append_entry(path: str, timestamp: str, text: str, entry_id: str = None) -> int:
+    """
+    Append one entry. The data is written and flushed before its index
+    record, so an interrupted append leaves at most unindexed bytes behind.
+    entry_id is stored with the entry so has_entry() can find it later.
+
+    Returns:
+        Number of entries in the log
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    data = _encode(timestamp, text, entry_id)
+    with storage.file_lock(path):
+        with open(path, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(index_path(path), "ab") as f:
+            f.write(INDEX_RECORD.pack(offset, len(data)))
+        return count_entries(path)
+
+
+def read_entries(path: str, limit: int = None) -> list:
+    """
+    Read entries newest first.
+
+    Args:
+        path: Log file
+        limit: Newest entries to read (default: all)
+
+    Returns:
+        List of {"timestamp", "text"} dicts (with "id" where one was given)
+    """
+    if not exists(path):
+        return []
+    with storage.file_lock(path):
+        total = count_entries(path)
+        start = 0 if limit is None else max(0, total - limit)
+        if start >= total:
+            return []
+
+        with open(index_path(path), "rb") as f:
+            f.seek(start * INDEX_RECORD.size)
+            records = list(INDEX_RECORD.iter_unpack(f.read((total - start) * INDEX_RECORD.size)))
+
+        entries = []
+        with open(path, "rb") as f:
+            for offset, length in reversed(records):
+                f.seek(offset)
+                entries.append(json.loads(f.read(length)))
+        return entries
+
+
+def has_entry(path: str, entry_id: str, recent: int = None) -> bool:
+    """Whether one of the newest `recent` entries (default: all) was appended with entry_id."""
+    return any(entry.get("id") == entry_id for entry in read_entries(path, recent))
+
+
+def _write_bytes(path: str, chunks: list):
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(chunks))
+
+    storage.atomic_write(path, write)
+
+
+def _write_log(path: str, entries: list):
+    """Rewrite a log from entries given oldest first (see storage.atomic_write)."""
+    data, index = [], []
+    offset = 0
+    for entry in entries:
+        encoded = _encode(entry["timestamp"], entry["text"], entry.get("id"))
+        data.append(encoded)
+        index.append(INDEX_RECORD.pack(offset, len(encoded)))
+        offset += len(encoded)
+    _write_bytes(path, data)
+    _write_bytes(index_path(path), index)
+
+
+def import_entries(path: str, entries: list) -> int:
+    """Create a log from existing entries given oldest first. Returns entries written."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with storage.file_lock(path):
+        _write_log(path, entries)
+    return len(entries)
+
+
+def compact(path: str, keep: int) -> int:
+    """
+    Keep the newest `keep` entries in the log; older ones are appended to
+    the archive file.
+
+    Returns:
+        Number of entries archived
+    """
+    with storage.file_lock(path):
+        total = count_entries(path)
+        if total <= keep:
+            return 0
+
+        entries = read_entries(path)[::-1]  # oldest first
+        old, recent = entries[:total - keep], entries[total - keep:]
+        with open(archive_path(path), "a", encoding="utf-8") as f:
+            for entry in old:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        _write_log(path, recent)
+        return len(old)
+
+
+def maybe_compact(path: str, keep: int) -> int:
+    """Compact once the log holds twice `keep` entries, so compaction cost is amortised."""
+    with storage.file_lock(path):
+        if count_entries(path) < 2 * keep:
+            return 0
+        return compact(path, keep)
@@ -0,0 +1,149 @@
+"""
+Bounded, retrying fetch engine shared by both trackers.
+Runs a per-ticker fetch function on a worker pool with per-attempt
+timeouts and exponential backoff; each tracker supplies its own fetch
+function and fallback for tickers that never succeed.
+"""
+
+import time
+import heapq
+import threading
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+
+DEFAULT_MAX_WORKERS = 16      # concurrent requests
+DEFAULT_TIMEOUT = 30.0        # seconds allowed per fetch attempt
+DEFAULT_RETRIES = 2           # extra attempts after the first failure
+DEFAULT_BACKOFF = 1.0         # base delay in seconds, doubled per retry
+
+
+def fetch_all(
+    tickers: list,
+    fetch_fn,
+    fallback_fn=None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    on_result=None,
+) -> list:
+    """
+    Run fetch_fn for many tickers on a bounded worker pool.
+    
+    At most max_workers fetches run at once. An attempt that raises or runs
+    longer than timeout seconds is retried after backoff * 2**n seconds, up
+    to retries times; a ticker that never succeeds gets fallback_fn(ticker).
+    Hung attempts are abandoned (threads cannot be killed) but still count
+    against max_workers until they return. If every worker is held by a
+    hung attempt and none returns within another timeout seconds, the
+    tickers still waiting get fallback_fn(ticker) instead of blocking.
+    Attempts run on daemon threads, so a call that never returns cannot
+    keep the interpreter from exiting either.
+    
+    Args:
+        tickers: List of ticker symbols
+        fetch_fn: Callable(ticker) -> result; pass a stub provider to test
+            without network access
+        fallback_fn: Callable(ticker) -> result for tickers that never
+            succeed (default: None)
+        max_workers: Concurrency limit
+        timeout: Per-attempt timeout in seconds
+        retries: Number of retries after the first failed attempt
+        backoff: Base retry delay in seconds
+        on_result: Optional callable(index, result) called as each ticker finishes
+    
+    Returns:
+        List of results in the same order as tickers
+    """
+    max_workers = max(1, int(max_workers))
+
+    results = [None] * len(tickers)
+    attempts = [0] * len(tickers)
+    started = {}                 # future -> start time of the attempt
+    ready = deque(range(len(tickers)))
+    delayed = []                 # heap of (retry_time, index)
+    running = {}                 # future -> index
+    abandoned = set()            # timed-out futures still occupying a worker
+
+    def finish(idx, result):
+        results[idx] = result
+        if on_result is not None:
+            on_result(idx, result)
+
+    def fallback(idx):
+        finish(idx, fallback_fn(tickers[idx]) if fallback_fn else None)
+
+    def fail(idx, reason):
+        attempts[idx] += 1
+        if attempts[idx] <= retries:
+            delay = backoff * (2 ** (attempts[idx] - 1))
+            heapq.heappush(delayed, (time.monotonic() + delay, idx))
+        else:
+            print(f"Warning: giving up on {tickers[idx]} after {attempts[idx]} attempts ({reason})")
+            fallback(idx)
+
+    while ready or delayed or running:
+        now = time.monotonic()
+        while delayed and delayed[0][0] <= now:
+            ready.append(heapq.heappop(delayed)[1])
+
+        # Only submit when a worker is free, so each attempt starts immediately
+        while ready and len(running) + len(abandoned) < max_workers:
+            idx = ready.popleft()
+            future = _submit(fetch_fn, tickers[idx])
+            running[future] = idx
+            started[future] = time.monotonic()
+
+        # Wait for the next completion, timeout deadline, or retry time.
+        # With every worker hung there is no deadline, so wait one more
+        # timeout for a worker to free up
+        now = time.monotonic()
+        wake = [t for t, _ in delayed[:1]]
+        wake += [started[future] + timeout for future in running]
+        wait_for = max(0.0, min(wake) - now) if wake else timeout
+        done, _ = wait(
+            list(running) + list(abandoned),
+            timeout=wait_for,
+            return_when=FIRST_COMPLETED,
+        )
+
+        abandoned -= done
+        if not wake and not done:
+            print(f"Warning: all {max_workers} workers hung; giving up on "
+                  f"{len(ready)} tickers still waiting")
+            while ready:
+                fallback(ready.popleft())
+            break
+
+        now = time.monotonic()
+        for future in list(running):
+            idx = running[future]
+            if future in done:
+                del running[future]
+                started.pop(future, None)
+                try:
+                    finish(idx, future.result())
+                except Exception as e:
+                    fail(idx, e)
+            elif now - started[future] >= timeout:
+                del running[future]
+                started.pop(future, None)
+                abandoned.add(future)
+                fail(idx, f"timed out after {timeout:.0f}s")
+
+    return results
+
+
+def _submit(fn, ticker) -> Future:
+    """Run fn(ticker) on a new daemon thread and return its future."""
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run():
+        try:
+            future.set_result(fn(ticker))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"fetch-{ticker}", daemon=True).start()
+    return future
@@ -0,0 +1,289 @@
+"""
+History store shared by both trackers.
+Typed schemas plus an append-only, date-partitioned Parquet store; each
+tracker passes its own column schema and store location.
+
+Layout:
+    <history_dir>/date=YYYY-MM-DD/part-HHMMSSffffff.parquet
+
+Each append writes one part file per date, so saving never rewrites old
+data, and readers only open the partitions and columns they ask for.
+Appends hold the store's lock (<history_dir>.lock) and every part file is
+fsynced before it is renamed into place, so concurrent runs never pick
+the same part name and a crash never leaves a partial part behind.
+
+CSV histories (sw_stock_tracker) are appended to in place with
+append_csv; load_csv ignores a partial last line from an interrupted append.
+"""
+
+import io
+import os
+
+import pandas as pd
+
+from . import storage
+
+# Columns added to rows reduced to one per ticker and day (see downsample)
+OHLC_COLUMNS = ["Open", "High", "Low"]
+
+
+def empty_history(schema: dict, columns: list = None) -> pd.DataFrame:
+    """Return an empty DataFrame typed by schema ({column: dtype})."""
+    columns = columns or list(schema)
+    return pd.DataFrame({col: pd.Series(dtype=schema[col]) for col in columns})
+
+
+def normalize(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    """Coerce a DataFrame to the schema (missing columns are added as NA)."""
+    df = df.copy()
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            df[col] = pd.NA
+        if dtype.startswith("datetime64"):
+            df[col] = pd.to_datetime(df[col], utc=True, format="mixed")
+        elif dtype == "bool":
+            # Missing flags count as False
+            values = df[col].map(
+                lambda v: v.strip().lower() == "true" if isinstance(v, str) else v
+            )
+            df[col] = values.astype("boolean").fillna(False).astype(bool)
+        elif dtype == "float64":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        else:
+            df[col] = df[col].astype(dtype)
+    return df[list(schema)]
+
+
+def list_partitions(history_dir: str) -> list:
+    """Return sorted partition dates (YYYY-MM-DD) present in the store."""
+    if not os.path.isdir(history_dir):
+        return []
+    return sorted(
+        name[len("date="):]
+        for name in os.listdir(history_dir)
+        if name.startswith("date=")
+    )
+
+
+def exists(history_dir: str) -> bool:
+    """True if the store has at least one partition."""
+    return bool(list_partitions(history_dir))
+
+
+def _partition_files(date: str, history_dir: str) -> list:
+    part_dir = os.path.join(history_dir, f"date={date}")
+    return sorted(
+        os.path.join(part_dir, name)
+        for name in os.listdir(part_dir)
+        if name.endswith(".parquet")
+    )
+
+
+def append_history(df_append: pd.DataFrame, history_dir: str, schema: dict) -> list:
+    """
+    Append rows to the store, one part file per date partition, under the
+    store's lock. Existing files are never rewritten.
+
+    Returns:
+        List of part file paths written
+    """
+    if df_append.empty:
+        return []
+
+    df_append = normalize(df_append, schema)
+    written = []
+    with storage.file_lock(history_dir):
+        for date, part in df_append.groupby(df_append["timestamp"].dt.strftime("%Y-%m-%d")):
+            part_dir = os.path.join(history_dir, f"date={date}")
+            os.makedirs(part_dir, exist_ok=True)
+            stamp = part["timestamp"].max().strftime("%H%M%S%f")
+            path = os.path.join(part_dir, f"part-{stamp}.parquet")
+            # Keep runs with identical timestamps from overwriting each other
+            suffix = 1
+            while os.path.exists(path):
+                path = os.path.join(part_dir, f"part-{stamp}-{suffix}.parquet")
+                suffix += 1
+            storage.atomic_write(path, lambda tmp_path: part.to_parquet(tmp_path, index=False))
+            written.append(path)
+    return written
+
+
+def load_history(
+    history_dir: str,
+    schema: dict,
+    columns: list = None,
+    since: str = None,
+) -> pd.DataFrame:
+    """
+    Load history from the store.
+
+    Args:
+        history_dir: Store directory
+        schema: Column schema of the store
+        columns: Columns to read (default: all)
+        since: Only read partitions on or after this date (YYYY-MM-DD)
+
+    Returns:
+        Typed history DataFrame
+    """
+    columns = columns or list(schema)
+    dates = list_partitions(history_dir)
+    if since is not None:
+        dates = [d for d in dates if d >= since]
+
+    frames = [
+        pd.read_parquet(path, columns=columns)
+        for date in dates
+        for path in _partition_files(date, history_dir)
+    ]
+    if not frames:
+        return empty_history(schema, columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_latest_run(history_dir: str, schema: dict, columns: list = None) -> pd.DataFrame:
+    """Load only the rows written by the most recent run (latest timestamp)."""
+    columns = columns or list(schema)
+    dates = list_partitions(history_dir)
+    if not dates:
+        return empty_history(schema, columns)
+
+    read_cols = columns if "timestamp" in columns else ["timestamp"] + columns
+    df = load_history(history_dir, schema, columns=read_cols, since=dates[-1])
+    if df.empty:
+        return empty_history(schema, columns)
+    df = df[df["timestamp"] == df["timestamp"].max()]
+    return df[columns].reset_index(drop=True)
+
+
+def downsample(
+    df_hist: pd.DataFrame,
+    full_resolution: pd.Timedelta,
+    max_age: pd.Timedelta = None,
+    now: pd.Timestamp = None,
+    price_col: str = "Price",
+) -> pd.DataFrame:
+    """
+    Apply a retention policy to a history DataFrame.
+
+    Rows newer than full_resolution are kept as they are. Older rows are
+    reduced to one row per ticker and UTC day: the day's last row (so
+    price_col is the close and the other columns the last values seen),
+    with Open, High and Low columns from the day's prices. Rows older than
+    max_age are dropped. Downsampling already downsampled rows is a no-op,
+    so this can run on every save.
+
+    Args:
+        df_hist: History with timestamp, Ticker and price_col columns
+        full_resolution: Age below which every row is kept
+        max_age: Age beyond which rows are dropped (None keeps them all)
+        now: Reference time (default: current UTC time)
+        price_col: Price column the OHLC columns are derived from
+
+    Returns:
+        History sorted by timestamp, with Open, High and Low columns
+    """
+    now = pd.Timestamp.now(tz="UTC") if now is None else now
+    df_hist = df_hist.reindex(columns=[*df_hist.columns, *[c for c in OHLC_COLUMNS if c not in df_hist.columns]])
+    if df_hist.empty:
+        return df_hist
+
+    if max_age is not None:
+        df_hist = df_hist[df_hist["timestamp"] >= now - max_age]
+    df_hist = df_hist.sort_values("timestamp", kind="stable")
+    is_old = df_hist["timestamp"] < now - full_resolution
+    old, recent = df_hist[is_old], df_hist[~is_old]
+    if old.empty:
+        return recent.reset_index(drop=True)
+
+    # Rows that are already daily carry their own Open/High/Low
+    price = pd.to_numeric(old[price_col], errors="coerce")
+    keys = [old["Ticker"], old["timestamp"].dt.floor("D")]
+    ohlc = pd.DataFrame({
+        "Open": old["Open"].fillna(price).groupby(keys).first(),
+        "High": old["High"].fillna(price).groupby(keys).max(),
+        "Low": old["Low"].fillna(price).groupby(keys).min(),
+    })
+    daily = old.groupby(keys, sort=False).tail(1)
+    day_index = pd.MultiIndex.from_arrays([daily["Ticker"], daily["timestamp"].dt.floor("D")])
+    daily = daily.assign(**{col: ohlc[col].reindex(day_index).to_numpy() for col in OHLC_COLUMNS})
+
+    return pd.concat([daily, recent], ignore_index=True)
+
+
+def needs_downsample(
+    df_hist: pd.DataFrame,
+    full_resolution: pd.Timedelta,
+    max_age: pd.Timedelta = None,
+    now: pd.Timestamp = None,
+    price_col: str = "Price",
+) -> bool:
+    """
+    True if downsample() would change df_hist by more than the rows of the
+    day currently crossing the full_resolution cutoff, i.e. a whole day of
+    rows is waiting to be reduced or rows are past max_age. Checking this
+    before compacting keeps compaction to about once a day.
+    """
+    if df_hist.empty:
+        return False
+    now = pd.Timestamp.now(tz="UTC") if now is None else now
+    if max_age is not None and (df_hist["timestamp"] < now - max_age).any():
+        return True
+    old = df_hist[df_hist["timestamp"] < (now - full_resolution).floor("D")]
+    if old.empty:
+        return False
+    if "Open" not in old.columns:
+        return True
+    # Downsampled rows have Open set (unless they had no price at all)
+    days = pd.DataFrame({"Ticker": old["Ticker"], "day": old["timestamp"].dt.floor("D")})
+    return bool((old["Open"].isna() & old[price_col].notna()).any() or days.duplicated().any())
+
+
+def csv_header(schema: dict) -> bytes:
+    return pd.DataFrame(columns=list(schema)).to_csv(index=False).encode("utf-8")
+
+
+def read_csv_header(path: str) -> bytes:
+    """First line of a CSV file, including its newline (b"" if missing or empty)."""
+    try:
+        with open(path, "rb") as f:
+            return f.readline()
+    except FileNotFoundError:
+        return b""
+
+
+def append_csv(df_append: pd.DataFrame, path: str, schema: dict) -> bool:
+    """
+    Append rows to a CSV history without rewriting it (see storage.append_bytes).
+    Only possible when the file is missing, empty or has exactly the
+    schema's columns; call with the file's lock held.
+
+    Returns:
+        False (and nothing written) if the file has a different header and
+        must be rewritten instead
+    """
+    header = csv_header(schema)
+    existing = read_csv_header(path)
+    if existing and existing != header:
+        return False
+    if df_append.empty:
+        return True
+    rows = normalize(df_append, schema)[list(schema)].to_csv(index=False, header=False)
+    storage.append_bytes(path, rows.encode("utf-8"), header=header)
+    return True
+
+
+def load_csv(path: str, schema: dict) -> pd.DataFrame:
+    """
+    Load a CSV history file typed by schema (empty if the file is missing).
+    A partial last line left by an interrupted append is ignored.
+    """
+    if not os.path.exists(path):
+        return empty_history(schema)
+    with open(path, "rb") as f:
+        data = f.read()
+    if data and not data.endswith(b"\n"):
+        data = data[:data.rfind(b"\n") + 1]
+    if not data.strip():
+        return empty_history(schema)
+    return normalize(pd.read_csv(io.BytesIO(data)), schema)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Vectorized momentum engine shared by both trackers.
+Computes per-ticker latest values, previous-row changes and time-based
+lookback changes for all tickers at once.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Lookback windows: output column -> how far back to look from each ticker's latest row
+DEFAULT_WINDOWS = {"Weekly Change %": pd.Timedelta(days=5)}
+
+# Common extra windows, e.g. compute_momentum(df, windows={**DEFAULT_WINDOWS, **EXTENDED_WINDOWS})
+EXTENDED_WINDOWS = {
+    "1D Change %": pd.Timedelta(days=1),
+    "5D Change %": pd.Timedelta(days=5),
+    "21D Change %": pd.Timedelta(days=21),
+    "63D Change %": pd.Timedelta(days=63),
+}
+
+
+def last_rows_by_ticker(df_hist: pd.DataFrame, n: int = 2) -> pd.DataFrame:
+    """
+    Return the last n rows (by timestamp) of each ticker, ordered by Ticker
+    then timestamp.
+    
+    Uses n group-wise max passes over integer ticker codes instead of sorting
+    the full history, so the cost is O(rows * n). Ties on timestamp resolve to
+    the row that comes later in df_hist, same as a stable sort.
+    """
+    codes, _ = pd.factorize(df_hist["Ticker"], sort=True)
+    stamps = df_hist["timestamp"].astype("int64").to_numpy()
+    positions = np.arange(len(df_hist))
+    remaining = codes >= 0  # NaN tickers are dropped, as in groupby
+    
+    picked = []
+    for rank in range(n):
+        if not remaining.any():
+            break
+        c = codes[remaining]
+        s = stamps[remaining]
+        p = positions[remaining]
+        # Latest timestamp per ticker, then the last row holding it
+        latest = pd.Series(s).groupby(c).transform("max").to_numpy()
+        last_pos = pd.Series(p[s == latest]).groupby(c[s == latest]).max()
+        picked.append(pd.DataFrame({
+            "code": last_pos.index.to_numpy(),
+            "rank": rank,
+            "pos": last_pos.to_numpy(),
+        }))
+        remaining[last_pos.to_numpy()] = False
+    
+    if not picked:
+        return df_hist.iloc[[]]
+    order = pd.concat(picked).sort_values(["code", "rank"], ascending=[True, False])
+    return df_hist.iloc[order["pos"].to_numpy()]
+
+
+def latest_and_previous(df_hist: pd.DataFrame) -> tuple:
+    """
+    Split each ticker's last two rows into (current, previous) DataFrames
+    indexed by Ticker. previous only has tickers with at least two rows.
+    """
+    last_two = last_rows_by_ticker(df_hist, n=2)
+    position = last_two.groupby("Ticker", sort=False).cumcount(ascending=False).to_numpy()
+    current = last_two[position == 0].set_index("Ticker")
+    previous = last_two[position == 1].set_index("Ticker")
+    return current, previous
+
+
+def pct_change(new: pd.Series, old: pd.Series) -> pd.Series:
+    """(new / old - 1) * 100, NaN where either side is missing or 0."""
+    new = pd.to_numeric(new, errors="coerce")
+    old = pd.to_numeric(old, errors="coerce")
+    valid = new.notna() & old.notna() & (new != 0) & (old != 0)
+    return ((new / old.where(valid) - 1) * 100).where(valid)
+
+
+def lookback_prices(
+    df_hist: pd.DataFrame,
+    current: pd.DataFrame,
+    windows: dict,
+    price_col: str = "Price",
+) -> pd.DataFrame:
+    """
+    Find each ticker's price as of (latest timestamp - window) for every window
+    with a single merge_asof, so extra windows cost one more query row per
+    ticker instead of another scan of the history.
+    
+    Returns:
+        DataFrame indexed by Ticker with one column per window
+    """
+    if not windows or current.empty:
+        return pd.DataFrame(index=current.index, columns=list(windows), dtype=float)
+    
+    queries = pd.concat([
+        pd.DataFrame({
+            "Ticker": current.index,
+            "window": name,
+            "target": current["timestamp"].to_numpy() - delta,
+        })
+        for name, delta in windows.items()
+    ], ignore_index=True)
+    queries = queries.dropna(subset=["target"]).sort_values("target", kind="stable")
+    
+    history = df_hist[["Ticker", "timestamp", price_col]].dropna(subset=["Ticker", "timestamp"])
+    history = history.sort_values("timestamp", kind="stable")
+    # merge_asof needs matching key dtypes on both sides
+    queries["target"] = queries["target"].astype(history["timestamp"].dtype)
+    queries["Ticker"] = queries["Ticker"].astype(history["Ticker"].dtype)
+    
+    merged = pd.merge_asof(
+        queries,
+        history,
+        left_on="target",
+        right_on="timestamp",
+        by="Ticker",
+        direction="backward",
+    )
+    table = merged.pivot(index="Ticker", columns="window", values=price_col)
+    return table.reindex(index=current.index, columns=list(windows))
+
+
+def compute_momentum(
+    df_hist: pd.DataFrame,
+    windows: dict = None,
+    price_col: str = "Price",
+    high_col: str = None,
+) -> pd.DataFrame:
+    """
+    Compute momentum for every ticker in one pass.
+    
+    Args:
+        df_hist: History with Ticker, timestamp and price_col columns
+        windows: {output column: pd.Timedelta} lookbacks (default: DEFAULT_WINDOWS)
+        price_col: Price column name
+        high_col: Optional "% From 52W High"-style column; adds "High Momentum"
+            (latest minus previous value, positive = moving toward the high)
+    
+    Returns:
+        DataFrame with one row per ticker (sorted by Ticker): the ticker's latest
+        row, "Daily Change %" (vs previous row), one column per window, and
+        "High Momentum" when high_col is given.
+    """
+    windows = DEFAULT_WINDOWS if windows is None else windows
+    if df_hist.empty:
+        return pd.DataFrame()
+    
+    current, previous = latest_and_previous(df_hist)
+    prev_aligned = previous.reindex(current.index)
+    
+    result = current.copy()
+    result["Daily Change %"] = pct_change(current[price_col], prev_aligned[price_col])
+    
+    past_prices = lookback_prices(df_hist, current, windows, price_col)
+    for name in windows:
+        result[name] = pct_change(current[price_col], past_prices[name])
+    
+    if high_col is not None:
+        curr_pct = pd.to_numeric(current[high_col], errors="coerce")
+        prev_pct = pd.to_numeric(prev_aligned[high_col], errors="coerce")
+        result["High Momentum"] = curr_pct - prev_pct
+    
+    return result.reset_index()
@@ -0,0 +1,232 @@
+"""
+News summary image shared by both trackers.
+Draws a title plus one row per ticker (ticker label and its first
+headlines); each tracker passes its own style.
+
+Output is paginated into fixed-height pages of at most style["page_rows"]
+tickers: news_summary.png, news_summary-2.png, ... A page template (figure,
+fonts, row positions and one set of text artists per row) is built once per
+style and page size and reused: each page only updates the text and colors
+of its rows in place before saving, so 500 tickers cost 20 small pages
+instead of one giant canvas.
+"""
+
+import os
+import math
+import threading
+
+from . import render, storage
+
+DEFAULT_STYLE = {
+    "title": "Stock News Summary",
+    "width": 12,                 # figure width in inches
+    "row_height": 1.2,           # height per ticker row in inches
+    "extra_height": 0,           # extra height below the title in inches
+    "title_height": 0.8,         # height of the title band in inches
+    "page_rows": 25,             # tickers per page
+    "dpi": 150,
+    "background": "white",
+    "title_color": "black",
+    "title_size": 16,
+    "ticker_size": 11,
+    "headline_size": 8,
+    "headline_color": "black",
+    "empty_color": "black",
+    "headlines": 2,              # headlines shown per ticker
+    "max_chars": 80,             # headlines longer than this are truncated
+    "inline": False,             # first headline on the ticker's line
+    "ticker_suffix": ":",
+    "ticker_color": None,        # callable(headlines, sentiment) -> color, or None for title_color
+}
+
+# Page templates by (plain style values, rows per page), oldest dropped first
+MAX_TEMPLATES = 8
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def truncate(headline: str, max_chars: int) -> str:
+    """Shorten a headline to max_chars characters, ending in "..."."""
+    if len(headline) > max_chars:
+        return headline[:max_chars - 3] + "..."
+    return headline
+
+
+def _plain(style: dict) -> dict:
+    return {key: value for key, value in style.items() if not callable(value)}
+
+
+def page_filename(filename: str, page: int) -> str:
+    """Path of a page: the filename itself for page 1, then name-2.png, name-3.png, ..."""
+    if page == 1:
+        return filename
+    root, ext = os.path.splitext(filename)
+    return f"{root}-{page}{ext}"
+
+
+class PageTemplate:
+    """
+    One fixed-size page: the figure, fonts and row layout are computed once,
+    and every row has its own ticker and headline text artists that
+    draw_page() updates in place.
+    """
+
+    def __init__(self, style: dict, rows: int):
+        from matplotlib.figure import Figure
+        from matplotlib.font_manager import FontProperties
+
+        self.style = style
+        self.rows = rows
+        self.lock = threading.Lock()
+
+        headlines = style["headlines"]
+        height = style["title_height"] + style["extra_height"] + rows * style["row_height"] + 0.2
+        self.figure = Figure(figsize=(style["width"], height), facecolor=style["background"])
+        ax = self.figure.add_axes([0, 0, 1, 1])
+        ax.axis('off')
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, height)  # y in inches from the bottom
+
+        self.fonts = {
+            "title": FontProperties(size=style["title_size"], weight='bold'),
+            "ticker": FontProperties(size=style["ticker_size"], weight='bold'),
+            "headline": FontProperties(size=style["headline_size"]),
+            "empty": FontProperties(size=style["headline_size"], style='italic'),
+        }
+
+        # Row layout: in inline mode the first headline sits on the ticker's
+        # line, otherwise all headlines are stacked below it
+        if style["inline"]:
+            line = style["row_height"] / (1 + 0.5 * (headlines - 1))
+            offsets = [0] + [line * (1 + 0.5 * (k - 1)) for k in range(1, headlines)]
+            x_headline = 0.10
+        else:
+            line = style["row_height"] / (0.9 + 0.5 * headlines)
+            offsets = [line * (0.6 + 0.5 * k) for k in range(headlines)]
+            x_headline = 0.05
+
+        self.title = ax.text(0.5, height - 0.15, "", fontproperties=self.fonts["title"],
+                             ha='center', va='top', color=style["title_color"])
+        top = height - style["title_height"] - style["extra_height"]
+        self.row_artists = []
+        for row in range(rows):
+            y = top - row * style["row_height"]
+            ticker = ax.text(0.02, y, "", fontproperties=self.fonts["ticker"], va='top')
+            lines = [
+                ax.text(x_headline, y - offset, "", fontproperties=self.fonts["headline"], va='top')
+                for offset in offsets
+            ]
+            self.row_artists.append((ticker, lines))
+
+    def draw_page(self, news_dict: dict, tickers: list, title: str, sentiments: dict = None):
+        """Fill the rows with tickers (rows past the end are blanked)."""
+        sentiments = sentiments or {}
+        style = self.style
+        self.title.set_text(title)
+        for row, (ticker_text, lines) in enumerate(self.row_artists):
+            if row >= len(tickers):
+                ticker_text.set_text("")
+                for line in lines:
+                    line.set_text("")
+                continue
+
+            ticker = tickers[row]
+            headlines = news_dict.get(ticker) or []
+            color = (style["ticker_color"](headlines, sentiments.get(ticker))
+                     if style["ticker_color"] else style["title_color"])
+            ticker_text.set_text(f"{ticker}{style['ticker_suffix']}")
+            ticker_text.set_color(color)
+
+            if not headlines:
+                lines[0].set_text("• No recent news")
+                lines[0].set_fontproperties(self.fonts["empty"])
+                lines[0].set_color(style["empty_color"])
+                for line in lines[1:]:
+                    line.set_text("")
+                continue
+
+            for k, line in enumerate(lines):
+                if k < len(headlines):
+                    line.set_text(f"• {truncate(headlines[k], style['max_chars'])}")
+                    line.set_fontproperties(self.fonts["headline"])
+                    line.set_color(style["headline_color"])
+                else:
+                    line.set_text("")
+
+    def save(self, filename: str, metadata: dict = None):
+        """Write the page (see storage.atomic_write)."""
+        storage.atomic_write(filename, lambda tmp_path: self.figure.savefig(
+            tmp_path, format="png", dpi=self.style["dpi"],
+            facecolor=self.style["background"], edgecolor='none', metadata=metadata,
+            pil_kwargs={"compress_level": 1},
+        ))
+
+
+def get_template(style: dict, rows: int) -> PageTemplate:
+    """Return the cached page template for style and rows per page."""
+    key = (repr(sorted(_plain(style).items())), style["ticker_color"], rows)
+    with _templates_lock:
+        template = _templates.get(key)
+        if template is None:
+            if len(_templates) >= MAX_TEMPLATES:
+                del _templates[next(iter(_templates))]
+            template = _templates[key] = PageTemplate(style, rows)
+    return template
+
+
+def image_key(news_dict: dict, tickers: list, style: dict = None, sentiments: dict = None) -> str:
+    """Input hash of a news image: tickers, their headlines and sentiments, and the style's plain values."""
+    style = {**DEFAULT_STYLE, **(style or {})}
+    sentiments = sentiments or {}
+    return render.input_hash(
+        tickers,
+        [news_dict.get(ticker) or [] for ticker in tickers],
+        [sentiments.get(ticker) for ticker in tickers],
+        _plain(style),
+    )
+
+
+def create_news_image(
+    news_dict: dict,
+    tickers: list,
+    filename: str,
+    style: dict = None,
+    metadata: dict = None,
+    sentiments: dict = None,
+) -> list:
+    """
+    Render news headlines per ticker to one or more fixed-height pages.
+    Uses a standalone Figure (not pyplot), so it can run on a background thread.
+    Pages left over from an earlier, longer run are removed.
+
+    Args:
+        news_dict: {ticker: [headlines]}
+        tickers: Tickers to draw, in order
+        filename: Output image path of the first page
+        style: Overrides for DEFAULT_STYLE
+        metadata: PNG text chunks to store (see tracker_core.render)
+        sentiments: {ticker: sentiment label} passed to style["ticker_color"]
+
+    Returns:
+        List of page paths written
+    """
+    style = {**DEFAULT_STYLE, **(style or {})}
+    per_page = max(1, style["page_rows"])
+    pages = max(1, math.ceil(len(tickers) / per_page))
+    template = get_template(style, max(1, min(per_page, len(tickers))))
+
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    written = []
+    with template.lock:
+        for page in range(1, pages + 1):
+            title = style["title"] if pages == 1 else f"{style['title']} ({page}/{pages})"
+            template.draw_page(news_dict, tickers[(page - 1) * per_page:page * per_page], title, sentiments)
+            path = page_filename(filename, page)
+            template.save(path, metadata)
+            written.append(path)
+
+    stale = pages + 1
+    while os.path.exists(page_filename(filename, stale)):
+        os.remove(page_filename(filename, stale))
+        stale += 1
+    return written
@@ -0,0 +1,384 @@
+"""
+Market data providers shared by both trackers.
+
+A provider answers every market data request the trackers make:
+
+    quote(ticker, name=True)   {"name", "price", "market_cap", "year_high", "year_low"}
+                               (values may be None)
+    prices(tickers)            {ticker: latest price} for many tickers in one request
+    history(ticker, period)    DataFrame of daily bars indexed by date (High, Low)
+    download(tickers, ...)     {ticker: DataFrame of daily High, Low[, Stock Splits]}
+    news(ticker)               raw yfinance-style news items
+
+YFinanceProvider is the live default. RecordingProvider wraps another
+provider and keeps every response so it can be saved as a fixture, and
+ReplayProvider serves a fixture back with configurable synthetic latency,
+so whole tracker runs can be tested and benchmarked without network access.
+
+Fixture format (JSON):
+    {"quotes": {ticker: {quote fields}},
+     "bars":   {ticker: {"dates": [YYYY-MM-DD, ...], "High": [...], "Low": [...]}},
+     "news":   {ticker: [news items]}}
+"""
+
+import json
+import time
+import random
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+
+from . import storage
+
+QUOTE_FIELDS = ["name", "price", "market_cap", "year_high", "year_low"]
+
+# Headline templates for synthetic_fixture()
+HEADLINES = [
+    "{ticker} shares rise after strong quarterly results",
+    "{ticker} beats estimates and raises full-year guidance",
+    "Analysts weigh {ticker} outlook ahead of earnings",
+    "{ticker} falls as margins come under pressure",
+    "{ticker} announces new buyback program",
+    "Investors cautious on {ticker} after downgrade",
+    "{ticker} hits record high on AI demand",
+    "{ticker} faces regulatory probe",
+]
+
+
+def empty_quote() -> dict:
+    return dict.fromkeys(QUOTE_FIELDS)
+
+
+class YFinanceProvider:
+    """Live data from yfinance (imported on first use)."""
+
+    def quote(self, ticker: str, name: bool = True) -> dict:
+        """
+        Current quote from fast_info, falling back to info for missing values.
+        info is always read when name=True (the company name is only there).
+        """
+        import yfinance as yf
+
+        t = yf.Ticker(ticker)
+        quote = empty_quote()
+
+        # Try fast_info first (faster)
+        try:
+            fi = t.fast_info
+            quote["price"] = getattr(fi, "last_price", None) or getattr(fi, "last_close", None)
+            quote["market_cap"] = getattr(fi, "market_cap", None)
+            quote["year_high"] = getattr(fi, "year_high", None)
+            quote["year_low"] = getattr(fi, "year_low", None)
+        except Exception:
+            pass
+
+        if name or None in (quote["price"], quote["market_cap"], quote["year_high"]):
+            try:
+                info = t.info
+                fallbacks = {
+                    "price": "regularMarketPrice",
+                    "market_cap": "marketCap",
+                    "year_high": "fiftyTwoWeekHigh",
+                    "year_low": "fiftyTwoWeekLow",
+                }
+                for field, key in fallbacks.items():
+                    if quote[field] is None:
+                        quote[field] = info.get(key)
+                quote["name"] = info.get("shortName") or info.get("longName")
+            except Exception:
+                pass
+
+        return quote
+
+    def history(self, ticker: str, period: str = "max") -> pd.DataFrame:
+        import yfinance as yf
+
+        return yf.Ticker(ticker).history(period=period)
+
+    def download(self, tickers: list, **kwargs) -> dict:
+        """
+        Download daily bars for several tickers in one yf.download call.
+        Only the High and Low columns (plus Stock Splits when actions=True) are
+        kept, so the full OHLCV frame is dropped as soon as the batch is split.
+
+        Args:
+            tickers: List of ticker symbols
+            **kwargs: Passed to yf.download (period, start, actions, ...)
+        """
+        options = dict(
+            interval="1d",
+            group_by="column",
+            auto_adjust=True,
+            actions=False,
+            progress=False,
+            threads=True,
+        )
+        options.update(kwargs)
+        fields = ["High", "Low"] + (["Stock Splits"] if options["actions"] else [])
+
+        import yfinance as yf
+
+        try:
+            data = yf.download(tickers, **options)
+        except Exception as e:
+            print(f"Warning: batch download failed for {len(tickers)} tickers: {e}")
+            return {}
+
+        if data is None or data.empty:
+            return {}
+
+        if isinstance(data.columns, pd.MultiIndex):
+            columns = {field: data[field] for field in fields if field in data.columns.levels[0]}
+        else:
+            # Older yfinance returns flat columns for a single ticker
+            columns = {
+                field: data[[field]].set_axis(tickers[:1], axis=1)
+                for field in fields if field in data.columns
+            }
+        del data
+        if "High" not in columns:
+            return {}  # e.g. every ticker in the batch errored
+
+        bars = {}
+        for ticker in tickers:
+            if ticker not in columns["High"].columns:
+                continue
+            frame = pd.DataFrame({field: col[ticker] for field, col in columns.items()})
+            frame = frame.dropna(subset=["High"])
+            if not frame.empty:
+                bars[ticker] = frame
+
+        return bars
+
+    def prices(self, tickers: list) -> dict:
+        """
+        Latest price for several tickers from one yf.download call of
+        today's 1-minute bars (the last close of each ticker). Tickers
+        without a bar today are left out.
+        """
+        import yfinance as yf
+
+        try:
+            data = yf.download(tickers, period="1d", interval="1m", group_by="column",
+                               auto_adjust=True, actions=False, progress=False, threads=True)
+        except Exception as e:
+            print(f"Warning: price download failed for {len(tickers)} tickers: {e}")
+            return {}
+
+        if data is None or data.empty or "Close" not in data.columns.get_level_values(0):
+            return {}
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            # Older yfinance returns flat columns for a single ticker
+            close = close.to_frame(tickers[0])
+        last = close.ffill().iloc[-1]
+        return {ticker: float(last[ticker]) for ticker in tickers
+                if ticker in last.index and pd.notna(last[ticker])}
+
+    def news(self, ticker: str) -> list:
+        import yfinance as yf
+
+        return yf.Ticker(ticker).news
+
+
+def _bars_to_json(frame: pd.DataFrame) -> dict:
+    frame = frame.dropna(subset=["High"])
+    return {
+        "dates": [pd.Timestamp(d).strftime("%Y-%m-%d") for d in frame.index],
+        "High": [float(v) for v in frame["High"]],
+        "Low": [float(v) for v in frame["Low"]],
+    }
+
+
+class RecordingProvider:
+    """
+    Pass requests through to another provider and record the responses.
+    save() writes them as a fixture for ReplayProvider.
+    """
+
+    def __init__(self, provider=None):
+        self.provider = provider or YFinanceProvider()
+        self.fixture = {"quotes": {}, "bars": {}, "news": {}}
+        self._lock = threading.Lock()
+
+    def _record_bars(self, ticker: str, frame: pd.DataFrame):
+        if frame is None or frame.empty:
+            return
+        recorded = _bars_to_json(frame)
+        with self._lock:
+            # Keep the longest history seen for the ticker
+            if len(recorded["dates"]) >= len(self.fixture["bars"].get(ticker, {}).get("dates", [])):
+                self.fixture["bars"][ticker] = recorded
+
+    def quote(self, ticker: str, name: bool = True) -> dict:
+        quote = self.provider.quote(ticker, name=name)
+        with self._lock:
+            self.fixture["quotes"][ticker] = quote
+        return quote
+
+    def prices(self, tickers: list) -> dict:
+        prices = self.provider.prices(tickers)
+        with self._lock:
+            for ticker, price in prices.items():
+                self.fixture["quotes"].setdefault(ticker, empty_quote())["price"] = price
+        return prices
+
+    def history(self, ticker: str, period: str = "max") -> pd.DataFrame:
+        frame = self.provider.history(ticker, period=period)
+        self._record_bars(ticker, frame)
+        return frame
+
+    def download(self, tickers: list, **kwargs) -> dict:
+        bars = self.provider.download(tickers, **kwargs)
+        for ticker, frame in bars.items():
+            self._record_bars(ticker, frame)
+        return bars
+
+    def news(self, ticker: str) -> list:
+        items = self.provider.news(ticker)
+        with self._lock:
+            self.fixture["news"][ticker] = items
+        return items
+
+    def save(self, path: str):
+        save_fixture(self.fixture, path)
+
+
+class ReplayProvider:
+    """
+    Serve recorded responses from a fixture, sleeping `latency` seconds per
+    request (+/- `jitter` as a fraction of it) to stand in for the network.
+    Tickers missing from the fixture get empty responses.
+    """
+
+    def __init__(self, fixture, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.fixture = load_fixture(fixture) if isinstance(fixture, str) else fixture
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._frames = {}
+
+    def _wait(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency * (1 + self.jitter * (2 * self._random.random() - 1))
+        if delay > 0:
+            time.sleep(delay)
+
+    def _bars(self, ticker: str) -> pd.DataFrame:
+        frame = self._frames.get(ticker)
+        if frame is None:
+            recorded = self.fixture.get("bars", {}).get(ticker)
+            if not recorded:
+                return None
+            frame = pd.DataFrame(
+                {"High": recorded["High"], "Low": recorded["Low"]},
+                index=pd.DatetimeIndex(recorded["dates"], name="Date"),
+                dtype="float64",
+            )
+            self._frames[ticker] = frame
+        return frame
+
+    @staticmethod
+    def _since(frame: pd.DataFrame, period: str = "max", start=None) -> pd.DataFrame:
+        if start is not None:
+            return frame[frame.index >= pd.Timestamp(start)]
+        if period and period != "max":
+            offsets = {"d": "days", "mo": "months", "y": "years"}
+            unit = next(u for u in ("mo", "d", "y") if period.endswith(u))
+            cutoff = frame.index.max() - pd.DateOffset(**{offsets[unit]: int(period[:-len(unit)])})
+            return frame[frame.index > cutoff]
+        return frame
+
+    def quote(self, ticker: str, name: bool = True) -> dict:
+        self._wait()
+        return {**empty_quote(), **self.fixture.get("quotes", {}).get(ticker, {})}
+
+    def prices(self, tickers: list) -> dict:
+        """Current fixture prices; change fixture["quotes"] between calls to move them."""
+        self._wait()
+        quotes = self.fixture.get("quotes", {})
+        return {ticker: quotes[ticker]["price"] for ticker in tickers
+                if quotes.get(ticker, {}).get("price") is not None}
+
+    def history(self, ticker: str, period: str = "max") -> pd.DataFrame:
+        self._wait()
+        frame = self._bars(ticker)
+        if frame is None:
+            return pd.DataFrame(columns=["High", "Low"])
+        return self._since(frame, period).copy()
+
+    def download(self, tickers: list, period: str = "max", start=None, actions: bool = False, **kwargs) -> dict:
+        self._wait()
+        bars = {}
+        for ticker in tickers:
+            frame = self._bars(ticker)
+            if frame is None:
+                continue
+            frame = self._since(frame, period, start)
+            if frame.empty:
+                continue
+            bars[ticker] = frame.assign(**{"Stock Splits": 0.0}) if actions else frame.copy()
+        return bars
+
+    def news(self, ticker: str) -> list:
+        self._wait()
+        return list(self.fixture.get("news", {}).get(ticker, []))
+
+
+def load_fixture(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_fixture(fixture: dict, path: str):
+    """Write a fixture (see storage.atomic_write)."""
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, default=lambda v: v.item() if hasattr(v, "item") else str(v))
+
+    storage.atomic_write(path, write)
+
+
+def synthetic_fixture(tickers: list, days: int = 400, at_high: float = 0.2, seed: int = 0) -> dict:
+    """
+    Build a fixture of random-walk prices for benchmarks and tests.
+
+    Args:
+        tickers: Ticker symbols
+        days: Daily bars per ticker (ending yesterday)
+        at_high: Fraction of tickers whose current price is a new 52-week high
+        seed: Random seed, so the same arguments give the same fixture
+    """
+    rng = random.Random(seed)
+    end = date.today() - timedelta(days=1)
+    dates = [(end - timedelta(days=days - 1 - i)).isoformat() for i in range(days)]
+    fixture = {"quotes": {}, "bars": {}, "news": {}}
+
+    for ticker in tickers:
+        price = rng.uniform(20, 500)
+        highs, lows = [], []
+        for _ in dates:
+            price *= 1 + rng.gauss(0, 0.015)
+            highs.append(round(price * (1 + abs(rng.gauss(0, 0.005))), 4))
+            lows.append(round(price * (1 - abs(rng.gauss(0, 0.005))), 4))
+
+        year_high = max(highs[-365:])
+        last = year_high * 1.002 if rng.random() < at_high else price
+        fixture["bars"][ticker] = {"dates": dates, "High": highs, "Low": lows}
+        fixture["quotes"][ticker] = {
+            "name": f"{ticker} Corp",
+            "price": round(last, 4),
+            "market_cap": round(rng.uniform(5e9, 3e12), -6),
+            "year_high": max(year_high, last),
+            "year_low": min(lows[-365:]),
+        }
+        fixture["news"][ticker] = [
+            {"content": {"title": title.format(ticker=ticker)}}
+            for title in rng.sample(HEADLINES, 3)
+        ]
+    return fixture
+
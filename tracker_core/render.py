@@ -0,0 +1,210 @@
+"""
+Image rendering shared by both trackers.
+
+Every image is keyed by a hash of the data it shows. The hash is stored in
+the PNG itself (a text chunk), so a render whose input has not changed
+since the file was written is skipped, and the check survives the image
+being committed and checked out again. Renderer runs renders on one
+background thread, so the caller can persist data while images are drawn.
+
+Tables are rasterized directly with Pillow: no browser and no plotting
+library is loaded to draw them.
+"""
+
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from . import storage
+
+HASH_KEY = "input-sha1"
+
+# Table style
+FONT_SIZE = 14
+PADDING = (12, 7)              # horizontal, vertical cell padding in pixels
+SCALE = 2                      # pixels per point, for a sharp image on phones
+HEADER_BACKGROUND = "#ffffff"
+ROW_BACKGROUNDS = ("#f5f5f5", "#ffffff")
+BORDER_COLOR = "#333333"
+TEXT_COLOR = "#000000"
+
+
+def input_hash(*parts) -> str:
+    """SHA-1 of the render input (DataFrames are hashed by their CSV text)."""
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            part = part.to_csv(index=False)
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stored_hash(filename: str):
+    """Input hash saved in an existing PNG (None if missing or unreadable)."""
+    if not os.path.exists(filename):
+        return None
+    try:
+        from PIL import Image
+
+        with Image.open(filename) as image:
+            return image.text.get(HASH_KEY)
+    except Exception:
+        return None
+
+
+def render_if_changed(filename: str, key: str, draw_fn) -> bool:
+    """
+    Call draw_fn(filename, metadata) unless filename was already rendered
+    from input hashing to key. draw_fn must save metadata in the PNG.
+
+    Returns:
+        True if the image was rendered
+    """
+    if stored_hash(filename) == key:
+        return False
+    draw_fn(filename, {HASH_KEY: key})
+    return True
+
+
+def _font(size: int, bold: bool = False):
+    from PIL import ImageFont
+
+    for name in (("DejaVuSans-Bold.ttf", "Arial Bold.ttf") if bold else ("DejaVuSans.ttf", "Arial.ttf")):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def _cell(value, fmt: str = None) -> str:
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    if fmt:
+        try:
+            return fmt.format(value)
+        except (ValueError, TypeError):
+            pass
+    return str(value)
+
+
+def render_table(df: pd.DataFrame, filename: str, formats: dict = None, metadata: dict = None):
+    """
+    Draw a DataFrame as a PNG table (header row, striped rows, numbers
+    right-aligned), written to a temp file and renamed.
+
+    Args:
+        df: Table to draw (index is not shown)
+        filename: Output PNG path
+        formats: {column: format string}, e.g. {"Price": "{:.2f}"}
+        metadata: PNG text chunks to store (see render_if_changed)
+    """
+    from PIL import Image, ImageDraw
+    from PIL.PngImagePlugin import PngInfo
+
+    formats = formats or {}
+    font = _font(FONT_SIZE * SCALE)
+    bold = _font(FONT_SIZE * SCALE, bold=True)
+    pad_x, pad_y = PADDING[0] * SCALE, PADDING[1] * SCALE
+
+    columns = [str(c) for c in df.columns]
+    rows = [[_cell(v, formats.get(c)) for c, v in zip(df.columns, row)]
+            for row in df.itertuples(index=False, name=None)]
+    numeric = [pd.api.types.is_numeric_dtype(df[c]) for c in df.columns]
+
+    widths = [
+        max([bold.getlength(name)] + [font.getlength(row[i]) for row in rows]) + 2 * pad_x
+        for i, name in enumerate(columns)
+    ]
+    ascent, descent = font.getmetrics()
+    row_height = ascent + descent + 2 * pad_y
+    width = int(sum(widths)) + 1
+    height = row_height * (len(rows) + 1) + SCALE
+
+    image = Image.new("RGB", (width, height), HEADER_BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    def draw_row(y, cells, row_font):
+        x = 0
+        for i, text in enumerate(cells):
+            if numeric[i]:
+                tx = x + widths[i] - pad_x - row_font.getlength(text)
+            else:
+                tx = x + pad_x
+            draw.text((tx, y + pad_y), text, font=row_font, fill=TEXT_COLOR)
+            x += widths[i]
+
+    draw_row(0, columns, bold)
+    draw.rectangle([0, row_height - SCALE, width, row_height], fill=BORDER_COLOR)
+    for n, cells in enumerate(rows):
+        y = row_height * (n + 1) + SCALE
+        draw.rectangle([0, y, width, y + row_height], fill=ROW_BACKGROUNDS[n % 2])
+        draw_row(y, cells, font)
+
+    info = PngInfo()
+    for key, value in (metadata or {}).items():
+        info.add_text(key, value)
+    storage.atomic_write(filename, lambda tmp_path: image.save(tmp_path, format="PNG", pnginfo=info))
+
+
+def _render(filename: str, key: str, draw_fn) -> tuple:
+    start = time.perf_counter()
+    rendered = render_if_changed(filename, key, draw_fn)
+    return rendered, time.perf_counter() - start
+
+
+def _report(filename: str, rendered: bool, seconds: float):
+    if rendered:
+        print(f"Rendered {os.path.basename(filename)} in {seconds:.2f}s")
+    else:
+        print(f"{os.path.basename(filename)} unchanged, not re-rendered ({seconds:.3f}s)")
+
+
+class Renderer:
+    """
+    Render images on one background thread.
+    submit() returns at once; finish() waits for all renders and reports
+    how long each took.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+        self._jobs = []
+
+    def submit(self, filename: str, key: str, draw_fn):
+        """Queue render_if_changed(filename, key, draw_fn)."""
+        self._jobs.append((filename, self._executor.submit(_render, filename, key, draw_fn)))
+
+    def finish(self) -> dict:
+        """
+        Wait for all queued renders. A failed render is reported, not raised.
+
+        Returns:
+            {filename: (rendered, seconds)} for renders that completed
+        """
+        results = {}
+        for filename, future in self._jobs:
+            try:
+                results[filename] = future.result()
+            except Exception as e:
+                print(f"Warning: rendering {os.path.basename(filename)} failed: {e}")
+                continue
+            _report(filename, *results[filename])
+        self._jobs = []
+        self._executor.shutdown()
+        if results:
+            total = sum(seconds for _, seconds in results.values())
+            print(f"Render time: {total:.2f}s for {len(results)} images")
+        return results
+
+
+def render(filename: str, key: str, draw_fn, renderer: Renderer = None):
+    """Queue the render on renderer, or render now (and report) when renderer is None."""
+    if renderer is not None:
+        renderer.submit(filename, key, draw_fn)
+        return
+    _report(filename, *_render(filename, key, draw_fn))
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+News sentiment pipeline shared by both trackers.
+Fetches headlines for many tickers concurrently, then scores all of them in
+one batch with a single VADER analyzer. NewsPrefetcher lets callers start
+news fetches ticker by ticker while their own work is still running.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from . import providers, storage
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_HEADLINES = 5
+
+# Cache defaults
+DEFAULT_NEWS_FRESHNESS = 15 * 60          # seconds a ticker's fetched news stays fresh
+DEFAULT_SCORE_TTL = 30 * 24 * 60 * 60     # seconds an unused headline score is kept
+DEFAULT_MAX_SCORES = 20000                # headline scores kept (least recently used dropped)
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer():
+    """
+    Return the shared SentimentIntensityAnalyzer, loading the VADER lexicon
+    (and downloading it if missing) on first use only.
+    """
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                import nltk
+                from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+                try:
+                    nltk.data.find('sentiment/vader_lexicon.zip')
+                except LookupError:
+                    nltk.download('vader_lexicon', quiet=True)
+                _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def extract_titles(news: list, max_headlines: int = DEFAULT_MAX_HEADLINES) -> list:
+    """Pull headline strings out of yfinance news items (title is in item["content"]["title"])."""
+    titles = []
+    for item in (news or [])[:max_headlines]:
+        title = None
+        if isinstance(item, dict):
+            content = item.get("content", {})
+            if isinstance(content, dict):
+                title = content.get("title")
+        if title and isinstance(title, str):
+            titles.append(title)
+    return titles
+
+
+def yfinance_news(ticker: str) -> list:
+    """Default news provider: raw yfinance news items for a ticker."""
+    return providers.YFinanceProvider().news(ticker)
+
+
+def fetch_news(
+    tickers: list,
+    max_headlines: int = DEFAULT_MAX_HEADLINES,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    news_fn=None,
+) -> dict:
+    """
+    Fetch headlines for all tickers concurrently.
+
+    Args:
+        tickers: List of ticker symbols
+        max_headlines: Headlines kept per ticker
+        max_workers: Concurrent news requests
+        news_fn: Callable(ticker) -> raw news items (defaults to yfinance)
+
+    Returns:
+        {ticker: [headlines]} in ticker order; failed tickers map to None
+    """
+    news_fn = news_fn or yfinance_news
+
+    def fetch_one(ticker):
+        return fetch_titles(ticker, news_fn, max_headlines)
+
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+        results = list(pool.map(fetch_one, tickers))
+    return dict(zip(tickers, results))
+
+
+def fetch_titles(ticker: str, news_fn, max_headlines: int = DEFAULT_MAX_HEADLINES) -> list:
+    """Headlines for one ticker, or None if fetching failed."""
+    try:
+        return extract_titles(news_fn(ticker), max_headlines)
+    except Exception as e:
+        print(f"Warning: failed to get sentiment for {ticker}: {e}")
+        return None
+
+
+def score_headlines(headlines) -> dict:
+    """
+    Score headlines with one analyzer; duplicate headlines are scored once.
+
+    Returns:
+        {headline: compound score}
+    """
+    unique = set(headlines)
+    if not unique:
+        return {}
+    try:
+        sia = get_analyzer()
+    except LookupError as e:
+        print(f"Warning: VADER lexicon unavailable, treating all headlines as neutral: {e}")
+        return {}
+    return {h: sia.polarity_scores(h)["compound"] for h in unique}
+
+
+def headline_key(headline: str) -> str:
+    """Cache key for a headline: SHA-1 of its text."""
+    return hashlib.sha1(headline.encode("utf-8")).hexdigest()
+
+
+def new_cache() -> dict:
+    """
+    Empty sentiment cache.
+    - "scores": {headline hash: [compound score, last used (epoch seconds)]}
+    - "news": {ticker: [fetched at (epoch seconds), [headlines]]}
+    """
+    return {"scores": {}, "news": {}}
+
+
+def load_cache(path: str) -> dict:
+    """Load the sentiment cache from disk. Returns an empty cache if missing or unreadable."""
+    if not path or not os.path.exists(path):
+        return new_cache()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read sentiment cache {path}: {e}")
+        return new_cache()
+    cache.setdefault("scores", {})
+    cache.setdefault("news", {})
+    return cache
+
+
+def evict(
+    cache: dict,
+    now: float,
+    score_ttl: float = DEFAULT_SCORE_TTL,
+    max_scores: int = DEFAULT_MAX_SCORES,
+    news_freshness: float = DEFAULT_NEWS_FRESHNESS,
+):
+    """Drop expired scores and stale news, then trim scores to max_scores (LRU)."""
+    scores = {k: v for k, v in cache["scores"].items() if now - v[1] <= score_ttl}
+    if len(scores) > max_scores:
+        newest = sorted(scores.items(), key=lambda kv: kv[1][1], reverse=True)[:max_scores]
+        scores = dict(newest)
+    cache["scores"] = scores
+    cache["news"] = {
+        t: v for t, v in cache["news"].items() if now - v[0] <= news_freshness
+    }
+
+
+def merge_cache(cache: dict, other: dict):
+    """Merge other into cache in place; the more recently used score and fetched news win."""
+    for key, entry in other["scores"].items():
+        mine = cache["scores"].get(key)
+        if mine is None or entry[1] > mine[1]:
+            cache["scores"][key] = entry
+    for ticker, entry in other["news"].items():
+        mine = cache["news"].get(ticker)
+        if mine is None or entry[0] > mine[0]:
+            cache["news"][ticker] = entry
+
+
+def save_cache(cache: dict, path: str):
+    """Write the sentiment cache (see storage.atomic_write)."""
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, separators=(",", ":"))
+
+    storage.atomic_write(path, write)
+
+
+def average_score(headlines: list, scores: dict) -> float:
+    """Average compound score of a ticker's headlines (None if there are none)."""
+    values = [scores[h] for h in headlines or [] if h in scores]
+    if not values:
+        return None
+    return sum(values) / len(values)
+
+
+def sentiment_frame(
+    tickers: list,
+    headlines_by_ticker: dict,
+    scores: dict,
+    classify,
+    with_score: bool = True,
+) -> tuple:
+    """
+    Build the per-ticker sentiment table from pipeline results.
+    Tickers without scored headlines are "Neutral" with score 0.0.
+
+    Args:
+        classify: Callable(average score) -> label
+        with_score: Include the "Sentiment Score" column
+
+    Returns:
+        (DataFrame with Ticker, Sentiment[, Sentiment Score], {ticker: [headlines]})
+    """
+    results = []
+    news_dict = {}
+    for ticker in tickers:
+        headlines = headlines_by_ticker.get(ticker) or []
+        avg_score = average_score(headlines, scores)
+        if avg_score is None:
+            label, avg_score = "Neutral", 0.0
+        else:
+            label = classify(avg_score)
+        row = {"Ticker": ticker, "Sentiment": label}
+        if with_score:
+            row["Sentiment Score"] = avg_score
+        results.append(row)
+        news_dict[ticker] = headlines
+
+    columns = ["Ticker", "Sentiment"] + (["Sentiment Score"] if with_score else [])
+    return pd.DataFrame(results, columns=columns), news_dict
+
+
+class NewsPrefetcher:
+    """
+    Streaming front half of the pipeline: tickers can be submitted one at a
+    time while other work (e.g. quote fetching) is still running, and their
+    news is fetched in the background. finish() waits for outstanding
+    fetches, scores every headline in one batch and saves the cache.
+
+    Tickers with fresh cached news are not fetched, and submitting a ticker
+    twice is a no-op.
+    """
+
+    def __init__(
+        self,
+        max_headlines: int = DEFAULT_MAX_HEADLINES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        news_fn=None,
+        cache_path: str = None,
+        news_freshness: float = DEFAULT_NEWS_FRESHNESS,
+        score_ttl: float = DEFAULT_SCORE_TTL,
+        max_scores: int = DEFAULT_MAX_SCORES,
+    ):
+        self.max_headlines = max_headlines
+        self.max_workers = max(1, max_workers)
+        self.news_fn = news_fn or yfinance_news
+        self.cache_path = cache_path
+        self.now = time.time()
+        self.limits = (score_ttl, max_scores, news_freshness)
+        self.cache = load_cache(cache_path) if cache_path else new_cache()
+        evict(self.cache, self.now, *self.limits)
+        self.stats = {"news_hits": 0, "news_misses": 0, "score_hits": 0, "score_misses": 0}
+        self.headlines = {}
+        self.futures = {}
+        self.pool = None
+        self.start = None
+        self.lock = threading.Lock()
+
+    def submit(self, ticker: str):
+        """Start fetching news for a ticker unless it is cached or already submitted."""
+        with self.lock:
+            if ticker in self.headlines or ticker in self.futures:
+                return
+            if self.start is None:
+                self.start = time.perf_counter()
+            cached = self.cache["news"].get(ticker)
+            if cached is not None:
+                self.headlines[ticker] = cached[1][:self.max_headlines]
+                self.stats["news_hits"] += 1
+                return
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            self.futures[ticker] = self.pool.submit(
+                fetch_titles, ticker, self.news_fn, self.max_headlines
+            )
+            self.stats["news_misses"] += 1
+
+    def close(self):
+        """Stop without scoring; fetches not yet started are cancelled."""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def finish(self, tickers: list) -> tuple:
+        """
+        Wait for news of the given tickers (submitting any not yet submitted),
+        then score all headlines in one batch. Submitted tickers that are
+        not in `tickers` are dropped from the result.
+
+        Returns:
+            (headlines_by_ticker, scores, stats) as run_pipeline()
+        """
+        for ticker in tickers:
+            self.submit(ticker)
+        if self.start is None:
+            self.start = time.perf_counter()
+
+        waiting = time.perf_counter()
+        now = self.now
+        for ticker, future in self.futures.items():
+            titles = future.result()
+            self.headlines[ticker] = titles
+            if titles is not None:
+                self.cache["news"][ticker] = [now, titles]
+        self.futures = {}
+        self.close()
+        headlines = {ticker: self.headlines.get(ticker) for ticker in tickers}
+        fetched = time.perf_counter()
+
+        stats = self.stats
+        scores = {}
+        misses = {}
+        for titles in headlines.values():
+            for h in titles or []:
+                entry = self.cache["scores"].get(headline_key(h))
+                if entry is not None:
+                    scores[h] = entry[0]
+                    entry[1] = now
+                else:
+                    misses[h] = True
+        stats["score_hits"] = len(scores)
+        stats["score_misses"] = len(misses)
+        new_scores = score_headlines(misses)
+        for h, score in new_scores.items():
+            scores[h] = score
+            self.cache["scores"][headline_key(h)] = [score, now]
+        scored = time.perf_counter()
+
+        if self.cache_path:
+            # Keep what other runs saved since this cache was loaded
+            with storage.file_lock(self.cache_path):
+                merge_cache(self.cache, load_cache(self.cache_path))
+                evict(self.cache, now, *self.limits)
+                save_cache(self.cache, self.cache_path)
+
+        stats["fetch"] = fetched - self.start
+        stats["wait"] = fetched - waiting
+        stats["score"] = scored - fetched
+        total_headlines = sum(len(h) for h in headlines.values() if h)
+        print(f"Sentiment timings: fetch {stats['fetch']:.2f}s (waited {stats['wait']:.2f}s), "
+              f"score {stats['score']:.2f}s "
+              f"({len(tickers)} tickers, {total_headlines} headlines, {self.max_workers} workers)")
+        if self.cache_path:
+            print(f"Sentiment cache: news {stats['news_hits']} hits / {stats['news_misses']} misses, "
+                  f"scores {stats['score_hits']} hits / {stats['score_misses']} misses")
+        return headlines, scores, stats
+
+
+def run_pipeline(
+    tickers: list,
+    max_headlines: int = DEFAULT_MAX_HEADLINES,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    news_fn=None,
+    cache_path: str = None,
+    news_freshness: float = DEFAULT_NEWS_FRESHNESS,
+    score_ttl: float = DEFAULT_SCORE_TTL,
+    max_scores: int = DEFAULT_MAX_SCORES,
+) -> tuple:
+    """
+    Fetch news concurrently and score all headlines in one batch.
+    
+    With cache_path set, tickers whose news was fetched less than
+    news_freshness seconds ago are not refetched, and headlines scored on an
+    earlier run are not rescored.
+
+    Returns:
+        (headlines_by_ticker, scores, stats)
+        - headlines_by_ticker: {ticker: [headlines] or None on failure}
+        - scores: {headline: compound score}
+        - stats: {"fetch", "wait", "score"} timings in seconds plus
+          "news_hits", "news_misses", "score_hits", "score_misses" cache counters
+    """
+    prefetcher = NewsPrefetcher(
+        max_headlines, max_workers, news_fn, cache_path, news_freshness, score_ttl, max_scores
+    )
+    return prefetcher.finish(tickers)
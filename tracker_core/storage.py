@@ -0,0 +1,184 @@
+"""
+Crash-safe file writes shared by both trackers.
+
+    file_lock(path)         exclusive advisory lock on <path>.lock, held for
+                            a whole read-modify-write cycle
+    atomic_write(path, fn)  fn(tmp_path) writes a temp file next to path;
+                            it is fsynced and renamed over path, and the
+                            rename itself is fsynced
+    append_bytes(path, ...) append complete lines and fsync, first cutting
+                            off a partial line left by an interrupted append
+
+A crash leaves either the old or the new file behind, never a truncated
+one. Locks only serialize processes on the same machine that take them
+(e.g. a scheduled run overlapping a manual one). The lock is re-entrant
+within a thread, so helpers that lock on their own can be called from
+code that already holds the same lock.
+"""
+
+import os
+import time
+import threading
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_LOCK_TIMEOUT = 600  # seconds to wait for another run to finish
+LOCK_POLL_INTERVAL = 0.05
+
+# Locks held by this thread: {lock path: depth}
+_held = threading.local()
+
+
+def lock_path(path: str) -> str:
+    return path + ".lock"
+
+
+def _try_lock(fd: int):
+    """Take the lock without blocking; raises OSError if another process holds it."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+
+def _unlock(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def file_lock(path: str, timeout: float = DEFAULT_LOCK_TIMEOUT):
+    """
+    Hold an exclusive advisory lock on path (via <path>.lock) for the
+    duration of the with block.
+
+    Raises:
+        TimeoutError: if the lock is still held by another process after timeout seconds
+    """
+    key = os.path.abspath(lock_path(path))
+    depth = getattr(_held, "locks", None)
+    if depth is None:
+        depth = _held.locks = {}
+    if depth.get(key):
+        depth[key] += 1
+        try:
+            yield
+        finally:
+            depth[key] -= 1
+        return
+
+    directory = os.path.dirname(key)
+    os.makedirs(directory, exist_ok=True)
+    fd = os.open(key, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        start = time.monotonic()
+        reported = False
+        while True:
+            try:
+                _try_lock(fd)
+                break
+            except OSError:
+                waited = time.monotonic() - start
+                if waited >= timeout:
+                    raise TimeoutError(f"Timed out after {timeout:.0f}s waiting for {key}")
+                if waited >= 1 and not reported:
+                    print(f"Waiting for another run to release {os.path.basename(key)}...")
+                    reported = True
+                time.sleep(LOCK_POLL_INTERVAL)
+
+        depth[key] = 1
+        try:
+            yield
+        finally:
+            del depth[key]
+            _unlock(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_file(path: str):
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_dir(directory: str):
+    """Persist renames in directory (a no-op where directories cannot be opened, e.g. Windows)."""
+    if os.name != "posix":
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, write_fn):
+    """
+    Replace path with what write_fn(tmp_path) writes. The temp file is
+    unique to this process and thread and is removed if write_fn fails.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        write_fn(tmp_path)
+        fsync_file(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    fsync_dir(directory)
+
+
+def _complete_length(f, size: int) -> int:
+    """Length of the file up to and including its last newline."""
+    chunk = 64 * 1024
+    end = size
+    while end > 0:
+        start = max(0, end - chunk)
+        f.seek(start)
+        newline = f.read(end - start).rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+def append_bytes(path: str, data: bytes, header: bytes = b"") -> int:
+    """
+    Append data (complete, newline-terminated lines) to path and fsync it.
+    header is written first when the file is new or empty. Call with the
+    file's lock held.
+
+    Returns:
+        Bytes of a partial last line that were cut off before appending
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    created = not os.path.exists(path)
+    with open(path, "ab+") as f:
+        size = f.seek(0, os.SEEK_END)
+        complete = _complete_length(f, size) if size else 0
+        if complete < size:
+            f.truncate(complete)
+        f.seek(0, os.SEEK_END)
+        f.write((header if complete == 0 else b"") + data)
+        f.flush()
+        os.fsync(f.fileno())
+    if created:
+        fsync_dir(directory)
+    return size - complete
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from tracker_core import changes
+
+
+def snapshot(prices: dict) -> pd.DataFrame:
+    return pd.DataFrame({"Ticker": list(prices), "Price": list(prices.values())})
+
+
+def test_moves_within_tolerance_are_not_changes():
+    last = pd.Series({"AAA": 10.0, "BBB": 20.0, "CCC": 30.0})
+    df = changes.price_changes(snapshot({"AAA": 10.005, "BBB": 20.5, "CCC": 30.0}), last, tolerance=0.01)
+
+    assert df["Ticker"].tolist() == ["BBB"]
+    row = df.iloc[0]
+    assert (row["Old Price"], row["New Price"]) == (20.0, 20.5)
+    assert round(row["Change %"], 6) == 2.5
+
+
+def test_new_tickers_change_and_missing_prices_are_ignored():
+    last = pd.Series({"AAA": 10.0})
+    df = changes.price_changes(snapshot({"AAA": 10.0, "NEW": 5.0, "NONE": None}), last)
+
+    assert df["Ticker"].tolist() == ["NEW"]
+    assert pd.isna(df.iloc[0]["Old Price"]) and pd.isna(df.iloc[0]["Change %"])
+
+
+def test_prices_changed_without_stored_prices():
+    assert changes.prices_changed(snapshot({"AAA": 1.0}), pd.Series(dtype=float))
+    assert not changes.prices_changed(snapshot({"AAA": 1.0}), pd.Series({"AAA": 1.0}))
+
+
+def test_last_prices_round_trip(tmp_path):
+    path = str(tmp_path / "last_prices.json")
+    assert changes.load_last_prices(path) is None
+
+    prices = changes.update_last_prices(pd.Series({"AAA": 1.0, "BBB": 2.0}), snapshot({"BBB": 3.0, "CCC": 4.0}))
+    changes.save_last_prices(prices, path)
+
+    assert changes.load_last_prices(path).to_dict() == {"AAA": 1.0, "BBB": 3.0, "CCC": 4.0}
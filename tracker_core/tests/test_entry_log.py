@@ -0,0 +1,62 @@
+import json
+import multiprocessing
+
+from tracker_core import entry_log
+
+
+def test_entries_read_newest_first(tmp_path):
+    path = str(tmp_path / "ai.log")
+    for i in range(5):
+        assert entry_log.append_entry(path, f"t{i}", f"text {i}") == i + 1
+
+    assert [e["text"] for e in entry_log.read_entries(path, 2)] == ["text 4", "text 3"]
+    assert len(entry_log.read_entries(path)) == 5
+    assert entry_log.read_entries(str(tmp_path / "missing.log")) == []
+
+
+def test_entry_ids_are_found(tmp_path):
+    path = str(tmp_path / "ai.log")
+    entry_log.append_entry(path, "t0", "first", entry_id="job-0")
+    entry_log.append_entry(path, "t1", "second")
+
+    assert entry_log.has_entry(path, "job-0")
+    assert not entry_log.has_entry(path, "job-0", recent=1)
+    assert "id" not in entry_log.read_entries(path, 1)[0]
+
+
+def test_compact_archives_oldest_entries(tmp_path):
+    path = str(tmp_path / "ai.log")
+    for i in range(6):
+        entry_log.append_entry(path, f"t{i}", f"text {i}", entry_id=str(i))
+
+    assert entry_log.maybe_compact(path, 4) == 0
+    assert entry_log.compact(path, 4) == 2
+    assert [e["text"] for e in entry_log.read_entries(path)] == [f"text {i}" for i in (5, 4, 3, 2)]
+    with open(entry_log.archive_path(path), encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == ["0", "1"]
+
+    # Appends after a compaction index the rewritten file
+    entry_log.append_entry(path, "t6", "text 6")
+    assert entry_log.read_entries(path, 1)[0]["text"] == "text 6"
+
+
+def append_and_compact(path: str, worker: int, count: int):
+    for i in range(count):
+        entry_log.append_entry(path, f"w{worker}", f"{worker}-{i}")
+        entry_log.maybe_compact(path, 5)
+
+
+def test_concurrent_appends_and_compactions_keep_every_entry(tmp_path):
+    path = str(tmp_path / "ai.log")
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=append_and_compact, args=(str(path), w, 40)) for w in range(2)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    with open(entry_log.archive_path(path), encoding="utf-8") as f:
+        archived = [json.loads(line)["text"] for line in f]
+    active = [e["text"] for e in entry_log.read_entries(path)]
+    assert sorted(archived + active) == sorted(f"{w}-{i}" for w in range(2) for i in range(40))
@@ -0,0 +1,74 @@
+import time
+import threading
+
+from tracker_core import fetch
+
+
+def test_results_keep_ticker_order():
+    results = fetch.fetch_all(["A", "B", "C"], lambda t: t.lower(), max_workers=2)
+    assert results == ["a", "b", "c"]
+
+
+def test_failed_attempts_are_retried():
+    calls = {}
+
+    def flaky(ticker):
+        calls[ticker] = calls.get(ticker, 0) + 1
+        if calls[ticker] < 2:
+            raise ValueError("temporary")
+        return ticker
+
+    results = fetch.fetch_all(["A", "B"], flaky, retries=2, backoff=0.01)
+    assert results == ["A", "B"]
+    assert calls == {"A": 2, "B": 2}
+
+
+def test_fallback_after_last_retry():
+    def broken(ticker):
+        raise ValueError("down")
+
+    results = fetch.fetch_all(["A"], broken, fallback_fn=lambda t: f"{t}?", retries=1, backoff=0.01)
+    assert results == ["A?"]
+
+
+def test_on_result_sees_every_ticker():
+    seen = []
+    fetch.fetch_all(["A", "B", "C"], str.lower, on_result=lambda idx, result: seen.append((idx, result)))
+    assert sorted(seen) == [(0, "a"), (1, "b"), (2, "c")]
+
+
+def test_every_worker_hung_does_not_block():
+    release = threading.Event()
+
+    def stub(ticker):
+        if ticker.startswith("HUNG"):
+            release.wait()  # never returns on its own
+        return ticker
+
+    tickers = ["HUNG1", "HUNG2", "A", "B"]
+    start = time.monotonic()
+    try:
+        results = fetch.fetch_all(
+            tickers, stub, fallback_fn=lambda t: None, max_workers=2, timeout=0.2, retries=0
+        )
+    finally:
+        release.set()
+    assert time.monotonic() - start < 5
+    # Both slots stay held by the hung calls, so the waiting tickers fall back
+    assert results == [None, None, None, None]
+
+
+def test_hung_attempt_frees_its_slot_when_it_returns():
+    release = threading.Event()
+
+    def stub(ticker):
+        if ticker == "SLOW":
+            release.wait()
+        return ticker
+
+    # Abandoned after 0.2s, returns at 0.3s: within the extra timeout it is given
+    timer = threading.Timer(0.3, release.set)
+    timer.start()
+    results = fetch.fetch_all(["SLOW", "A", "B"], stub, max_workers=1, timeout=0.2, retries=0)
+    timer.join()
+    assert results == [None, "A", "B"]
@@ -0,0 +1,81 @@
+import pandas as pd
+
+from tracker_core import history
+
+SCHEMA = {"timestamp": "datetime64[ns, UTC]", "Ticker": "string", "Price": "float64"}
+NOW = pd.Timestamp("2026-03-31 12:00", tz="UTC")
+FULL_RESOLUTION = pd.Timedelta(days=14)
+
+
+def runs(times: list, prices: list, ticker: str = "AAA") -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(times, utc=True),
+        "Ticker": ticker,
+        "Price": prices,
+    })
+
+
+def test_old_runs_become_one_ohlc_row_per_day():
+    df = runs(["2026-03-01 14:00", "2026-03-01 16:00", "2026-03-01 20:00", "2026-03-30 14:00"],
+              [10.0, 12.0, 11.0, 20.0])
+
+    out = history.downsample(df, FULL_RESOLUTION, now=NOW)
+
+    assert len(out) == 2
+    day = out.iloc[0]
+    assert (day["Open"], day["High"], day["Low"], day["Price"]) == (10.0, 12.0, 10.0, 11.0)
+    # Recent rows are kept untouched, without OHLC values
+    assert out.iloc[1]["Price"] == 20.0
+    assert pd.isna(out.iloc[1]["Open"])
+
+
+def test_downsample_is_idempotent_and_per_ticker():
+    df = pd.concat([
+        runs(["2026-03-01 14:00", "2026-03-01 20:00"], [10.0, 11.0]),
+        runs(["2026-03-01 15:00", "2026-03-01 19:00"], [5.0, 4.0], ticker="BBB"),
+    ])
+
+    once = history.downsample(df, FULL_RESOLUTION, now=NOW)
+    twice = history.downsample(once, FULL_RESOLUTION, now=NOW)
+
+    assert sorted(once["Ticker"]) == ["AAA", "BBB"]
+    pd.testing.assert_frame_equal(once.reset_index(drop=True), twice.reset_index(drop=True))
+
+
+def test_rows_past_max_age_are_dropped():
+    df = runs(["2025-01-01 14:00", "2026-03-01 14:00"], [1.0, 2.0])
+
+    out = history.downsample(df, FULL_RESOLUTION, max_age=pd.Timedelta(days=365), now=NOW)
+
+    assert out["Price"].tolist() == [2.0]
+
+
+def test_needs_downsample():
+    recent = runs(["2026-03-30 14:00", "2026-03-30 20:00"], [1.0, 2.0])
+    old = runs(["2026-03-01 14:00", "2026-03-01 20:00"], [1.0, 2.0])
+
+    assert not history.needs_downsample(recent, FULL_RESOLUTION, now=NOW)
+    assert history.needs_downsample(old, FULL_RESOLUTION, now=NOW)
+    assert not history.needs_downsample(history.downsample(old, FULL_RESOLUTION, now=NOW), FULL_RESOLUTION, now=NOW)
+    assert history.needs_downsample(old, FULL_RESOLUTION, max_age=pd.Timedelta(days=7), now=NOW)
+
+
+def test_append_csv_and_load_csv_skip_a_torn_line(tmp_path):
+    path = str(tmp_path / "history.csv")
+    assert history.append_csv(runs(["2026-03-30 14:00"], [1.0]), path, SCHEMA)
+    with open(path, "ab") as f:
+        f.write(b"2026-03-30 15:00:00+00:00,AA")  # interrupted append
+
+    assert history.load_csv(path, SCHEMA)["Price"].tolist() == [1.0]
+    assert history.append_csv(runs(["2026-03-30 16:00"], [3.0]), path, SCHEMA)
+    assert history.load_csv(path, SCHEMA)["Price"].tolist() == [1.0, 3.0]
+
+
+def test_append_csv_refuses_a_different_header(tmp_path):
+    path = str(tmp_path / "history.csv")
+    with open(path, "w") as f:
+        f.write("timestamp,Ticker\n")
+
+    assert not history.append_csv(runs(["2026-03-30 14:00"], [1.0]), path, SCHEMA)
+    with open(path) as f:
+        assert f.read() == "timestamp,Ticker\n"
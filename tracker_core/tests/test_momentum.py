@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from tracker_core import momentum
+
+
+def history(rows: int = 3000, tickers: int = 60, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "timestamp": pd.Timestamp("2026-01-01", tz="UTC")
+                     + pd.to_timedelta(rng.integers(0, 60 * 24, rows), unit="h"),
+        "Ticker": np.array([f"T{i:03d}" for i in range(tickers)])[rng.integers(0, tickers, rows)],
+        "Price": rng.uniform(10, 500, rows),
+        "% From 52W High": rng.uniform(-10, 0, rows),
+    })
+    return df.drop_duplicates(["Ticker", "timestamp"]).reset_index(drop=True)
+
+
+def momentum_loop(df_hist: pd.DataFrame) -> pd.DataFrame:
+    """The per-ticker loop the vectorized engine replaced."""
+    results = []
+    for ticker, g in df_hist.sort_values(["Ticker", "timestamp"]).groupby("Ticker"):
+        g = g.reset_index(drop=True)
+        last = g.iloc[-1]
+        daily = weekly = high = None
+        if len(g) >= 2:
+            daily = (last["Price"] / g["Price"].iloc[-2] - 1) * 100
+            high = last["% From 52W High"] - g["% From 52W High"].iloc[-2]
+        earlier = g[g["timestamp"] <= last["timestamp"] - pd.Timedelta(days=5)]
+        if not earlier.empty:
+            weekly = (last["Price"] / earlier["Price"].iloc[-1] - 1) * 100
+        results.append({"Ticker": ticker, "Price": last["Price"], "Daily Change %": daily,
+                        "Weekly Change %": weekly, "High Momentum": high})
+    return pd.DataFrame(results)
+
+
+def test_compute_momentum_matches_loop_version():
+    df = history()
+
+    out = momentum.compute_momentum(df, high_col="% From 52W High")
+
+    expected = momentum_loop(df)
+    columns = list(expected.columns)
+    pd.testing.assert_frame_equal(out[columns], expected.astype({c: float for c in columns[1:]}),
+                                  check_dtype=False)
+
+
+def test_last_rows_by_ticker_prefers_later_rows_on_ties():
+    df = pd.DataFrame({
+        "timestamp": pd.to_datetime(["2026-01-02", "2026-01-01", "2026-01-02", "2026-01-03"], utc=True),
+        "Ticker": ["AAA", "AAA", "AAA", "BBB"],
+        "Price": [1.0, 2.0, 3.0, 4.0],
+    })
+
+    out = momentum.last_rows_by_ticker(df, n=2)
+
+    assert out["Price"].tolist() == [1.0, 3.0, 4.0]
+
+
+def test_extra_windows_use_the_as_of_price():
+    df = pd.DataFrame({
+        "timestamp": pd.to_datetime(["2026-01-01", "2026-01-20", "2026-01-30"], utc=True),
+        "Ticker": "AAA",
+        "Price": [100.0, 150.0, 200.0],
+    })
+
+    out = momentum.compute_momentum(df, windows={"5D": pd.Timedelta(days=5), "21D": pd.Timedelta(days=21)})
+
+    assert out.loc[0, "5D"] == (200 / 150 - 1) * 100
+    assert out.loc[0, "21D"] == 100.0
+    assert out.loc[0, "Daily Change %"] == (200 / 150 - 1) * 100
@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from tracker_core import providers
+
+
+def test_replay_serves_fixture_bars_since_start():
+    fixture = providers.synthetic_fixture(["AAA"], days=30)
+    provider = providers.ReplayProvider(fixture)
+    dates = fixture["bars"]["AAA"]["dates"]
+
+    bars = provider.download(["AAA", "MISSING"], start=dates[-5], actions=True)
+
+    assert list(bars) == ["AAA"]
+    assert len(bars["AAA"]) == 5 and (bars["AAA"]["Stock Splits"] == 0).all()
+    assert provider.history("MISSING").empty
+    assert provider.requests == 2
+
+
+def test_download_without_high_column_returns_nothing(monkeypatch):
+    yf = pytest.importorskip("yfinance")
+    data = pd.DataFrame({("Close", "AAA"): [1.0]})
+    data.columns = pd.MultiIndex.from_tuples(data.columns)
+    monkeypatch.setattr(yf, "download", lambda tickers, **kwargs: data)
+
+    assert providers.YFinanceProvider().download(["AAA", "BBB"]) == {}
@@ -0,0 +1,57 @@
+import pytest
+
+from tracker_core import sentiment
+
+
+def cache_with(scores: dict, news: dict = None) -> dict:
+    return {"scores": dict(scores), "news": dict(news or {})}
+
+
+def test_evict_drops_expired_scores_and_stale_news():
+    cache = cache_with(
+        {"old": [0.1, 0], "fresh": [0.2, 90]},
+        {"AAA": [0, ["stale"]], "BBB": [95, ["fresh"]]},
+    )
+
+    sentiment.evict(cache, now=100, score_ttl=50, max_scores=10, news_freshness=10)
+
+    assert list(cache["scores"]) == ["fresh"]
+    assert list(cache["news"]) == ["BBB"]
+
+
+def test_evict_keeps_most_recently_used_scores():
+    cache = cache_with({f"h{i}": [0.0, i] for i in range(5)})
+
+    sentiment.evict(cache, now=5, score_ttl=100, max_scores=2, news_freshness=10)
+
+    assert sorted(cache["scores"]) == ["h3", "h4"]
+
+
+def test_cache_round_trip(tmp_path):
+    path = str(tmp_path / "sentiment_cache.json")
+    assert sentiment.load_cache(path) == sentiment.new_cache()
+
+    cache = cache_with({"k": [0.5, 1.0]}, {"AAA": [1.0, ["headline"]]})
+    sentiment.save_cache(cache, path)
+
+    assert sentiment.load_cache(path) == cache
+
+
+def test_prefetcher_reuses_cached_news_and_scores(tmp_path):
+    pytest.importorskip("nltk")
+    path = str(tmp_path / "sentiment_cache.json")
+    calls = []
+
+    def news(ticker):
+        calls.append(ticker)
+        return [{"content": {"title": f"{ticker} beats estimates"}}]
+
+    first = sentiment.NewsPrefetcher(news_fn=news, cache_path=path)
+    _, scores, stats = first.finish(["AAA"])
+    assert stats["news_misses"] == 1 and stats["score_misses"] == 1
+
+    second = sentiment.NewsPrefetcher(news_fn=news, cache_path=path)
+    _, cached, stats = second.finish(["AAA"])
+    assert calls == ["AAA"]
+    assert stats["news_hits"] == 1 and stats["score_hits"] == 1
+    assert cached == scores
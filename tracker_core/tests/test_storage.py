@@ -0,0 +1,82 @@
+import os
+import threading
+
+import pytest
+
+from tracker_core import storage
+
+
+def test_lock_is_reentrant_within_a_thread(tmp_path):
+    path = str(tmp_path / "history")
+    with storage.file_lock(path, timeout=1):
+        with storage.file_lock(path, timeout=1):
+            pass
+        # Still held by the outer block after the inner one exits
+        assert storage._held.locks[os.path.abspath(storage.lock_path(path))] == 1
+    assert not storage._held.locks
+
+
+def test_lock_excludes_other_holders(tmp_path):
+    path = str(tmp_path / "history")
+    errors = []
+
+    def contend():
+        try:
+            with storage.file_lock(path, timeout=0.2):
+                pass
+        except TimeoutError as e:
+            errors.append(e)
+
+    with storage.file_lock(path):
+        thread = threading.Thread(target=contend)
+        thread.start()
+        thread.join()
+    assert len(errors) == 1
+
+    # Released: the next holder gets it at once
+    with storage.file_lock(path, timeout=0.2):
+        pass
+
+
+def test_atomic_write_keeps_old_file_on_failure(tmp_path):
+    path = str(tmp_path / "data.json")
+    storage.atomic_write(path, lambda tmp: open(tmp, "w").write("old"))
+
+    def broken(tmp):
+        with open(tmp, "w") as f:
+            f.write("half")
+        raise RuntimeError("crash")
+
+    with pytest.raises(RuntimeError):
+        storage.atomic_write(path, broken)
+    with open(path) as f:
+        assert f.read() == "old"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_append_bytes_writes_header_once(tmp_path):
+    path = str(tmp_path / "history.csv")
+    assert storage.append_bytes(path, b"1\n", header=b"a\n") == 0
+    assert storage.append_bytes(path, b"2\n", header=b"a\n") == 0
+    with open(path, "rb") as f:
+        assert f.read() == b"a\n1\n2\n"
+
+
+def test_append_bytes_cuts_a_partial_line(tmp_path):
+    path = str(tmp_path / "history.csv")
+    with open(path, "wb") as f:
+        f.write(b"a\n1\n2,tor")
+
+    assert storage.append_bytes(path, b"3\n", header=b"a\n") == len(b"2,tor")
+    with open(path, "rb") as f:
+        assert f.read() == b"a\n1\n3\n"
+
+
+def test_append_bytes_rewrites_header_of_a_torn_first_line(tmp_path):
+    path = str(tmp_path / "history.csv")
+    with open(path, "wb") as f:
+        f.write(b"a,")
+
+    assert storage.append_bytes(path, b"1\n", header=b"a\n") == 2
+    with open(path, "rb") as f:
+        assert f.read() == b"a\n1\n"